@@ -0,0 +1,4 @@
+"""
+Benchmarks for the datadistillr package. These are run against a local mock DataDistillr server
+and are not part of the test suite.
+"""
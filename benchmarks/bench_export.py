@@ -0,0 +1,86 @@
+"""
+Measures the wall-clock time and peak resident memory of the file exports of Datadistillr
+against a local mock server. Every export runs in a fresh process, so the peak RSS of one export
+does not leak into the next.
+
+Usage:
+    python -m benchmarks.bench_export
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datadistillr import Datadistillr
+from benchmarks.mock_server import MockDatadistillrServer
+
+EXPORTS = {
+    'csv (in memory)': lambda url, filename: Datadistillr.get_dataframe(url, "key").to_csv(
+        filename),
+    'csv (streamed)': lambda url, filename: Datadistillr.get_csv_from_api(url, "key", filename),
+    'json (in memory)': lambda url, filename: Datadistillr.get_json_from_api(url, "key",
+                                                                             filename),
+    'json lines (streamed)': lambda url, filename: Datadistillr.get_json_from_api(
+        url, "key", filename, lines=True),
+    'parquet (in memory)': lambda url, filename: Datadistillr.get_dataframe(
+        url, "key").to_parquet(filename),
+    'parquet (streamed)': lambda url, filename: Datadistillr.get_parquet_from_api(url, "key",
+                                                                                  filename),
+}
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_export(name, url):
+    """
+    Runs one export in this process and prints its time, peak RSS and file size.
+
+    Parameters:
+        name (str): Key of the export in EXPORTS.
+        url (str): URL of the API endpoint.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'export')
+        baseline_rss = peak_rss_mb()
+        start = time.perf_counter()
+        EXPORTS[name](url, filename)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(filename) / 1024 ** 2
+    print(f"{name:<24} {elapsed:>9.2f} {peak_rss_mb() - baseline_rss:>13.1f} {size:>10.1f}")
+
+
+def main():
+    """
+    Parses command line arguments and runs every export in a subprocess.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--rows-per-page', type=int, default=2000)
+    parser.add_argument('--export', choices=sorted(EXPORTS), help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.export:
+        run_export(args.export, args.url)
+        return
+
+    print(f"{args.pages} pages of {args.rows_per_page} rows")
+    print(f"{'export':<24} {'seconds':>9} {'peak RSS MB':>13} {'file MB':>10}")
+    with MockDatadistillrServer(total_pages=args.pages,
+                                rows_per_page=args.rows_per_page) as server:
+        for name in EXPORTS:
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_export', '--export', name,
+                            '--url', server.endpoint_url], check=True)
+
+
+if __name__ == '__main__':
+    main()
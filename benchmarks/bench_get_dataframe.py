@@ -0,0 +1,53 @@
+"""
+Measures the wall-clock time of Datadistillr.get_dataframe against a local mock server for
+different page counts and numbers of concurrent workers.
+
+Usage:
+    python -m benchmarks.bench_get_dataframe
+"""
+import argparse
+import time
+from datadistillr import Datadistillr
+from benchmarks.mock_server import MockDatadistillrServer
+
+
+def run(page_counts, worker_counts, latency, rows_per_page):
+    """
+    Runs the benchmark and prints one line per configuration.
+
+    Parameters:
+        page_counts (list<int>): Page counts to benchmark.
+        worker_counts (list<int>): Numbers of concurrent workers to benchmark.
+        latency (float): Seconds every response is delayed by.
+        rows_per_page (int): Number of rows in every page.
+    """
+    print(f"{'pages':>6} {'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for total_pages in page_counts:
+        baseline = None
+        for max_workers in worker_counts:
+            with MockDatadistillrServer(total_pages=total_pages, rows_per_page=rows_per_page,
+                                        latency=latency) as server:
+                start = time.perf_counter()
+                data_frame = Datadistillr.get_dataframe(server.endpoint_url, "api key",
+                                                        max_workers=max_workers)
+                elapsed = time.perf_counter() - start
+            assert len(data_frame) == total_pages * rows_per_page
+            baseline = baseline or elapsed
+            print(f"{total_pages:>6} {max_workers:>8} {elapsed:>9.3f} {baseline / elapsed:>7.1f}x")
+
+
+def main():
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--rows-per-page', type=int, default=500)
+    args = parser.parse_args()
+    run(args.pages, args.workers, args.latency, args.rows_per_page)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Measures the share of JSON decoding in the per-page latency of the API endpoint against a local
+mock server, for response.json() of requests and for every installed JSON backend of the SDK.
+Each page is fetched once and then decoded by every decoder, so all decoders see the same
+bodies.
+
+Usage:
+    python -m benchmarks.bench_json_decode
+"""
+import argparse
+import time
+from datadistillr import Datadistillr, json_backend
+from benchmarks.mock_server import MockDatadistillrServer
+
+
+def _get_decoders():
+    """
+    Returns the decoders to compare, as (name, function decoding a response) pairs.
+    """
+    decoders = [("response.json", lambda response: response.json())]
+    for name in json_backend.BACKENDS:
+        try:
+            backend = json_backend._load_backend(name)  # pylint: disable=protected-access
+        except ImportError:
+            continue
+        decoders.append((name, lambda response, loads=backend.loads: loads(response.content)))
+    return decoders
+
+
+def _time_decoders(decoders, response, repeat, decode_seconds):
+    """
+    Decodes a response repeat times with every decoder, adding the fastest time of each to
+    decode_seconds.
+
+    Returns:
+        dict: The decoded page.
+    """
+    page = None
+    for name, decode in decoders:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page = decode(response)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        decode_seconds[name] += best
+    return page
+
+
+def _print_results(total_pages, rows_per_page, body_bytes, fetch_seconds, decode_seconds):
+    """
+    Prints the time per page of fetching and of every decoder.
+
+    Parameters:
+        total_pages (int): Number of pages fetched.
+        rows_per_page (int): Number of rows in every page.
+        body_bytes (int): Total size of the response bodies.
+        fetch_seconds (float): Total seconds spent fetching pages.
+        decode_seconds (dict): Decoder names mapped to their total seconds.
+    """
+    print(f"{total_pages} pages of {rows_per_page} rows, "
+          f"{body_bytes / total_pages / 1024:.0f} KiB per page")
+    print(f"{'decoder':>14} {'fetch us':>9} {'decode us':>10} {'decode share':>13}")
+    fetch_per_page = fetch_seconds / total_pages * 1e6
+    for name, seconds in decode_seconds.items():
+        decode_per_page = seconds / total_pages * 1e6
+        share = decode_per_page / (fetch_per_page + decode_per_page)
+        print(f"{name:>14} {fetch_per_page:>9.0f} {decode_per_page:>10.0f} {share:>12.1%}")
+
+
+def run(total_pages, rows_per_page, num_columns, latency, repeat):
+    """
+    Runs the benchmark and prints one line per decoder.
+
+    Parameters:
+        total_pages (int): Number of pages to fetch.
+        rows_per_page (int): Number of rows in every page.
+        num_columns (int): Number of columns in every row.
+        latency (float): Seconds every response is delayed by.
+        repeat (int): Number of times every page is decoded, the fastest time is kept.
+    """
+    decoders = _get_decoders()
+    fetch_seconds = 0.0
+    decode_seconds = {name: 0.0 for name, _ in decoders}
+    body_bytes = 0
+
+    with MockDatadistillrServer(total_pages=total_pages, rows_per_page=rows_per_page,
+                                num_columns=num_columns, latency=latency) as server:
+        url = server.endpoint_url
+        while url is not None:
+            start = time.perf_counter()
+            response = Datadistillr.make_api_call(url, "api key")
+            fetch_seconds += time.perf_counter() - start
+            body_bytes += len(response.content)
+
+            page = _time_decoders(decoders, response, repeat, decode_seconds)
+            url = page['summary'].get('nextPage')
+
+    _print_results(total_pages, rows_per_page, body_bytes, fetch_seconds, decode_seconds)
+
+
+def main():
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rows-per-page', type=int, default=2000)
+    parser.add_argument('--columns', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.pages, args.rows_per_page, args.columns, args.latency, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
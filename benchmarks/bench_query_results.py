@@ -0,0 +1,99 @@
+"""
+Measures the time Project._get_query_results takes to collect paginated query results for
+different page counts. Pages are served from memory by a stand-in session, so the benchmark
+measures only the client-side JSON decoding, page walk and buffering, which should grow
+linearly with the page count.
+
+Usage:
+    python -m benchmarks.bench_query_results
+"""
+import argparse
+import json
+import time
+from datadistillr.project import Project
+
+RESULTS_URL = "https://app.datadistillr.io/api/queryResults/1"
+
+
+class _Response:  # pylint: disable=too-few-public-methods
+    """
+    Stand-in for a requests.Response holding an encoded JSON body.
+    """
+
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        """
+        Does nothing, since every page is served successfully.
+        """
+
+
+class InMemoryResultsSession:  # pylint: disable=too-few-public-methods
+    """
+    Stand-in for a requests.Session that serves the pages of one completed query run.
+
+    Attributes:
+        total_pages (int): Number of pages in the result.
+        rows_per_page (int): Number of rows in every page.
+    """
+
+    def __init__(self, total_pages, rows_per_page):
+        self.total_pages = total_pages
+        self.rows_per_page = rows_per_page
+        rows = [[str(row), f"value {row}"] for row in range(rows_per_page)]
+        self._pages = {}
+        for page in range(1, total_pages + 1):
+            summary = {'columnNames': ['id', 'value'], 'dataTypes': ['INTEGER', 'VARCHAR'],
+                       'rowsPerPage': rows_per_page,
+                       'totalNumRows': rows_per_page * total_pages,
+                       'page': page, 'totalPages': total_pages}
+            if page < total_pages:
+                summary['nextPage'] = f"{RESULTS_URL}?page={page + 1}"
+            url = RESULTS_URL if page == 1 else f"{RESULTS_URL}?page={page}"
+            self._pages[url] = json.dumps({'results': rows, 'summary': summary,
+                                           'queryRun': {'status': 'complete'}}).encode('utf-8')
+
+    def get(self, url, **_):
+        """
+        Returns the page stored for url.
+        """
+        return _Response(self._pages[url])
+
+
+def run(page_counts, rows_per_page):
+    """
+    Runs the benchmark and prints one line per page count.
+
+    Parameters:
+        page_counts (list<int>): Page counts to benchmark.
+        rows_per_page (int): Number of rows in every page.
+    """
+    print(f"{'pages':>6} {'rows':>9} {'seconds':>9} {'us/page':>9}")
+    for total_pages in page_counts:
+        session = InMemoryResultsSession(total_pages, rows_per_page)
+        project = Project({'name': 'benchmark', 'token': 1}, session)
+        start = time.perf_counter()
+        results = project._get_query_results(RESULTS_URL)  # pylint: disable=protected-access
+        elapsed = time.perf_counter() - start
+        assert len(results['data']) == total_pages * rows_per_page
+        print(f"{total_pages:>6} {len(results['data']):>9} {elapsed:>9.3f} "
+              f"{elapsed / total_pages * 1e6:>9.1f}")
+
+
+def main():
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, nargs='+', default=[500, 1000, 2500, 5000])
+    parser.add_argument('--rows-per-page', type=int, default=500)
+    args = parser.parse_args()
+    run(args.pages, args.rows_per_page)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures the upload throughput of Project.upload_files against a local stand-in for the
+DataDistillr upload route and S3, for different numbers of concurrent uploads.
+
+Usage:
+    python -m benchmarks.bench_upload
+"""
+import argparse
+import os
+import tempfile
+import time
+from datadistillr.project import Project
+from datadistillr.session import DatadistillrSession
+from benchmarks.mock_server import MockDatadistillrServer
+
+
+def write_csv_files(directory, num_files, file_size):
+    """
+    Writes CSV files of generated rows.
+
+    Parameters:
+        directory (str): Directory to write the files to.
+        num_files (int): Number of files.
+        file_size (int): Approximate size of every file in bytes.
+
+    Returns:
+        list<str>: Paths of the files.
+    """
+    file_paths = []
+    for i in range(num_files):
+        file_path = os.path.join(directory, f"file_{i}.csv")
+        with open(file_path, "w", encoding="utf-8") as file:
+            row = 0
+            while file.tell() < file_size:
+                file.write(f"{row},customer {row % 977},{row * 7 % 10000 / 100:.2f},2022-05-01\n")
+                row += 1
+        file_paths.append(file_path)
+    return file_paths
+
+
+def run(num_files, file_size, worker_counts, bandwidth):
+    """
+    Runs the benchmark and prints one line per number of concurrent uploads.
+
+    Parameters:
+        num_files (int): Number of files uploaded per run.
+        file_size (int): Approximate size of every file in bytes.
+        worker_counts (list<int>): Numbers of concurrent uploads to benchmark.
+        bandwidth (float): Bytes per second accepted per upload, or None for no limit.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = write_csv_files(tmp_dir, num_files, file_size)
+        total_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / 1024 ** 2
+        print(f"{num_files} files, {total_mb:.1f} MB")
+        print(f"{'workers':>8} {'seconds':>9} {'MB/s':>8}")
+        for max_workers in worker_counts:
+            with MockDatadistillrServer(upload_bandwidth=bandwidth) as server:
+                project = Project({'name': 'benchmark', 'token': 1}, DatadistillrSession())
+                server.point_project(project)
+                start = time.perf_counter()
+                project.upload_files(1, file_paths, max_workers=max_workers)
+                elapsed = time.perf_counter() - start
+            print(f"{max_workers:>8} {elapsed:>9.2f} {total_mb / elapsed:>8.1f}")
+
+
+def main():
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--file-mb', type=float, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--bandwidth-mb', type=float, default=None,
+                        help="simulated upload bandwidth per connection in MB/s")
+    args = parser.parse_args()
+    bandwidth = args.bandwidth_mb * 1024 ** 2 if args.bandwidth_mb else None
+    run(args.files, int(args.file_mb * 1024 ** 2), args.workers, bandwidth)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Compares the CPU cost of compressing CSV uploads with the transfer time it saves. Every
+compression uploads the same CSV files through Project.upload_files to a local stand-in for
+the DataDistillr upload route and S3 with a limited bandwidth.
+
+Usage:
+    python -m benchmarks.bench_upload_compression
+"""
+import argparse
+import os
+import tempfile
+import time
+from datadistillr.project import Project
+from datadistillr.session import DatadistillrSession
+from datadistillr.uploads import UploadSource
+from benchmarks.bench_upload import write_csv_files
+from benchmarks.mock_server import MockDatadistillrServer
+
+
+def measure_compression(file_paths, compression):
+    """
+    Compresses the files the way an upload does and measures the CPU time it takes.
+
+    Parameters:
+        file_paths (list<str>): Paths of the files.
+        compression (str): None, 'gzip' or 'zstd'.
+
+    Returns:
+        tuple: CPU seconds and total size of the compressed files in bytes.
+    """
+    start = time.process_time()
+    sources = [UploadSource.from_path(file_path, compression) for file_path in file_paths]
+    cpu_seconds = time.process_time() - start
+    size = sum(source.size for source in sources)
+    for source in sources:
+        source.close()
+    return cpu_seconds, size
+
+
+def measure_upload(file_paths, compression, bandwidth, max_workers):
+    """
+    Uploads files to a mock server.
+
+    Parameters:
+        file_paths (list<str>): Files to upload.
+        compression (str): None, 'gzip' or 'zstd'.
+        bandwidth (float): Bytes per second accepted per upload, or None for no limit.
+        max_workers (int): Number of concurrent uploads.
+
+    Returns:
+        float: Seconds the upload took, including compression.
+    """
+    with MockDatadistillrServer(upload_bandwidth=bandwidth) as server:
+        project = Project({'name': 'benchmark', 'token': 1}, DatadistillrSession())
+        server.point_project(project)
+        start = time.perf_counter()
+        project.upload_files(1, file_paths, max_workers=max_workers, compression=compression)
+        return time.perf_counter() - start
+
+
+def run(num_files, file_size, compressions, bandwidth, max_workers):
+    """
+    Runs the benchmark and prints one line per compression.
+
+    Parameters:
+        num_files (int): Number of files uploaded per run.
+        file_size (int): Approximate size of every file in bytes.
+        compressions (list<str>): Compressions to benchmark, 'none' for no compression.
+        bandwidth (float): Bytes per second accepted per upload, or None for no limit.
+        max_workers (int): Number of concurrent uploads.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = write_csv_files(tmp_dir, num_files, file_size)
+        total_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / 1024 ** 2
+        print(f"{num_files} files, {total_mb:.1f} MB, {max_workers} workers")
+        print(f"{'compression':>12} {'sent MB':>8} {'ratio':>6} {'cpu s':>7} {'upload s':>9}")
+        for name in compressions:
+            compression = None if name == 'none' else name
+            cpu_seconds, size = measure_compression(file_paths, compression)
+            elapsed = measure_upload(file_paths, compression, bandwidth, max_workers)
+            sent_mb = size / 1024 ** 2
+            print(f"{name:>12} {sent_mb:>8.1f} {total_mb / sent_mb:>6.1f} {cpu_seconds:>7.2f} "
+                  f"{elapsed:>9.2f}")
+
+
+def main():
+    """
+    Parses command line arguments and runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--file-mb', type=float, default=16)
+    parser.add_argument('--compressions', nargs='+', default=['none', 'gzip', 'zstd'],
+                        choices=['none', 'gzip', 'zstd'])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--bandwidth-mb', type=float, default=10,
+                        help="simulated upload bandwidth per connection in MB/s, 0 for no limit")
+    args = parser.parse_args()
+    bandwidth = args.bandwidth_mb * 1024 ** 2 if args.bandwidth_mb else None
+    run(args.files, int(args.file_mb * 1024 ** 2), args.compressions, bandwidth, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+This file defines a local stand-in for the DataDistillr API used by the benchmarks.
+"""
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class MockDatadistillrServer:  # pylint: disable=too-many-instance-attributes
+    """
+    This is a class for serving generated DataDistillr API endpoint pages on localhost. It also
+    serves the queryBarrels and queryResults routes of projects, hands out presigned urls for
+    data source uploads and accepts the uploads like S3 would.
+
+    A query run started through the queryBarrels route reports itself as running until
+    query_latency seconds have passed, and then serves total_pages pages of results. Page
+    bodies are encoded once and reused, so the server spends little CPU time per request.
+    With a compression, responses are compressed for clients that accept it.
+
+    Attributes:
+        total_pages (int): Number of pages served by the API endpoint and every query run.
+        rows_per_page (int): Number of rows in every page.
+        num_columns (int): Number of columns in every row.
+        latency (float): Seconds every response is delayed by.
+        upload_bandwidth (float): Bytes per second accepted per upload, or None for no limit.
+        query_latency (float): Seconds a query run reports itself as running.
+        compression (str): Content encoding of responses, gzip or zstd, or None.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, total_pages=10, rows_per_page=500, num_columns=4, latency=0.0,
+                 upload_bandwidth=None, query_latency=0.0, compression=None):
+        """
+        The constructor for the MockDatadistillrServer class.
+
+        Parameters:
+            total_pages (int): Number of pages served by the API endpoint and every query run.
+            rows_per_page (int): Number of rows in every page.
+            num_columns (int): Number of columns in every row.
+            latency (float): Seconds every response is delayed by.
+            upload_bandwidth (float): Bytes per second accepted per upload, or None for no
+            limit.
+            query_latency (float): Seconds a query run reports itself as running.
+            compression (str): Content encoding of responses, gzip or zstd, or None.
+        """
+        self.total_pages = total_pages
+        self.rows_per_page = rows_per_page
+        self.num_columns = num_columns
+        self.latency = latency
+        self.upload_bandwidth = upload_bandwidth
+        self.query_latency = query_latency
+        self.compression = compression
+        self.uploaded_bytes = {}
+        self.request_count = 0
+        self.poll_count = 0
+        self._run_started_at = {}
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        """
+        Returns the root URL of the server.
+        """
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def endpoint_url(self):
+        """
+        Returns the URL of the API endpoint.
+        """
+        return self.base_url + "/v1/results/1"
+
+    @property
+    def api_url(self):
+        """
+        Returns the root URL of the account and project API routes.
+        """
+        return self.base_url + "/api/"
+
+    def point_project(self, project):
+        """
+        Points the API routes of a Project at this server.
+
+        Parameters:
+            project (Project): The project to point at the server.
+        """
+        project.QUERY_BARRELS = self.api_url + "queryBarrels"
+        project.QUERY_RUN_PAGE = self.api_url + "queryResults"
+        project.DATA_SOURCE_PAGE = self.api_url + "dataSource"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def endpoint_page(self, page, page_url=None):
+        """
+        Returns the JSON body of an API endpoint page.
+
+        Parameters:
+            page (int): Number of the page, starting at 1.
+            page_url (str): URL the pages are served at. Defaults to the API endpoint.
+
+        Returns:
+            dict: The API response.
+        """
+        page_url = page_url or self.endpoint_url
+        first_row = (page - 1) * self.rows_per_page
+        results = [[str(row)] + [f"value {row}-{col}" for col in range(1, self.num_columns)]
+                   for row in range(first_row, first_row + self.rows_per_page)]
+        summary = {
+            'columnNames': [f"col_{col}" for col in range(self.num_columns)],
+            'dataTypes': ['VARCHAR'] * self.num_columns,
+            'rowsPerPage': self.rows_per_page,
+            'totalNumRows': self.rows_per_page * self.total_pages,
+            'page': page,
+            'totalPages': self.total_pages,
+        }
+        if page < self.total_pages:
+            summary['nextPage'] = f"{page_url}?page={page + 1}"
+        return {'results': results, 'summary': summary}
+
+    def query_results_page(self, run_token, page):
+        """
+        Returns the JSON body of a page of the results of a completed query run.
+
+        Parameters:
+            run_token (int): Token of the query run.
+            page (int): Number of the page, starting at 1.
+
+        Returns:
+            dict: The queryResults response.
+        """
+        response_json = self.endpoint_page(page, f"{self.api_url}queryResults/{run_token}")
+        response_json['queryRun'] = {'status': 'complete', 'token': run_token}
+        return response_json
+
+    def _get_body(self, key, make_response):
+        """
+        Returns an encoded response body, encoding it on first use.
+        """
+        body = self._bodies.get(key)
+        if body is None:
+            body = json.dumps(make_response()).encode('utf-8')
+            self._bodies[key] = body
+        return body
+
+    def _compress(self, body):
+        """
+        Returns a body compressed with the compression of the server, reusing the compressed
+        page bodies.
+        """
+        # the body is kept with its compressed form, so its id is not reused while cached
+        key = ('compressed', id(body))
+        cached = self._bodies.get(key)
+        if cached is not None and cached[0] is body:
+            return cached[1]
+        if self.compression == 'zstd':
+            import zstandard  # pylint: disable=import-outside-toplevel
+            compressed = zstandard.ZstdCompressor().compress(body)
+        else:
+            compressed = gzip.compress(body, compresslevel=6)
+        self._bodies[key] = (body, compressed)
+        return compressed
+
+    def _route_get(self, path, page):
+        """
+        Returns the encoded body of a GET request.
+
+        Parameters:
+            path (str): Path of the request.
+            page (int): Page number from the query string.
+
+        Returns:
+            bytes: The response body.
+        """
+        parts = path.strip('/').split('/')
+        if parts[:2] == ['api', 'queryBarrels'] and len(parts) == 6 and parts[5] == 'run':
+            with self._lock:
+                run_token = len(self._run_started_at) + 1
+                self._run_started_at[run_token] = time.monotonic()
+            return json.dumps({'requestToken': run_token}).encode('utf-8')
+        if parts[:2] == ['api', 'queryBarrels']:
+            barrel_token = int(parts[2])
+            return json.dumps({'queryBarrel': {'token': barrel_token, 'queries': [
+                {'token': barrel_token + 1, 'queryBarrelToken': barrel_token,
+                 'query': 'SELECT * FROM benchmark'}]}}).encode('utf-8')
+        if parts[:2] == ['api', 'queryResults']:
+            run_token = int(parts[2])
+            with self._lock:
+                self.poll_count += 1
+                started_at = self._run_started_at[run_token]
+            if time.monotonic() - started_at < self.query_latency:
+                return json.dumps({'queryRun': {'status': 'running', 'token': run_token}}) \
+                    .encode('utf-8')
+            return self._get_body(('results', run_token, page),
+                                  lambda: self.query_results_page(run_token, page))
+        return self._get_body(('endpoint', page), lambda: self.endpoint_page(page))
+
+    def _make_handler(self):
+        """
+        Returns the request handler class bound to this server.
+        """
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Request handler for the mock DataDistillr server.
+            """
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """
+                Serves API endpoint pages.
+                """
+                with server._lock:  # pylint: disable=protected-access
+                    server.request_count += 1
+                time.sleep(server.latency)
+
+                split_url = urlsplit(self.path)
+                page = int(parse_qs(split_url.query).get('page', ['1'])[0])
+                self._send_body(server._route_get(  # pylint: disable=protected-access
+                    split_url.path, page), compress=True)
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """
+                Hands out one presigned url per file of a data source upload request.
+                """
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                presigned_urls = [f"{server.base_url}/uploads/{file['name']}?X-Amz-Expires=30"
+                                  for file in body['files']]
+                self._send_json({'presignedUrls': presigned_urls})
+
+            def do_PUT(self):  # pylint: disable=invalid-name
+                """
+                Accepts an upload, reading the body at the configured bandwidth.
+                """
+                remaining = int(self.headers['Content-Length'])
+                received = 0
+                start = time.perf_counter()
+                while remaining > 0:
+                    block = self.rfile.read(min(remaining, 65536))
+                    if not block:
+                        break
+                    received += len(block)
+                    remaining -= len(block)
+                    if server.upload_bandwidth:
+                        delay = received / server.upload_bandwidth - (time.perf_counter() - start)
+                        if delay > 0:
+                            time.sleep(delay)
+                with server._lock:  # pylint: disable=protected-access
+                    server.uploaded_bytes[urlsplit(self.path).path] = received
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def _send_json(self, response_json):
+                """
+                Sends a JSON response.
+                """
+                self._send_body(json.dumps(response_json).encode('utf-8'))
+
+            def _send_body(self, body, compress=False):
+                """
+                Sends an encoded JSON response, compressed if the client accepts the
+                compression of the server.
+                """
+                accepted = [encoding.strip() for encoding in
+                            self.headers.get('Accept-Encoding', '').split(',')]
+                self.send_response(200)
+                if compress and server.compression in accepted:
+                    body = server._compress(body)  # pylint: disable=protected-access
+                    self.send_header('Content-Encoding', server.compression)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                """
+                Silences request logging.
+                """
+
+        return Handler
@@ -0,0 +1,266 @@
+"""
+Runs the benchmark suite against a local mock DataDistillr server and reports pages/s, rows/s,
+MB/s, peak memory and end-to-end latency for every scenario. MB counts decoded response and
+upload bytes, and wire MB the response bytes as transferred, which differ with --compression.
+Results can be saved as JSON and compared with the results of an earlier run, e.g. of the
+previous release.
+
+Every scenario runs once to warm up the server and the connection pool, then repeat times with
+the best time kept, and once more under tracemalloc to measure the peak memory allocated by
+Python and NumPy (memory held by pyarrow is not traced).
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+from datadistillr import Datadistillr, collect_metrics
+from datadistillr.polling import PollingStrategy
+from datadistillr.project import Project
+from datadistillr.session import DatadistillrSession
+from benchmarks.bench_upload import write_csv_files
+from benchmarks.mock_server import MockDatadistillrServer
+
+# metrics compared between runs, and whether a higher value is better
+COMPARED_METRICS = (("seconds", False), ("pages_per_s", True), ("rows_per_s", True),
+                    ("mb_per_s", True), ("peak_mb", False))
+
+
+def _make_project(server, config):
+    """
+    Returns a Project whose routes point at the mock server.
+    """
+    project = Project({'name': 'benchmark', 'token': 1}, DatadistillrSession(),
+                      polling=PollingStrategy(first_interval=config.poll_interval), lazy=True)
+    server.point_project(project)
+    return project
+
+
+def get_dataframe(server, config):
+    """
+    Downloads the API endpoint one page at a time.
+    """
+    del config
+    return len(Datadistillr.get_dataframe(server.endpoint_url, "api key"))
+
+
+def get_dataframe_concurrent(server, config):
+    """
+    Downloads the API endpoint with concurrent page requests.
+    """
+    return len(Datadistillr.get_dataframe(server.endpoint_url, "api key",
+                                          max_workers=config.workers))
+
+
+def execute_existing_query(server, config):
+    """
+    Runs a query, polls it until it completes and collects every page of its results.
+    """
+    return len(_make_project(server, config).execute_existing_query(1))
+
+
+def execute_existing_queries(server, config):
+    """
+    Runs the queries of several tabs at once with the query scheduler.
+    """
+    project = _make_project(server, config)
+    results = dict(project.execute_existing_queries(range(1, config.tabs + 1)))
+    return sum(len(data_frame) for data_frame in results.values())
+
+
+def upload_files(server, config):
+    """
+    Uploads the generated CSV files to a data source.
+    """
+    _make_project(server, config).upload_files(1, config.file_paths, max_workers=config.workers)
+    return 0
+
+
+# scenarios as (name, function, whether the server delays query runs)
+SCENARIOS = (
+    ("get_dataframe", get_dataframe, False),
+    ("get_dataframe_concurrent", get_dataframe_concurrent, False),
+    ("execute_existing_query", execute_existing_query, True),
+    ("execute_existing_queries", execute_existing_queries, True),
+    ("upload_files", upload_files, False),
+)
+
+
+def run_scenario(function, server, config):
+    """
+    Runs one scenario and returns its metrics.
+
+    Parameters:
+        function (function): The scenario, returning the number of rows it received.
+        server (MockDatadistillrServer): Server the scenario runs against.
+        config (argparse.Namespace): Configuration of the suite.
+
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    function(server, config)
+
+    runs = []
+    for _ in range(config.repeat):
+        with collect_metrics() as metrics:
+            start = time.perf_counter()
+            rows = function(server, config)
+            seconds = time.perf_counter() - start
+        runs.append((seconds, rows, dict(metrics.counters)))
+
+    tracemalloc.start()
+    try:
+        function(server, config)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds, rows, counters = min(runs, key=lambda run: run[0])
+    pages = counters.get('pages_total', 0)
+    # responses are counted after decompression
+    transferred = counters.get('decoded_bytes_total', 0) + counters.get('uploaded_bytes_total', 0)
+    return {
+        'seconds': seconds,
+        'requests': counters.get('requests_total', 0),
+        'polls': counters.get('polls_total', 0),
+        'pages': pages,
+        'rows': rows,
+        'mb': transferred / 1024 ** 2,
+        'wire_mb': counters.get('wire_bytes_received_total', 0) / 1024 ** 2,
+        'pages_per_s': pages / seconds,
+        'rows_per_s': rows / seconds,
+        'mb_per_s': transferred / 1024 ** 2 / seconds,
+        'peak_mb': peak_bytes / 1024 ** 2,
+        'decode_seconds': counters.get('decode_seconds_sum', 0.0),
+    }
+
+
+def run(config):
+    """
+    Runs every selected scenario and prints one line per scenario.
+
+    Parameters:
+        config (argparse.Namespace): Configuration of the suite.
+
+    Returns:
+        dict: The results of the suite.
+    """
+    try:
+        version = metadata.version('datadistillr')
+    except metadata.PackageNotFoundError:
+        version = 'unknown'
+    results = {
+        'label': config.label or version,
+        'version': version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'config': {key: value for key, value in vars(config).items()
+                   if key not in ('file_paths', 'output', 'compare')},
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':<26} {'seconds':>8} {'pages/s':>9} {'rows/s':>10} {'MB/s':>8} "
+          f"{'wire MB':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.file_paths = write_csv_files(tmp_dir, config.files, int(config.file_mb * 1024 ** 2))
+        for name, function, delays_queries in SCENARIOS:
+            if config.scenarios and name not in config.scenarios:
+                continue
+            with MockDatadistillrServer(
+                    total_pages=config.pages, rows_per_page=config.rows_per_page,
+                    num_columns=config.columns, latency=config.latency,
+                    query_latency=config.query_latency if delays_queries else 0.0,
+                    compression=config.compression) as server:
+                metrics = run_scenario(function, server, config)
+            results['scenarios'][name] = metrics
+            print(f"{name:<26} {metrics['seconds']:>8.3f} {metrics['pages_per_s']:>9.1f} "
+                  f"{metrics['rows_per_s']:>10.0f} {metrics['mb_per_s']:>8.1f} "
+                  f"{metrics['wire_mb']:>8.1f} {metrics['peak_mb']:>8.1f}")
+    return results
+
+
+def compare(results, baseline):
+    """
+    Prints the change of every compared metric from a baseline run.
+
+    Parameters:
+        results (dict): The results of this run.
+        baseline (dict): The results of the baseline run.
+    """
+    print(f"\ncompared with {baseline['label']} ({baseline['created']})")
+    print(f"{'scenario':<26} {'metric':<12} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metrics in results['scenarios'].items():
+        baseline_metrics = baseline['scenarios'].get(name)
+        if baseline_metrics is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            before, after = baseline_metrics.get(metric), metrics[metric]
+            if not before:
+                continue
+            change = after / before - 1
+            # changes within 5% are treated as noise
+            marker = ' '
+            if abs(change) > 0.05:
+                marker = '+' if (change > 0) == higher_is_better else '-'
+            print(f"{name:<26} {metric:<12} {before:>10.2f} {after:>10.2f} "
+                  f"{change:>7.1%}{marker}")
+
+
+def _positive_int(value):
+    """
+    Parses a command line argument that must be a positive integer.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def main():
+    """
+    Parses command line arguments and runs the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=[name for name, _, _ in SCENARIOS])
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rows-per-page', type=int, default=1000)
+    parser.add_argument('--columns', type=int, default=6)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help="seconds every response is delayed by")
+    parser.add_argument('--query-latency', type=float, default=0.5,
+                        help="seconds a query run reports itself as running")
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--compression', choices=['gzip', 'zstd'],
+                        help="content encoding the server compresses responses with")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--tabs', type=int, default=4)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--file-mb', type=float, default=8)
+    parser.add_argument('--repeat', type=_positive_int, default=3,
+                        help="timed runs of every scenario, the fastest is reported")
+    parser.add_argument('--label', help="name of this run, defaults to the package version")
+    parser.add_argument('--output', help="file to save the results to as JSON")
+    parser.add_argument('--compare', help="results of an earlier run to compare with")
+    config = parser.parse_args()
+
+    results = run(config)
+    if config.output:
+        with open(config.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    if config.compare and os.path.exists(config.compare):
+        with open(config.compare, encoding='utf-8') as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
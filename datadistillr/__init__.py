@@ -4,3 +4,12 @@ Initializes datadistillr package.
 from .datadistillr import Datadistillr
 from .datadistillr_account import DatadistillrAccount
 from .auth_exceptions import AuthorizationException
+from .session import DatadistillrSession
+from .resilience import CircuitBreaker, CircuitOpenError, RateLimiter, RetryPolicy
+from .polling import PollingStrategy
+from .paging import PageSizePolicy
+from .json_backend import get_json_backend, set_json_backend
+from .instrumentation import InstrumentationHook, LoggingHook, MetricsCollector, \
+    OpenTelemetryHook, add_hook, collect_metrics, remove_hook
+from .result_cache import ResultCache
+from .aio import AsyncDatadistillrAccount, AsyncProject
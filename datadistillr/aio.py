@@ -0,0 +1,757 @@
+"""
+This file defines asyncio variants of the DatadistillrAccount and Project classes. They send
+requests with aiohttp, which is an optional dependency (pip install datadistillr[async]), and
+wait for running queries with asyncio.sleep, so one event loop can drive many query runs at once.
+"""
+
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from datadistillr import instrumentation, json_backend, transfer
+from datadistillr.checkpoint import UploadCheckpoint
+from datadistillr.base import AccountBase, ProjectBase
+from datadistillr.resilience import RetryPolicy
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+async def _request_json(session, method, url, verify=True, retry=None, idempotent=None,
+                        **kwargs):
+    """
+    Sends a request and returns its decoded JSON body. Connection errors and retryable
+    statuses are retried as set by the retry policy, waiting with asyncio.sleep. Every attempt
+    and retry is reported to the instrumentation hooks.
+
+    Sessions created by the SDK do not decompress responses, so the body is decompressed here
+    and its size on the wire is known. Other sessions decompress the encodings they accept.
+
+    Parameters:
+        session (aiohttp.ClientSession): Session sending the request.
+        method (str): HTTP method.
+        url (str): URL of the request.
+        verify (bool): Whether to verify the TLS certificate of the server.
+        retry (RetryPolicy): Policy for retrying failed requests. Defaults to RetryPolicy().
+        idempotent (bool): Whether the request may be sent twice, or None to decide by its
+        method, see RetryPolicy.can_retry().
+
+    Raises:
+        aiohttp.ClientResponseError: If the status of the response is an error, e.g. a 503 that
+        was still failing after the retries.
+
+    Returns:
+        json: The decoded response body.
+    """
+    ssl = None if verify else False
+    retry = retry if retry is not None else DEFAULT_RETRY
+    attempt = 0
+    while True:
+        try:
+            response, body = await _read_response(session, method, url, attempt, ssl=ssl,
+                                                  **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as request_error:
+            if not retry.can_retry(method, attempt, idempotent=idempotent):
+                raise
+            delay = retry.get_delay(attempt)
+            status, error = None, type(request_error).__name__
+        else:
+            if response.status not in retry.retry_statuses or \
+                    not retry.can_retry(method, attempt, response.status, idempotent):
+                response.raise_for_status()
+                return json_backend.decode(body) if body.strip() else None
+            delay = retry.get_delay(attempt, response.headers.get("Retry-After"))
+            status, error = response.status, None
+        instrumentation.emit("retry", method=method, url=url, attempt=attempt, delay=delay,
+                             status=status, error=error)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _read_response(session, method, url, attempt, **kwargs):
+    """
+    Sends one attempt of a request and reads its body, reporting the attempt to the
+    instrumentation hooks.
+
+    Parameters:
+        session (aiohttp.ClientSession): Session sending the request.
+        method (str): HTTP method.
+        url (str): URL of the request.
+        attempt (int): Number of retries made before this attempt.
+
+    Returns:
+        tuple: The response, which is released already, and its decompressed body.
+    """
+    start = time.perf_counter()
+    try:
+        async with session.request(method, url, **kwargs) as response:
+            ttfb = time.perf_counter() - start
+            wire_body = await response.read()
+            body = wire_body
+            if not session.auto_decompress:
+                body = transfer.decompress(wire_body, response.headers.get("Content-Encoding"))
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as request_error:
+        instrumentation.emit("request", method=method, url=url, status=None,
+                             attempt=attempt, seconds=time.perf_counter() - start, ttfb=None,
+                             body_seconds=None, bytes_sent=None, bytes_received=None,
+                             wire_bytes=None, error=type(request_error).__name__)
+        raise
+    seconds = time.perf_counter() - start
+    bytes_sent = response.request_info.headers.get("Content-Length")
+    instrumentation.emit("request", method=method, url=url, status=response.status,
+                         attempt=attempt, seconds=seconds, ttfb=ttfb, body_seconds=seconds - ttfb,
+                         bytes_sent=int(bytes_sent) if bytes_sent else 0,
+                         bytes_received=len(body), wire_bytes=len(wire_body), error=None)
+    return response, body
+
+
+def _make_trace_config():
+    """
+    Returns an aiohttp trace config reporting the time spent resolving hosts and opening
+    connections to the instrumentation hooks, as connection events.
+
+    Returns:
+        aiohttp.TraceConfig: The trace config.
+    """
+
+    async def on_request_start(_session, context, params):
+        context.url = str(params.url)
+        context.dns_seconds = None
+
+    async def on_dns_resolvehost_start(_session, context, _params):
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(_session, context, _params):
+        context.dns_seconds = time.perf_counter() - context.dns_start
+
+    async def on_connection_create_start(_session, context, _params):
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(_session, context, _params):
+        instrumentation.emit("connection", url=context.url, dns_seconds=context.dns_seconds,
+                             connect_seconds=time.perf_counter() - context.connect_start)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+class AsyncDatadistillrAccount(AccountBase):
+    """
+    This is a class for getting account level data from Datadistillr account with asyncio.
+    Create it with the create() class method, or use it as an async context manager:
+
+        async with AsyncDatadistillrAccount(email, password) as account:
+            projects = await account.get_projects()
+
+    Attributes:
+        email (string): The email linked to Datadistillr account.
+        password (string): The password linked to Datadistillr account.
+        polling (PollingStrategy): Strategy used by projects to poll for query results.
+        result_cache (ResultCache): On-disk cache of query results shared by projects, or None.
+        page_size (int or PageSizePolicy): Number of rows projects request per page of query
+        results, or None for the page size of the server.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, email, password, session=None, polling=None, limit=100,
+                 result_cache=None, page_size=None):
+        """
+        The constructor for the AsyncDatadistillrAccount class. It does not log in, call
+        login() before using the account.
+
+        Parameters:
+            email (string): The email linked to Datadistillr account.
+            password (string): The password linked to Datadistillr account.
+            session (aiohttp.ClientSession): Session to send requests with. A new session is
+            created on login if not given.
+            polling (PollingStrategy): Strategy used by projects to poll for query results.
+            limit (int): Maximum number of simultaneous connections of a new session.
+            result_cache (ResultCache): On-disk cache of query results shared by projects, or
+            None.
+            page_size (int or PageSizePolicy): Number of rows projects request per page of query
+            results, or a PageSizePolicy adapting it.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncDatadistillrAccount requires aiohttp, install it with "
+                              "pip install datadistillr[async]")
+        super().__init__(email, password, result_cache, page_size)
+        self.session = session
+        self.polling = polling
+        self.limit = limit
+
+    @classmethod
+    async def create(cls, email, password, **kwargs):
+        """
+        Creates an account and logs in.
+
+        Parameters:
+            email (string): The email linked to Datadistillr account.
+            password (string): The password linked to Datadistillr account.
+
+        Returns:
+            AsyncDatadistillrAccount: The logged in account.
+        """
+        account = cls(email, password, **kwargs)
+        await account.login()
+        return account
+
+    async def __aenter__(self):
+        await self.login()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def login(self):
+        """
+        Login and authenticate to DataDistillr.
+
+        Returns:
+            json: A json containing account details and login status.
+        """
+
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.limit)
+            self.session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[_make_trace_config()],
+                headers={"Accept-Encoding": transfer.get_accept_encoding()},
+                auto_decompress=False)
+        self.login_resp_json = await self._login()
+        self.is_logged_in = self.login_resp_json["loggedIn"]
+        return self.login_resp_json
+
+    async def _login(self):
+        """
+        Sends the login request.
+
+        Returns:
+            json: A json containing account details and login status.
+        """
+
+        return await _request_json(self.session, "POST", self.LOGIN_PAGE,
+                                   json=self._get_login_details(), verify=False)
+
+    async def close(self):
+        """
+        Closes the session of the account.
+        """
+
+        if self.session is not None:
+            await self.session.close()
+
+    async def logout(self):
+        """
+        Log user out of DataDistillr account.
+
+        Returns:
+            json: A json containing account details and login status.
+        """
+
+        logout_resp_json = await _request_json(self.session, "GET", self.LOGOUT_PAGE,
+                                               verify=False)
+        self.is_logged_in = logout_resp_json["loggedIn"]
+        return logout_resp_json
+
+    async def get_project_token_dict(self):
+        """
+        Returns dictionary with project tokens as keys and project names as values.
+
+        Returns:
+            dictionary (int -> str): dictionary with project token as key and project name as value.
+        """
+
+        if not self.is_logged_in:
+            raise Exception("login is incorrect")
+
+        proj_resp_json = await _request_json(self.session, "GET", self._get_projects_page(),
+                                             verify=False)
+        for proj in proj_resp_json["projects"]:
+            self.proj_token_dict[proj["token"]] = proj["name"]
+        return self.proj_token_dict
+
+    async def get_project_token(self, project_name):
+        """
+        Returns project token that matches project_name
+
+        Returns:
+            int: project token
+        """
+
+        proj_token_dict = await self.get_project_token_dict()
+        for token, name in proj_token_dict.items():
+            if project_name == name:
+                return token
+        raise Exception("token not found")
+
+    async def get_project(self, project_token):
+        """
+        Returns individual project object.
+
+        Parameters:
+            project_token (int): Token that uniquely identifies project.
+
+        Returns:
+            AsyncProject: A project object.
+        """
+
+        if not self.is_logged_in:
+            raise Exception("login is incorrect")
+
+        project_details_page = self.PROJECT_DISTILLRY + "/" + str(project_token)
+        project_details = await _request_json(self.session, "GET", project_details_page)
+        return AsyncProject(project_details['project'], self.session, polling=self.polling,
+                            result_cache=self.result_cache, page_size=self.page_size)
+
+    async def get_projects(self, max_workers=8):
+        """
+        Returns all projects in DataDistillr account. Up to max_workers project details are
+        fetched concurrently.
+
+        Parameters:
+            max_workers (int): Maximum number of project details downloaded at once.
+
+        Returns:
+            list<AsyncProject>: A list of project objects.
+        """
+
+        if not self.is_logged_in:
+            raise Exception("login is incorrect")
+
+        project_tokens = (await self.get_project_token_dict()).keys()
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get_project(project_token):
+            async with semaphore:
+                return await self.get_project(project_token)
+
+        return list(await asyncio.gather(*(get_project(project_token)
+                                           for project_token in project_tokens)))
+
+    async def get_organizations(self):
+        """
+        Returns all organizations that the user has access to.
+
+        Returns:
+            list: A list of organizations that the user has access to.
+        """
+
+        if not self.is_logged_in:
+            raise Exception("login is incorrect")
+
+        organizations_resp_json = await _request_json(self.session, "GET",
+                                                      self.ORGANIZATIONS_LIST, verify=False)
+        return organizations_resp_json["organizations"]
+
+
+class AsyncProject(ProjectBase):
+    """
+    This is a class for getting project level data with asyncio. Tab lookups are shared with
+    Project; every method that sends a request is a coroutine.
+
+    Attributes:
+        proj_details (json): json containing details of project.
+        polling (PollingStrategy): Strategy used to poll for the results of running queries.
+    """
+
+    def __init__(self, proj_details, _curr_session, polling=None, result_cache=None,
+                 page_size=None):
+        """
+        The constructor for the AsyncProject class. The project details are kept for the
+        lifetime of the object, since tab lookups are synchronous.
+
+        Parameters:
+            proj_details (JSON): JSON containing details of project.
+            _curr_session (aiohttp.ClientSession): Session to send requests with.
+            polling (PollingStrategy): Strategy used to poll for the results of running
+            queries. Defaults to PollingStrategy().
+            result_cache (ResultCache): On-disk cache of query results, or None.
+            page_size (int or PageSizePolicy): Number of rows requested per page of query
+            results, or a PageSizePolicy adapting it to the latency of the pages.
+        """
+        super().__init__(proj_details, _curr_session, polling, result_cache, page_size)
+        self._details = self._index_details(proj_details)
+
+    def _get_details(self):
+        """
+        Returns the project details the project was created with.
+
+        Returns:
+            tuple: The project details, dictionary from tab tokens to names, and dictionary from
+            tab names to tokens.
+        """
+
+        return self._details
+
+    async def _get_recent_query(self, barrel_token):
+        """
+        Returns the most recent query in query barrel.
+
+        Parameters:
+            barrel_token (int): Token that uniquely identifies query barrel.
+
+        Returns:
+            dict: The most recent query, with its token under token and its SQL statement
+            under query.
+        """
+
+        queries_page = self.QUERY_BARRELS + "/" + str(barrel_token)
+        queries_response_json = await _request_json(self.session, "GET", queries_page)
+        return queries_response_json["queryBarrel"]["queries"][-1]
+
+    async def _get_recent_query_token(self, barrel_token):
+        """
+        Returns token of most recent query in query barrel.
+
+        Parameters:
+            barrel_token (int): Token that uniquely identifies query barrel.
+
+        Returns:
+            int: Token of most recent query in query barrel.
+        """
+
+        return (await self._get_recent_query(barrel_token))["token"]
+
+    async def _poll_query_results(self, url_endpoint, polling_state):
+        """
+        Requests url_endpoint until the query run is no longer running, waiting between polls
+        without blocking the event loop.
+
+        Parameters:
+            url_endpoint (str): API endpoint for query data
+            polling_state (PollingState): State of the polling run.
+
+        Raises:
+            TimeoutError: If the query is still running after the polling deadline.
+
+        Returns:
+            dict: The response of the first poll where the query is not running.
+        """
+
+        polling_state.start_page()
+        while True:
+            start = time.monotonic()
+            response_data = await _request_json(self.session, "GET", url_endpoint)
+            status = response_data['queryRun']['status']
+            latency = time.monotonic() - start
+            polling_state.record(latency, status)
+            instrumentation.emit("poll", url=url_endpoint, status=status, seconds=latency)
+
+            if status != 'running':
+                return response_data
+            await asyncio.sleep(polling_state.next_delay())
+
+    async def _iter_query_result_pages(self, url_endpoint, polling_state, sizing=None):
+        """
+        Yields every page of the results of a query run, following summary.nextPage.
+
+        Parameters:
+            url_endpoint (str): API endpoint for the first page of query data
+            polling_state (PollingState): State of the polling run.
+            sizing (PageSizeState): Page size state choosing the size of every page, or None.
+
+        Returns:
+            async generator<dict>: The response of every page.
+        """
+
+        if sizing is not None and not sizing.pages:
+            url_endpoint = sizing.get_first_url(url_endpoint)
+        while url_endpoint is not None:
+            response_data = await self._poll_query_results(url_endpoint, polling_state)
+            if response_data['queryRun']['status'] != 'complete':
+                raise Exception('server response is', response_data)
+
+            if instrumentation.is_enabled():
+                instrumentation.emit("page", url=url_endpoint,
+                                     page=response_data['summary'].get('page'),
+                                     rows=len(response_data['results']))
+            url_endpoint = self._get_next_result_page(response_data, polling_state, sizing)
+            yield response_data
+
+    async def _get_query_results(self, url_endpoint, polling_state=None, first_page=None,
+                                 sizing=None):
+        """
+        Returns results of previously ran query.
+
+        Parameters:
+            url_endpoint (str): API endpoint for query data
+            polling_state (PollingState): State of the polling run.
+            first_page (dict): Response for the first page of query data if it was already
+            polled, in which case collecting continues with its next page.
+            sizing (PageSizeState): Page size state of the download, which first_page was
+            requested with. A new one is started from the project page size if not given.
+
+        Returns:
+            dict: Rows of the query results under data and the summary under summary.
+        """
+
+        polling_state, sizing = self._start_download(polling_state, sizing)
+        result_buffer, url_endpoint = self._start_result_buffer(url_endpoint, first_page,
+                                                                polling_state, sizing)
+        async for response_data in self._iter_query_result_pages(url_endpoint, polling_state,
+                                                                 sizing):
+            result_buffer.add_page(response_data)
+        return result_buffer.get_results()
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    async def _execute_query(self, barrel_token, query_token, dtype_backend=None,
+                             categories=None, query_text=None):
+        """
+        Executes query. Execute means to run query and get results of query. With a result
+        cache and the query text, a cached result of the same query is returned instead.
+
+        Parameters:
+            barrel_token (int): Token the uniquely identifies query barrel.
+            query_token (int): Token the uniquely identifies query in query barrel.
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+            query_text (str): SQL statement of the query, used to key the result cache.
+
+        Returns:
+            pandas dataframe: Formatted results of query.
+        """
+
+        cache_key = self._get_result_cache_key(barrel_token, query_token, query_text,
+                                               dtype_backend, categories)
+        if cache_key is not None:
+            data_frame = self.result_cache.get(cache_key)
+            if data_frame is not None:
+                return data_frame
+
+        query_run_page = self._get_query_run_page(barrel_token, query_token)
+        # every GET of the page starts another run, so it is not retried
+        query_run_json = await _request_json(self.session, "GET", query_run_page,
+                                             idempotent=False)
+        query_results = self.QUERY_RUN_PAGE + "/" + str(query_run_json["requestToken"])
+        results = await self._get_query_results(query_results)
+
+        return self._build_query_dataframe(results, dtype_backend, categories, cache_key)
+
+    async def execute_existing_query(self, tab_token, dtype_backend=None, categories=None):
+        """
+        Executes most recent query in a tab. The tab is identified by tab_token.
+
+        Parameters:
+            tab_token: Token the uniquely identifies query barrel.
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+
+        Returns:
+            pandas dataframe: Formatted results of query.
+        """
+
+        query = await self._get_recent_query(tab_token)
+        return await self._execute_query(tab_token, query["token"], dtype_backend, categories,
+                                         query.get("query"))
+
+    async def execute_existing_queries(self, tab_tokens, max_concurrent=8, dtype_backend=None,
+                                       categories=None):
+        """
+        Executes the most recent query of many tabs at once and yields the results as they
+        complete. Up to max_concurrent queries run at a time, and the event loop polls all of
+        them, see Project.execute_existing_queries().
+
+        Parameters:
+            tab_tokens (iterable): Tokens that uniquely identify query barrels.
+            max_concurrent (int): Maximum number of queries running at once.
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+
+        Returns:
+            async generator<tuple>: The tab token and the pandas dataframe of every query, in
+            the order the queries complete.
+        """
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def execute(tab_token):
+            async with semaphore:
+                return tab_token, await self.execute_existing_query(tab_token, dtype_backend,
+                                                                    categories)
+
+        tasks = [asyncio.ensure_future(execute(tab_token)) for tab_token in tab_tokens]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def execute_new_query(self, tab_name, query, dtype_backend=None, categories=None):
+        """
+        Creates new tab named tab_name and executes query in tab.
+
+        Parameters:
+            tab_name (str): Name of new tab
+            query (str): SQL statement to be run in tab.
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+
+        Returns:
+            pandas dataframe: Formatted results of query.
+        """
+
+        query_barrel_resp_json = await _request_json(
+            self.session, "POST", self.QUERY_BARRELS,
+            json=self._get_new_query_barrel_details(tab_name, query), verify=False)
+        barrel_token = query_barrel_resp_json["queryBarrel"]["queries"][0]["queryBarrelToken"]
+        query_token = query_barrel_resp_json["queryBarrel"]["queries"][0]["token"]
+        return await self._execute_query(barrel_token, query_token, dtype_backend, categories)
+
+    async def get_data_source_token_dict(self):
+        """
+        Returns dictionary with data source tokens as keys and data source names as values.
+
+        Returns:
+            dictionary (int -> str): Dictionary with data source tokens as keys and data source
+            names as values.
+        """
+
+        get_data_sources = self.PROJECT_PAGE + "/" + str(self.project_token) + "/dataSource"
+        data_sources_response_json = await _request_json(self.session, "GET", get_data_sources)
+        for data_source in data_sources_response_json["dataSources"]:
+            self.data_source_token_dict[data_source["token"]] = data_source["name"]
+        return self.data_source_token_dict
+
+    async def get_data_source_token(self, data_source_name):
+        """
+        Returns data source token that matches data_source_name
+
+        Returns:
+            int: data source token
+        """
+
+        data_source_token_dict = await self.get_data_source_token_dict()
+        for token, name in data_source_token_dict.items():
+            if data_source_name == name:
+                return token
+        raise Exception("token not found")
+
+    async def _get_presigned_urls(self, data_source_token, sources):
+        """
+        Returns list of AWS presigned urls for each upload source in list of upload sources
+
+        Returns:
+            array (str): list of presigned urls
+        """
+
+        post_data_source = self.DATA_SOURCE_PAGE + "/" + str(data_source_token) + "/file"
+        response_json = await _request_json(self.session, "POST", post_data_source,
+                                            json=self._get_upload_details(sources),
+                                            verify=False)
+        return response_json["presignedUrls"]
+
+    async def _upload_file(self, presigned_url, source):
+        """
+        Uploads one file to a presigned url, streaming it from disk. The content length is set
+        explicitly because aiohttp cannot tell the size of data held in memory and would send it
+        chunked.
+
+        Parameters:
+            presigned_url (str): Presigned url to upload the file to.
+            source (UploadSource): Upload source of the file.
+        """
+
+        headers = dict(source.get_headers(), **{'content-length': str(source.size)})
+        start = time.perf_counter()
+        with source.open() as file:
+            async with self.session.put(presigned_url, data=file, headers=headers) as response:
+                if not response.ok:
+                    raise Exception("file not uploaded")
+        instrumentation.emit("upload", name=source.file_path or source.name, bytes=source.size,
+                             seconds=time.perf_counter() - start)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    async def upload_files(self, data_source_token, file_paths, max_workers=4,
+                           checkpoint_path=None, compression=None, compression_level=None):
+        """
+        Uploads list of files to a data source. Up to max_workers files are uploaded at
+        once. With a checkpoint_path, files recorded as uploaded by an earlier run are skipped,
+        and with a compression files are compressed before they are uploaded, see
+        Project.upload_files().
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            file_paths (array): List of absolute file paths of files to be uploaded.
+            max_workers (int): Maximum number of files uploaded at once.
+            checkpoint_path (str): Path of a file recording finished uploads.
+            compression (str): None, 'gzip' or 'zstd'.
+            compression_level (int): Compression level, None for the default.
+
+        Returns:
+            str: A success message if all files were uploaded.
+        """
+
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = UploadCheckpoint(checkpoint_path)
+            file_paths = [file_path for file_path in file_paths
+                          if not checkpoint.is_uploaded(data_source_token, file_path)]
+            if not file_paths:
+                return 'file uploaded successfully'
+
+        # compressing is CPU bound, so it runs in a thread to keep the event loop free
+        sources = await asyncio.get_running_loop().run_in_executor(
+            None, self._get_upload_sources, file_paths, compression, compression_level)
+        return await self._upload_sources(data_source_token, sources, max_workers, checkpoint)
+
+    async def upload_data(self, data_source_token, data, max_workers=4, row_group_size=100000):
+        """
+        Uploads DataFrames, Arrow tables or iterables of rows to a data source as Parquet
+        files, see Project.upload_data().
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            data (dict): File names mapped to a DataFrame, an Arrow table or an iterable of
+                DataFrames or of rows as dictionaries.
+            max_workers (int): Maximum number of files uploaded at once.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            str: A success message if all files were uploaded.
+        """
+
+        # serializing is CPU bound, so it runs in a thread to keep the event loop free
+        sources = await asyncio.get_running_loop().run_in_executor(
+            None, self._get_data_upload_sources, data, row_group_size)
+        return await self._upload_sources(data_source_token, sources, max_workers)
+
+    async def _upload_sources(self, data_source_token, sources, max_workers, checkpoint=None):
+        """
+        Requests presigned urls for upload sources and uploads them, up to max_workers at once.
+        The sources are closed afterwards.
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            sources (array): List of UploadSource objects.
+            max_workers (int): Maximum number of files uploaded at once.
+            checkpoint (UploadCheckpoint): Checkpoint recording finished uploads, or None.
+
+        Returns:
+            str: A success message if all files were uploaded.
+        """
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def upload(presigned_url, source):
+            async with semaphore:
+                await self._upload_file(presigned_url, source)
+            if checkpoint is not None:
+                checkpoint.mark_uploaded(data_source_token, source.file_path)
+
+        try:
+            presigned_urls = await self._get_presigned_urls(data_source_token, sources)
+            await asyncio.gather(*(upload(presigned_url, source)
+                                   for presigned_url, source in zip(presigned_urls, sources)))
+        finally:
+            for source in sources:
+                source.close()
+        return 'file uploaded successfully'
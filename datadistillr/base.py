@@ -0,0 +1,462 @@
+"""
+This file defines the account and project logic shared by the synchronous and asyncio clients.
+"""
+
+from datadistillr.cache import build_name_index
+from datadistillr.data_types import build_dataframe
+from datadistillr.paging import PageSizePolicy
+from datadistillr.polling import PollingStrategy
+from datadistillr.uploads import UploadSource
+
+
+class QueryResultBuffer:
+    """
+    This is a class for collecting the pages of query results into one list of rows. Pages are
+    copied into a buffer sized from the total number of rows reported with the first page.
+    """
+
+    def __init__(self):
+        """
+        The constructor for the QueryResultBuffer class.
+        """
+        self.summary = {}
+        self.data = []
+        self.row_count = 0
+        self.page_count = 0
+
+    def add_page(self, response_data):
+        """
+        Adds the rows of one page of query results.
+
+        Parameters:
+            response_data (dict): Response for one page of query results.
+        """
+        page_rows = response_data['results']
+        if self.page_count == 0:
+            self.summary = response_data['summary']
+            self.data = [None] * self.summary.get('totalNumRows', 0)
+
+        # copy the page into the buffer, growing it if the server reported too few rows
+        next_row_count = self.row_count + len(page_rows)
+        if next_row_count <= len(self.data):
+            self.data[self.row_count:next_row_count] = page_rows
+        else:
+            del self.data[self.row_count:]
+            self.data.extend(page_rows)
+        self.row_count = next_row_count
+        self.page_count += 1
+
+    def get_results(self):
+        """
+        Returns the collected query results.
+
+        Returns:
+            dict: Rows of the query results under data and the summary of the first page under
+            summary.
+        """
+        del self.data[self.row_count:]
+
+        # the summary describes the whole result, so drop the keys of the first page
+        if self.page_count > 1:
+            for key in ('page', 'nextPage', 'totalPages'):
+                self.summary.pop(key, None)
+
+        return {'data': self.data, 'summary': self.summary}
+
+
+class AccountBase:  # pylint: disable=too-few-public-methods
+    """
+    This is a class for the account logic shared by DatadistillrAccount and
+    AsyncDatadistillrAccount. It sends no requests.
+
+    Attributes:
+        email (string): The email linked to Datadistillr account.
+        password (string): The password linked to Datadistillr account.
+        result_cache (ResultCache): On-disk cache of query results shared by the projects of the
+        account, or None.
+        page_size (int or PageSizePolicy): Number of rows the projects of the account request
+        per page of query results, or None for the page size of the server.
+    """
+
+    BASE_URL = "https://app.datadistillr.io/api/"
+    LOGIN_PAGE = BASE_URL + "login"
+    ORGANIZATIONS_LIST = BASE_URL + "organization"
+    LOGOUT_PAGE = BASE_URL + 'logout'
+    PROJECT_DISTILLRY = BASE_URL + "projectDistillry"
+
+    def __init__(self, email, password, result_cache=None, page_size=None):
+        """
+        The constructor for the AccountBase class. It does not log in.
+
+        Parameters:
+            email (string): The email linked to Datadistillr account.
+            password (string): The password linked to Datadistillr account.
+            result_cache (ResultCache): On-disk cache of query results shared by the projects of
+            the account, or None.
+            page_size (int or PageSizePolicy): Number of rows the projects of the account
+            request per page of query results. Defaults to the page size of the server.
+        """
+        self.email = email
+        self.password = password
+        self.result_cache = result_cache
+        self.page_size = page_size
+        self.login_resp_json = None
+        self.is_logged_in = False
+        self.proj_token_dict = {}
+
+    def _get_login_details(self):
+        """
+        Returns the request body that logs in to DataDistillr.
+
+        Returns:
+            dict: Credentials of the account.
+        """
+
+        return {
+            "email": self.email,
+            "password": self.password,
+            "invitations": {
+                "organizationInvitationToken": None,
+                "projectInvitationToken": None,
+                "teamInvitationToken": None}
+        }
+
+    def _get_projects_page(self):
+        """
+        Returns the API endpoint listing the projects of the active organization.
+
+        Returns:
+            str: API endpoint for the projects.
+        """
+
+        org_token = self.login_resp_json["activeOrganization"]["token"]
+        return self.BASE_URL + "organization/" + str(org_token) + "/projects"
+
+
+class ProjectBase:  # pylint: disable=too-many-instance-attributes
+    """
+    This is a class for the project logic shared by Project and AsyncProject. It sends no
+    requests: subclasses download the project details and send every request themselves.
+
+    Attributes:
+        name (str): Name of the project.
+        project_token (int): Token that uniquely identifies the project.
+        polling (PollingStrategy): Strategy used to poll for the results of running queries.
+        last_polling_state (PollingState): Polls made for the most recent query run, including
+        the latency of every poll.
+        result_cache (ResultCache): On-disk cache of query results, or None.
+        page_size (PageSizePolicy): Number of rows requested per page of query results, or
+        None for the page size of the server.
+    """
+    BASE_URL = "https://app.datadistillr.io/api/"
+    PROJECT_DISTILLRY = BASE_URL + "projectDistillry"
+    QUERY_BARRELS = BASE_URL + "queryBarrels"
+    QUERY_RUN_PAGE = BASE_URL + "queryResults"
+    PROJECT_PAGE = BASE_URL + "project"
+    DATA_SOURCE_PAGE = BASE_URL + "dataSource"
+
+    def __init__(self, proj_details, _curr_session, polling=None, result_cache=None,
+                 page_size=None):
+        """
+        The constructor for the ProjectBase class.
+
+        Parameters:
+            proj_details (JSON): JSON containing at least the name and token of the project.
+            _curr_session: Session to send requests with.
+            polling (PollingStrategy): Strategy used to poll for the results of running
+            queries. Defaults to PollingStrategy().
+            result_cache (ResultCache): On-disk cache of query results, or None.
+            page_size (int or PageSizePolicy): Number of rows requested per page of query
+            results, or a PageSizePolicy adapting it. Defaults to the page size of the server.
+        """
+
+        self.session = _curr_session
+        self.name = proj_details["name"]
+        self.project_token = proj_details["token"]
+        self.barrel_token_dict = {}
+        self.data_source_token_dict = {}
+        self.polling = polling if polling is not None else PollingStrategy()
+        self.last_polling_state = None
+        self.result_cache = result_cache
+        self.page_size = PageSizePolicy.from_value(page_size)
+
+    def _get_details(self):
+        """
+        Returns the project details. Implemented by subclasses.
+
+        Returns:
+            tuple: The project details, dictionary from tab tokens to names, and dictionary from
+            tab names to tokens.
+        """
+
+        raise NotImplementedError
+
+    @property
+    def details_json(self):
+        """
+        Returns the details of the project. The details are cached, and downloaded again once
+        the cache expires or if the project was created lazily.
+
+        Returns:
+            json: json containing details of project.
+        """
+
+        return self._get_details()[0]
+
+    @staticmethod
+    def _index_details(proj_details):
+        """
+        Builds the tab lookups of project details.
+
+        Parameters:
+            proj_details (JSON): JSON containing details of project.
+
+        Returns:
+            tuple: The project details, dictionary from tab tokens to names, and dictionary from
+            tab names to tokens.
+        """
+
+        barrel_token_dict = {query_barrel["token"]: query_barrel["name"]
+                             for query_barrel in proj_details.get("queryBarrels", [])}
+        return proj_details, barrel_token_dict, build_name_index(barrel_token_dict)
+
+    def get_tab_token_dict(self):
+        """
+        Returns dictionary with tab tokens as keys and tab names as values.
+        A tab in the DataDistillr user interface is equivalent to a query barrel in API routes and
+        responses.
+
+        Returns:
+            dictionary (int -> str): dictionary with query barrel token as key and query barrel
+            name as value.
+        """
+
+        self.barrel_token_dict = self._get_details()[1]
+        return self.barrel_token_dict
+
+    def get_tab_token(self, tab_name):
+        """
+        Returns tab token that matches tab_name
+
+        Returns:
+            int: tab token
+        """
+
+        name_index = self._get_details()[2]
+        if tab_name in name_index:
+            return name_index[tab_name]
+        raise Exception("token not found")
+
+    def _start_page_sizing(self):
+        """
+        Returns the page size state of a new download of query results.
+
+        Returns:
+            PageSizeState: State following the page size policy of the project, or None if
+            the page size of the server is used.
+        """
+
+        if self.page_size is None:
+            return None
+        return self.page_size.start()
+
+    @staticmethod
+    def _get_next_result_page(response_data, polling_state, sizing):
+        """
+        Records the latency and size of a page of query results and returns the URL of the
+        next page. Rows of the page that were already received in an earlier page are removed
+        from it, see PageSizeState.record().
+
+        Parameters:
+            response_data (dict): Response for one page of query results.
+            polling_state (PollingState): State of the polling run the page was polled in.
+            sizing (PageSizeState): Page size state of the download, or None.
+
+        Returns:
+            str: URL of the next page, or None if it was the last page.
+        """
+
+        summary = response_data['summary']
+        if sizing is None:
+            return summary.get('nextPage', None)
+        poll = polling_state.polls[-1]
+        overlap = sizing.record(len(response_data['results']), poll['latency'], poll.get('size'),
+                                summary.get('rowsPerPage'))
+        del response_data['results'][:overlap]
+        return sizing.get_next_url(summary)
+
+    def _start_download(self, polling_state=None, sizing=None):
+        """
+        Returns the polling and page size states of a download of query results, starting new
+        ones from the project settings for those not given. A new polling state is kept as
+        last_polling_state.
+
+        Parameters:
+            polling_state (PollingState): State of the polling run, or None.
+            sizing (PageSizeState): Page size state of the download, or None.
+
+        Returns:
+            tuple: The polling state and the page size state, which is None if the page size of
+            the server is used.
+        """
+
+        if polling_state is None:
+            polling_state = self.polling.start()
+            self.last_polling_state = polling_state
+        if sizing is None:
+            sizing = self._start_page_sizing()
+        return polling_state, sizing
+
+    def _start_result_buffer(self, url_endpoint, first_page, polling_state, sizing):
+        """
+        Returns a buffer for the results of a query run, holding the first page if it was
+        already polled.
+
+        Parameters:
+            url_endpoint (str): API endpoint for the first page of query data.
+            first_page (dict): Response for the first page of query data, or None.
+            polling_state (PollingState): State of the polling run.
+            sizing (PageSizeState): Page size state of the download, or None.
+
+        Returns:
+            tuple: The QueryResultBuffer, and the API endpoint of the next page to collect, or
+            None if there are no more pages.
+        """
+
+        result_buffer = QueryResultBuffer()
+        if first_page is not None:
+            # response is an unexpected error
+            if first_page['queryRun']['status'] != 'complete':
+                raise Exception('server response is', first_page)
+            result_buffer.add_page(first_page)
+            url_endpoint = self._get_next_result_page(first_page, polling_state, sizing)
+        return result_buffer, url_endpoint
+
+    def _get_query_run_page(self, barrel_token, query_token):
+        """
+        Returns the API endpoint that runs a query.
+
+        Parameters:
+            barrel_token (int): Token the uniquely identifies query barrel.
+            query_token (int): Token the uniquely identifies query in query barrel.
+
+        Returns:
+            str: API endpoint for running the query.
+        """
+
+        return self.QUERY_BARRELS + "/" + str(barrel_token) + "/query/" + str(query_token) + \
+            "/run"
+
+    def _get_result_cache_key(self, barrel_token, query_token, query_text, dtype_backend,
+                              categories):
+        """
+        Returns the key of a query result in the result cache.
+
+        Returns:
+            str: The key, or None if results are not cached or the query text is unknown.
+        """
+
+        if self.result_cache is None or query_text is None:
+            return None
+        return self.result_cache.make_key(barrel_token, query_token, query_text, dtype_backend,
+                                          categories)
+
+    def _build_query_dataframe(self, results, dtype_backend=None, categories=None,
+                               cache_key=None):
+        """
+        Formats query results as a DataFrame and stores it in the result cache.
+
+        Parameters:
+            results (dict): Rows of the query results under data and their summary under
+            summary.
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+            cache_key (str): Key of the result in the result cache, or None.
+
+        Returns:
+            pandas dataframe: Formatted results of query.
+        """
+
+        schema = results['summary']['columnNames']
+        data_types = results['summary'].get('dataTypes')
+        data = results['data']
+        data_frame = build_dataframe(data, schema, data_types, dtype_backend=dtype_backend,
+                                     categories=categories)
+        if cache_key is not None:
+            self.result_cache.set(cache_key, data_frame)
+        return data_frame
+
+    def _get_new_query_barrel_details(self, tab_name, query):
+        """
+        Returns the request body that creates a new query barrel in the project.
+
+        Parameters:
+            tab_name (str): Name of new tab
+            query (str): SQL statement to be run in tab.
+
+        Returns:
+            dict: Details of the new query barrel.
+        """
+
+        return {
+            "projectSlug": self.name.lower().replace(' ', '-'),
+            "projectToken": self.project_token,
+            "name": tab_name,
+            "active": True,
+            "icon": "type-icon-file",
+            "query": "  " + query
+        }
+
+    @staticmethod
+    def _get_upload_details(sources):
+        """
+        Returns the request body that asks for presigned urls for a list of files.
+
+        Parameters:
+            sources (array): List of UploadSource objects of the files to be uploaded.
+
+        Returns:
+            dict: Name, size and type of every file.
+        """
+
+        return {"files": [source.get_file_details() for source in sources]}
+
+    @staticmethod
+    def _get_upload_sources(file_paths, compression=None, compression_level=None):
+        """
+        Returns the upload source of every file. If a file cannot be prepared, the temporary
+        files of the sources prepared before it are removed.
+
+        Parameters:
+            file_paths (array): List of absolute file paths of files to be uploaded.
+            compression (str): None, 'gzip' or 'zstd'.
+            compression_level (int): Compression level, None for the default.
+
+        Returns:
+            array: List of UploadSource objects.
+        """
+
+        sources = []
+        try:
+            for file_path in file_paths:
+                sources.append(UploadSource.from_path(file_path, compression, compression_level))
+        except BaseException:
+            for source in sources:
+                source.close()
+            raise
+        return sources
+
+    @staticmethod
+    def _get_data_upload_sources(data, row_group_size=100000):
+        """
+        Returns the upload source of every item of data, see upload_data().
+
+        Parameters:
+            data (dict): File names mapped to the data to upload.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            array: List of UploadSource objects.
+        """
+
+        return [UploadSource.from_data(name, item, row_group_size) for name, item in data.items()]
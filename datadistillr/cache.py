@@ -0,0 +1,93 @@
+"""
+This file defines the in-memory cache for DataDistillr metadata such as project, tab and data
+source listings.
+"""
+
+import threading
+import time
+
+
+class TTLCache:
+    """
+    This is a class for caching values for a limited time. Values are loaded on first use and
+    reloaded once they are older than ttl seconds, or after they are invalidated.
+
+    Attributes:
+        ttl (float): Seconds a value stays valid, or None to keep values until invalidated.
+    """
+
+    def __init__(self, ttl=300.0):
+        """
+        The constructor for the TTLCache class.
+
+        Parameters:
+            ttl (float): Seconds a value stays valid, or None to keep values until invalidated.
+            A ttl of 0 disables caching.
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """
+        Returns the cached value for key, calling loader to load it if it is missing or
+        expired.
+
+        Parameters:
+            key (hashable): Key of the value.
+            loader (callable): Function without arguments that returns the value.
+
+        Returns:
+            The cached value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and (self.ttl is None or now - entry[0] < self.ttl):
+            return entry[1]
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        """
+        Stores a value, replacing any cached value for key.
+
+        Parameters:
+            key (hashable): Key of the value.
+            value: The value.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, key=None):
+        """
+        Removes the cached value for key, or every cached value if key is None.
+
+        Parameters:
+            key (hashable): Key of the value.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def build_name_index(token_dict):
+    """
+    Returns a dictionary from names to tokens. If several tokens share a name, the first one
+    is kept, matching a linear scan of token_dict.
+
+    Parameters:
+        token_dict (dictionary (int -> str)): Dictionary with tokens as keys and names as
+        values.
+
+    Returns:
+        dictionary (str -> int): Dictionary with names as keys and tokens as values.
+    """
+    name_index = {}
+    for token, name in token_dict.items():
+        name_index.setdefault(name, token)
+    return name_index
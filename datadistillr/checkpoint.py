@@ -0,0 +1,201 @@
+"""
+This file defines checkpoints that record finished work on disk, so an interrupted transfer can
+be resumed instead of restarted.
+"""
+
+import os
+import threading
+from datadistillr import json_backend
+
+
+def _write_json_atomically(path, data):
+    """
+    Writes JSON to path through a temporary file, so a crash never leaves a partial file.
+
+    Parameters:
+        path (str): Path of the file.
+        data (json): Data to write.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(json_backend.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    """
+    Reads a JSON file with the JSON backend of the SDK.
+
+    Parameters:
+        path (str): Path of the file.
+
+    Returns:
+        json: The decoded file.
+    """
+    with open(path, "rb") as file:
+        return json_backend.loads(file.read())
+
+
+class UploadCheckpoint:
+    """
+    This is a class for recording which files have been uploaded to which data source. A file
+    counts as uploaded only while its size and modification time match the recorded ones, so a
+    file that changed after its upload is uploaded again.
+
+    Attributes:
+        path (str): Path of the checkpoint file.
+    """
+
+    def __init__(self, path):
+        """
+        The constructor for the UploadCheckpoint class. Loads the checkpoint file if it exists.
+
+        Parameters:
+            path (str): Path of the checkpoint file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._uploads = {}
+        if os.path.exists(path):
+            self._uploads = _read_json(path).get("uploads", {})
+
+    @staticmethod
+    def _get_file_state(file_path):
+        """
+        Returns the size and modification time of a file.
+        """
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_uploaded(self, data_source_token, file_path):
+        """
+        Returns whether a file has been uploaded to a data source and has not changed since.
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            file_path (str): Path of the file.
+
+        Returns:
+            bool: True if the file does not need to be uploaded again.
+        """
+        with self._lock:
+            recorded = self._uploads.get(str(data_source_token), {}).get(
+                os.path.abspath(file_path))
+        return recorded is not None and recorded == self._get_file_state(file_path)
+
+    def mark_uploaded(self, data_source_token, file_path):
+        """
+        Records that a file has been uploaded to a data source and saves the checkpoint.
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            file_path (str): Path of the file.
+        """
+        file_state = self._get_file_state(file_path)
+        with self._lock:
+            uploads = self._uploads.setdefault(str(data_source_token), {})
+            uploads[os.path.abspath(file_path)] = file_state
+            _write_json_atomically(self.path, {"uploads": self._uploads})
+
+
+class DownloadCheckpoint:
+    """
+    This is a class for recording the pages of a paginated download in a directory, so a
+    download that failed midway can be resumed from its last completed page. Every page is saved
+    as it arrives, together with the nextPage cursor it points to. A download is identified by a
+    key; a checkpoint directory holding the pages of another download is cleared.
+
+    Attributes:
+        path (str): Directory holding the checkpoint.
+        key (str): Key identifying the download.
+        url (str): URL of the first page of the download, or None if not started.
+        next_page (str): URL of the page that follows the saved ones, or None if every page
+        is saved.
+        page_count (int): Number of saved pages.
+    """
+
+    STATE_FILE = "state.json"
+
+    def __init__(self, path, key):
+        """
+        The constructor for the DownloadCheckpoint class. Loads the checkpoint if the directory
+        holds one for the same download.
+
+        Parameters:
+            path (str): Directory holding the checkpoint. It is created if needed.
+            key (str): Key identifying the download.
+        """
+        self.path = os.path.expanduser(path)
+        self.key = str(key)
+        self.url = None
+        self.next_page = None
+        self.page_count = 0
+        os.makedirs(self.path, exist_ok=True)
+
+        state_path = os.path.join(self.path, self.STATE_FILE)
+        if os.path.exists(state_path):
+            state = _read_json(state_path)
+            if state.get("key") == self.key:
+                self.url = state.get("url")
+                self.next_page = state.get("next_page")
+                self.page_count = state.get("page_count", 0)
+            else:
+                self.clear()
+
+    def _get_page_path(self, page_index):
+        """
+        Returns the path of the file of a saved page.
+        """
+        return os.path.join(self.path, f"page-{page_index:06d}.json")
+
+    def _save_state(self):
+        """
+        Saves the position of the download.
+        """
+        _write_json_atomically(os.path.join(self.path, self.STATE_FILE),
+                               {"key": self.key, "url": self.url, "next_page": self.next_page,
+                                "page_count": self.page_count})
+
+    def start(self, url):
+        """
+        Records the URL of the first page of the download, discarding saved pages.
+
+        Parameters:
+            url (str): URL of the first page.
+        """
+        self.clear()
+        self.url = url
+        self._save_state()
+
+    def iter_pages(self):
+        """
+        Yields the saved pages in page order, reading one page at a time.
+
+        Returns:
+            generator<dict>: The response of every saved page.
+        """
+        for page_index in range(self.page_count):
+            yield _read_json(self._get_page_path(page_index))
+
+    def add_page(self, response_json):
+        """
+        Saves a page and the nextPage cursor of its summary.
+
+        Parameters:
+            response_json (dict): Response for the page following the saved ones.
+        """
+        _write_json_atomically(self._get_page_path(self.page_count), response_json)
+        self.page_count += 1
+        self.next_page = response_json["summary"].get("nextPage")
+        self._save_state()
+
+    def clear(self):
+        """
+        Removes the saved pages and the position of the download. The directory itself is kept.
+        """
+        for name in os.listdir(self.path):
+            if name == self.STATE_FILE or (name.startswith("page-") and name.endswith(".json")):
+                os.remove(os.path.join(self.path, name))
+        self.url = None
+        self.next_page = None
+        self.page_count = 0
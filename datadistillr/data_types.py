@@ -0,0 +1,158 @@
+"""
+This file defines the mapping from DataDistillr column data types to pandas dtypes and builds
+typed DataFrames from API results.
+"""
+
+import pandas as pd
+
+DTYPE_BACKENDS = ("numpy_nullable", "pyarrow")
+
+# Kinds of columns, keyed by the data types reported in summary.dataTypes
+DATA_TYPE_KINDS = {
+    "TINYINT": "integer",
+    "SMALLINT": "integer",
+    "INT": "integer",
+    "INTEGER": "integer",
+    "BIGINT": "integer",
+    "FLOAT": "float",
+    "REAL": "float",
+    "DOUBLE": "float",
+    "DECIMAL": "float",
+    "VARDECIMAL": "float",
+    "BIT": "boolean",
+    "BOOLEAN": "boolean",
+    "DATE": "datetime",
+    "TIMESTAMP": "datetime",
+    "VARCHAR": "string",
+    "CHAR": "string",
+}
+
+# pandas dtypes of every kind of column for each dtype backend
+KIND_DTYPES = {
+    "numpy_nullable": {"integer": "Int64", "float": "Float64", "boolean": "boolean",
+                       "datetime": "datetime64[ns]", "string": "object"},
+    "pyarrow": {"integer": "int64[pyarrow]", "float": "double[pyarrow]",
+                "boolean": "bool[pyarrow]", "datetime": "timestamp[ns][pyarrow]",
+                "string": "string[pyarrow]"},
+}
+
+_BOOLEAN_VALUES = {"true": True, "t": True, "1": True, "false": False, "f": False, "0": False}
+
+
+def get_kind(data_type):
+    """
+    Returns the kind of column for a DataDistillr data type, ignoring precision and nullability
+    suffixes such as DECIMAL(10, 2) or INTEGER NOT NULL.
+
+    Parameters:
+        data_type (str): Data type from summary.dataTypes.
+
+    Returns:
+        str: One of integer, float, boolean, datetime or string, or None if the type is unknown.
+    """
+    if not isinstance(data_type, str):
+        return None
+    base_type = data_type.upper().split("(")[0].split(" ")[0].strip()
+    return DATA_TYPE_KINDS.get(base_type)
+
+
+def _convert_column(values, kind, dtype_backend):
+    """
+    Converts the values of one column to the dtype of its kind. Values that cannot be converted
+    leave the column as Python objects.
+
+    Parameters:
+        values (tuple): Values of the column.
+        kind (str): Kind of the column, see get_kind().
+        dtype_backend (str): One of DTYPE_BACKENDS.
+
+    Returns:
+        array-like: The converted column.
+    """
+    if kind is None:
+        return pd.array(values, dtype=object)
+
+    dtype = KIND_DTYPES[dtype_backend][kind]
+    series = pd.Series(values, dtype=object)
+    try:
+        if kind in ("integer", "float"):
+            series = pd.to_numeric(series)
+        elif kind == "boolean":
+            series = series.map(
+                lambda value: _BOOLEAN_VALUES[str(value).lower()] if pd.notna(value) else None)
+        elif kind == "datetime":
+            series = pd.to_datetime(series)
+        return series.astype(dtype).array
+    except (ValueError, TypeError, KeyError, OverflowError):
+        return pd.array(values, dtype=object)
+
+
+# pylint: disable-next=too-many-arguments
+def build_dataframe(rows, column_names, data_types=None, *, dtype_backend=None,
+                    categories=None, index=None):
+    """
+    Builds a DataFrame from API results. If dtype_backend is set, every column is converted to
+    the pandas dtype matching its DataDistillr data type in one pass over the columns. Without a
+    dtype_backend the columns are left as Python objects.
+
+    Parameters:
+        rows (list<list>): Rows of values ordered like column_names.
+        column_names (list<str>): Names of the columns, from summary.columnNames.
+        data_types (list<str>): Data types of the columns, from summary.dataTypes.
+        dtype_backend (str): numpy_nullable for pandas nullable dtypes, pyarrow for Arrow-backed
+        dtypes, or None for untyped columns.
+        categories (list<str>): Names of columns to store as categoricals.
+        index (pandas Index): Index of the DataFrame.
+
+    Returns:
+        pandas dataframe: The rows as a DataFrame.
+    """
+    if dtype_backend is None and not categories:
+        return pd.DataFrame(rows, columns=column_names, index=index)
+    if dtype_backend is not None and dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"dtype_backend must be one of {DTYPE_BACKENDS}, not {dtype_backend}")
+
+    if data_types is None or dtype_backend is None:
+        data_types = [None] * len(column_names)
+    categories = set(categories or ())
+
+    columns = list(zip(*rows)) if rows else [()] * len(column_names)
+    data = {}
+    for name, data_type, values in zip(column_names, data_types, columns):
+        if name in categories:
+            data[name] = pd.Categorical(values)
+        elif dtype_backend is None:
+            data[name] = pd.array(values, dtype=object)
+        else:
+            data[name] = _convert_column(values, get_kind(data_type), dtype_backend)
+
+    if index is None:
+        index = pd.RangeIndex(len(rows))
+    return pd.DataFrame(data, columns=column_names, index=index)
+
+
+def concat_dataframes(data_frames, categories=None):
+    """
+    Concatenates DataFrames built from consecutive pages of a result into one DataFrame indexed
+    from 0. Categorical columns are categorized again over all rows, since every page has its
+    own categories. The DataFrames should be built with a dtype_backend: untyped columns are
+    inferred from the rows of one page, and may differ from the columns of all rows.
+
+    Parameters:
+        data_frames (iterable<DataFrame>): DataFrames of the pages, in page order.
+        categories (list<str>): Names of columns stored as categoricals.
+
+    Returns:
+        pandas dataframe: The rows of every page.
+    """
+    data_frames = list(data_frames)
+    if len(data_frames) == 1:
+        data_frame = data_frames[0]
+        data_frame.index = pd.RangeIndex(len(data_frame))
+        return data_frame
+    data_frame = pd.concat(data_frames, ignore_index=True)
+    for name in categories or ():
+        if name in data_frame.columns:
+            # infers the categories from the values, as build_dataframe() does
+            data_frame[name] = pd.Categorical(data_frame[name].tolist())
+    return data_frame
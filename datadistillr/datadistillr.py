@@ -2,50 +2,455 @@
 This file defines the class for getting data from API Access Clients in Datadistillr account.
 """
 
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import pandas as pd
 import requests
 from urllib3.exceptions import InsecureRequestWarning
 from datadistillr.auth_exceptions import AuthorizationException
+from datadistillr.checkpoint import DownloadCheckpoint
+from datadistillr.paging import PageSizePolicy, find_page_param, set_query_params
+from datadistillr.session import DatadistillrSession
+from datadistillr.data_types import build_dataframe
+from datadistillr.json_backend import decode_response
+from datadistillr import instrumentation, writers
+
+
+class DownloadOptions:
+    """
+    This is a class for the options of a paginated download from an API endpoint. The
+    download functions of Datadistillr take them as keyword arguments.
+
+    Attributes:
+        max_workers (int): Number of pages fetched concurrently. Defaults to 1 (sequential).
+        max_in_flight (int): Maximum number of page requests submitted but not yet consumed.
+        Defaults to twice max_workers.
+        checkpoint_path (str): Directory the downloaded pages are saved in, to resume a failed
+        download, or None.
+        page_size (int or PageSizePolicy): Number of rows requested per page, a PageSizePolicy
+        to adapt it, or None for the page size of the API.
+    """
+
+    def __init__(self, max_workers=1, max_in_flight=None, checkpoint_path=None, page_size=None):
+        """
+        The constructor for the DownloadOptions class.
+
+        Parameters:
+            max_workers (int): Number of pages fetched concurrently.
+            max_in_flight (int): Maximum number of page requests submitted but not yet consumed.
+            checkpoint_path (str): Directory the downloaded pages are saved in, or None.
+            page_size (int or PageSizePolicy): Number of rows requested per page, or a
+            PageSizePolicy to adapt it.
+        """
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.checkpoint_path = checkpoint_path
+        self.page_size = page_size
+
+    def open_checkpoint(self, url):
+        """
+        Returns the checkpoint of a download of url, or None without a checkpoint_path.
+        """
+        if self.checkpoint_path is None:
+            return None
+        return DownloadCheckpoint(self.checkpoint_path, url)
+
+    def start_page_sizing(self):
+        """
+        Returns the page size state of a new download, or None without a page_size.
+        """
+        if self.page_size is None:
+            return None
+        return PageSizePolicy.from_value(self.page_size).start()
 
 
 class Datadistillr:
     """
     This class is for getting data from API Access Clients in Datadistillr account.
+
+    All requests are sent through one shared DatadistillrSession, so connections to the API are
+    pooled and kept alive between pages and calls.
     """
 
+    _session = None
+    _session_lock = threading.Lock()
+
     @staticmethod
-    def get_dataframe(url, api_key):
+    def get_session():
+        """
+        Returns the session used for API calls, creating it with the default connection pool
+        settings on first use.
+
+        :return: The shared DatadistillrSession.
+        """
+        with Datadistillr._session_lock:
+            if Datadistillr._session is None:
+                requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+                Datadistillr._session = DatadistillrSession()
+            return Datadistillr._session
+
+    @staticmethod
+    def configure_session(session=None, **kwargs):
+        """
+        Replaces the session used for API calls. Either pass a session, or the keyword arguments
+        of DatadistillrSession (pool_connections, pool_maxsize, pool_block, keep_alive, timeout,
+        retry, rate_limiter, circuit_breaker, accept_encoding) to build a new one. The previous
+        session is closed.
+
+        :param session: A requests.Session to use for API calls.
+        :return: The new session.
+        """
+        if session is None:
+            session = DatadistillrSession(**kwargs)
+        requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+        with Datadistillr._session_lock:
+            previous_session, Datadistillr._session = Datadistillr._session, session
+        if previous_session is not None and previous_session is not session:
+            previous_session.close()
+        return session
+
+    @staticmethod
+    def get_dataframe(url, api_key, *, dtype_backend=None, categories=None, spool_path=None,
+                      **options):
         """
         This function allows you to programmatically access data from DataDistillr and push it to a
         pandas DataFrame. DataDistillr allows you to publish your data by generating an API
         Endpoint. To access your data, you will need an endpoint URL and an Authorization token.
         You can obtain both of these items in DataDistillr under the API Endpoints section.
 
+        If max_workers is greater than 1, the pages following the first one are fetched
+        concurrently and reassembled in page order. If the page URLs cannot be derived from the
+        first response, the pages are fetched one at a time.
+
+        If dtype_backend is set, the columns are converted to the dtypes matching the data types
+        reported by the API (summary.dataTypes) instead of being left as Python objects.
+
+        If spool_path is set, the pages are written to an Arrow IPC file at spool_path as they
+        arrive, and the returned DataFrame is a memory-mapped view of that file with Arrow-backed
+        columns, see get_arrow_from_api(). This requires pyarrow.
+
+        If checkpoint_path is set, the pages are saved in that directory as they arrive, and a
+        download that failed midway is resumed from its last saved page, see iter_pages().
+
+        If page_size is set, the number of rows per page is requested from the API instead of
+        using its default, see iter_pages().
+
         If the authorization is not successful this function throws an AuthorizationException.
 
         Full documentation is available here: https://docs.datadistillr.com/ddr/
         :param url:  Your dataset API URL
         :param api_key: Your unique dataset API key
+        :param dtype_backend: numpy_nullable for pandas nullable dtypes, pyarrow for Arrow-backed
+        dtypes, or None for untyped columns.
+        :param categories: Names of columns to store as categoricals.
+        :param spool_path: The filename of an Arrow IPC file the data is spooled to.
+        :param options: Download options, see DownloadOptions: max_workers, max_in_flight,
+        checkpoint_path and page_size.
         :return: A Pandas DataFrame of your data.
         """
-        response = Datadistillr.make_api_call(url, api_key)
+        if spool_path is not None:
+            Datadistillr.get_arrow_from_api(url, api_key, spool_path,
+                                            dtype_backend=dtype_backend, categories=categories,
+                                            **options)
+            return writers.read_arrow_ipc(spool_path, as_dataframe=True)
+
+        summary = None
+        data = []
+        for page in Datadistillr.iter_pages(url, api_key, **options):
+            if summary is None:
+                summary = page['summary']
+            data.extend(page['results'])
 
-        schema = response.json()['summary']['columnNames']
-        data = response.json()['results']
+        return build_dataframe(data, summary['columnNames'], summary.get('dataTypes'),
+                               dtype_backend=dtype_backend, categories=categories)
+
+    @staticmethod
+    def iter_pages(url, api_key, **options):
+        """
+        This function allows you to programmatically access data from DataDistillr one page at a
+        time. Pages are fetched by following summary.nextPage and are yielded as they arrive, so
+        only the pages that have not been consumed yet are held in memory.
+
+        If max_workers is greater than 1, the pages following the first one are fetched
+        concurrently. Pages are always yielded in page order.
+
+        If checkpoint_path is set, every page is saved in that directory as it arrives, see
+        DownloadCheckpoint. When a download of the same URL failed midway, calling this function
+        again with the same checkpoint_path yields the saved pages and resumes fetching after
+        the last of them instead of from page 1. The checkpoint is cleared once the last page
+        has been yielded.
+
+        If page_size is an int, that many rows are requested per page. If it is a
+        PageSizePolicy, the page size of pages fetched one at a time is adapted to the latency
+        and size of the pages received, to save round trips without holding large pages in
+        memory, see PageSizePolicy. Concurrent fetches keep the page size of the first page. If
+        the API caps the page size, its own summary.rowsPerPage is used.
+
+        If the authorization is not successful this function throws an AuthorizationException.
+
+        Full documentation is available here: https://docs.datadistillr.com/ddr/
+        :param url:  Your dataset API URL
+        :param api_key: Your unique dataset API key
+        :param options: Download options, see DownloadOptions: max_workers, max_in_flight,
+        checkpoint_path and page_size.
+        :return: A generator of API responses, each a dictionary with results and summary.
+        """
+        return Datadistillr._iter_pages(url, api_key, DownloadOptions(**options))
+
+    @staticmethod
+    def _iter_pages(url, api_key, options):
+        """
+        Yields the pages of a download, see iter_pages().
+
+        :param url:  Your dataset API URL
+        :param api_key: Your unique dataset API key
+        :param options: The DownloadOptions of the download.
+        :return: A generator of API responses, each a dictionary with results and summary.
+        """
+        checkpoint = options.open_checkpoint(url)
+        sizing = options.start_page_sizing()
+        last_page = yield from Datadistillr._get_first_pages(url, api_key, checkpoint, sizing)
+
+        # pages already retrieved are not fetched again
+        summary = last_page['summary']
+        page_count = summary['totalPages'] - (checkpoint.page_count if checkpoint else 1)
+        for response_json in Datadistillr._fetch_remaining_pages(summary, api_key, options,
+                                                                 sizing, page_count):
+            if checkpoint is not None:
+                checkpoint.add_page(response_json)
+            yield response_json
+
+        if checkpoint is not None:
+            checkpoint.clear()
+
+    @staticmethod
+    def _get_first_pages(url, api_key, checkpoint, sizing):
+        """
+        Yields the pages saved in the checkpoint of a download that failed midway, or else
+        fetches the first page.
+
+        :param url:  Your dataset API URL
+        :param api_key: Your unique dataset API key
+        :param checkpoint: The DownloadCheckpoint of the download, or None.
+        :param sizing: The PageSizeState of the download, or None.
+        :return: A generator of API responses, one per page, returning the last of them.
+        """
+        if checkpoint is not None and checkpoint.page_count > 0:
+            response_json = None
+            for response_json in checkpoint.iter_pages():
+                if sizing is not None:
+                    sizing.record(len(response_json['results']),
+                                  reported_page_size=response_json['summary'].get('rowsPerPage'))
+                yield response_json
+            return response_json
+
+        first_url = url if sizing is None else sizing.get_first_url(url)
+        response_json = Datadistillr._get_page(first_url, api_key, sizing)
+        if checkpoint is not None:
+            checkpoint.start(url)
+            checkpoint.add_page(response_json)
+        yield response_json
+        return response_json
+
+    @staticmethod
+    def _fetch_remaining_pages(summary, api_key, options, sizing, page_count):
+        """
+        Fetches the pages following the last page retrieved, concurrently if options allow it
+        and the page URLs can be derived from summary.nextPage.
+
+        :param summary: The summary of the last page retrieved.
+        :param api_key: Your unique dataset API key
+        :param options: The DownloadOptions of the download.
+        :param sizing: The PageSizeState of the download, or None.
+        :param page_count: Number of pages left to fetch.
+        :return: A generator of API responses, one per page.
+        """
+        page_urls = Datadistillr._get_page_urls(summary)
+        if options.max_workers > 1 and page_urls is not None:
+            if sizing is not None:
+                # page numbers follow the page size of the pages already retrieved
+                size = {sizing.policy.param: sizing.pages[-1]['page_size']}
+                page_urls = [set_query_params(page_url, size) for page_url in page_urls]
+            return Datadistillr._fetch_pages_concurrently(page_urls, api_key,
+                                                          options.max_workers,
+                                                          options.max_in_flight)
+        if sizing is not None:
+            return Datadistillr._fetch_sized_pages(summary, api_key, sizing)
+        return Datadistillr._fetch_pages_sequentially(summary, api_key, page_count)
+
+    @staticmethod
+    def _fetch_pages_sequentially(summary, api_key, page_count):
+        """
+        Fetches pages one at a time by following summary.nextPage.
 
-        # Since we already retrieved the first page, decrement this by 1
-        page_count = response.json()['summary']['totalPages'] - 1
-        while page_count > 0:
+        :param summary: The summary of the last page retrieved.
+        :param api_key: Your unique dataset API key
+        :param page_count: Number of pages left to fetch.
+        :return: A generator of API responses, one per page.
+        """
+        while page_count > 0 and summary.get('nextPage') is not None:
             # Make next API call
-            next_url = response.json()['summary']['nextPage']
-            response = Datadistillr.make_api_call(next_url, api_key)
+            response_json = Datadistillr._get_page(summary['nextPage'], api_key)
+            summary = response_json['summary']
+            yield response_json
+            page_count -= 1
 
-            # Append the data
-            next_page = response.json()['results']
-            data.extend(next_page)
-            page_count -= page_count
+    @staticmethod
+    def _fetch_sized_pages(summary, api_key, sizing):
+        """
+        Fetches pages one at a time, requesting the page size chosen by sizing for each of them.
 
-        return pd.DataFrame(data, columns=schema)
+        :param summary: The summary of the last page retrieved.
+        :param api_key: Your unique dataset API key
+        :param sizing: The PageSizeState of the download.
+        :return: A generator of API responses, one per page.
+        """
+        next_url = sizing.get_next_url(summary)
+        while next_url is not None:
+            response_json = Datadistillr._get_page(next_url, api_key, sizing)
+            yield response_json
+            url, next_url = next_url, sizing.get_next_url(response_json['summary'])
+            # a page without new rows is requested again only if the page size changed
+            if next_url == url:
+                break
+
+    @staticmethod
+    def iter_rows(url, api_key, **options):
+        """
+        This function allows you to programmatically access data from DataDistillr one row at a
+        time. Rows are yielded as their pages arrive, see iter_pages().
+
+        If the authorization is not successful this function throws an AuthorizationException.
+
+        Full documentation is available here: https://docs.datadistillr.com/ddr/
+        :param url:  Your dataset API URL
+        :param api_key: Your unique dataset API key
+        :param options: Download options, see DownloadOptions: max_workers, max_in_flight,
+        checkpoint_path and page_size.
+        :return: A generator of rows, each a list of values ordered like the columns.
+        """
+        for page in Datadistillr.iter_pages(url, api_key, **options):
+            yield from page['results']
+
+    @staticmethod
+    def iter_dataframes(url, api_key, *, dtype_backend=None, categories=None, **options):
+        """
+        This function allows you to programmatically access data from DataDistillr as one pandas
+        DataFrame per page. The index of each DataFrame continues where the previous one ended,
+        so concatenating them gives the same DataFrame as get_dataframe().
+
+        If the authorization is not successful this function throws an AuthorizationException.
+
+        Full documentation is available here: https://docs.datadistillr.com/ddr/
+        :param url:  Your dataset API URL
+        :param api_key: Your unique dataset API key
+        :param dtype_backend: numpy_nullable for pandas nullable dtypes, pyarrow for Arrow-backed
+        dtypes, or None for untyped columns.
+        :param categories: Names of columns to store as categoricals.
+        :param options: Download options, see DownloadOptions: max_workers, max_in_flight,
+        checkpoint_path and page_size.
+        :return: A generator of Pandas DataFrames, one per page.
+        """
+        summary = None
+        row_count = 0
+        for page in Datadistillr.iter_pages(url, api_key, **options):
+            if summary is None:
+                summary = page['summary']
+            results = page['results']
+            index = pd.RangeIndex(row_count, row_count + len(results))
+            row_count += len(results)
+            yield build_dataframe(results, summary['columnNames'], summary.get('dataTypes'),
+                                  dtype_backend=dtype_backend, categories=categories,
+                                  index=index)
+
+    @staticmethod
+    def _get_page_urls(summary):
+        """
+        Derives the URLs of all pages following the current one from the nextPage URL of a
+        response summary. The page number is located by finding the query parameter of nextPage
+        whose value is the number of the next page, preferring parameters named like "page".
+
+        :param summary: The summary of an API response.
+        :return: A list of page URLs, or None if the URLs cannot be derived.
+        """
+        next_url = summary.get('nextPage')
+        total_pages = summary.get('totalPages')
+        current_page = summary.get('page')
+        if next_url is None or total_pages is None or current_page is None:
+            return None
+
+        split_url = urlsplit(next_url)
+        query = parse_qsl(split_url.query, keep_blank_values=True)
+        page_param = find_page_param(query, current_page + 1)
+        if page_param is None:
+            return None
+
+        page_urls = []
+        for page in range(current_page + 1, total_pages + 1):
+            query[page_param] = (query[page_param][0], str(page))
+            page_urls.append(urlunsplit(split_url._replace(query=urlencode(query))))
+        return page_urls
+
+    @staticmethod
+    def _fetch_pages_concurrently(page_urls, api_key, max_workers, max_in_flight=None):
+        """
+        Fetches pages with a pool of worker threads and yields their responses in page order.
+        At most max_in_flight requests are submitted ahead of the page being consumed, which
+        bounds the number of pages held in memory.
+
+        :param page_urls: URLs of the pages to fetch, in page order.
+        :param api_key: Your unique dataset API key
+        :param max_workers: Number of worker threads.
+        :param max_in_flight: Maximum number of outstanding page requests.
+        :return: A generator of API responses, one per page.
+        """
+        if max_in_flight is None:
+            max_in_flight = 2 * max_workers
+        max_in_flight = max(max_in_flight, 1)
+
+        page_urls = iter(page_urls)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for page_url in page_urls:
+                pending.append(executor.submit(Datadistillr._get_page, page_url, api_key))
+                if len(pending) >= max_in_flight:
+                    break
+
+            while pending:
+                response_json = pending.popleft().result()
+                next_url = next(page_urls, None)
+                if next_url is not None:
+                    pending.append(executor.submit(Datadistillr._get_page, next_url, api_key))
+                yield response_json
+
+    @staticmethod
+    def _get_page(url, api_key, sizing=None):
+        """
+        Fetches one page and decodes it with the JSON backend of the SDK. The body is parsed
+        once, and by the thread that fetched it when pages are fetched concurrently.
+
+        :param url: URL of the page.
+        :param api_key: Your unique dataset API key
+        :param sizing: The PageSizeState the latency and size of the page are recorded in.
+        :return: The API response, a dictionary with results and summary.
+        """
+        start = time.perf_counter()
+        response = Datadistillr.make_api_call(url, api_key)
+        seconds = time.perf_counter() - start
+        response_json = decode_response(response)
+        if sizing is not None:
+            overlap = sizing.record(len(response_json['results']), seconds,
+                                    len(response.content),
+                                    response_json['summary'].get('rowsPerPage'))
+            # rows of a page served with another page size than requested may overlap
+            del response_json['results'][:overlap]
+        if instrumentation.is_enabled():
+            instrumentation.emit("page", url=url, page=response_json['summary'].get('page'),
+                                 rows=len(response_json['results']))
+        return response_json
 
     @staticmethod
     def make_api_call(url, api_key):
@@ -55,7 +460,9 @@ class Datadistillr:
         To access your data, you will need an endpoint URL and an Authorization token. You can
         obtain both of these items in DataDistillr under the API Endpoints section.
 
-        If the authorization is not successful this function throws an AuthorizationException.
+        Rate limited (429) and failed (5xx) calls are retried by the session, see
+        DatadistillrSession. If the authorization is not successful this function throws an
+        AuthorizationException, and other failed calls throw a requests.HTTPError.
 
         Full documentation is available here: https://docs.datadistillr.com/ddr/
         :param url:  Your dataset API URL
@@ -63,13 +470,13 @@ class Datadistillr:
         :return: response object from API call.
         """
         headers = {"Authorization": api_key}
-        requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
-        response = requests.get(url, headers=headers, verify=False)
+        with instrumentation.span("datadistillr.api_call", url=url):
+            response = Datadistillr.get_session().get(url, headers=headers, verify=False)
 
         # Case for unauthorized access
         if response.status_code in (401, 403):
             raise AuthorizationException(url, "You are not authorized to access this resource.")
-        # TODO Add more error response codes
+        response.raise_for_status()
 
         return response
 
@@ -82,6 +489,11 @@ class Datadistillr:
         To access your data, you will need an endpoint URL and an Authorization token. You can
         obtain both of these items in DataDistillr under the API Endpoints section.
 
+        Each page is appended to the file as it arrives, so the whole dataset is never held in
+        memory. Column types are inferred page by page, so numbers are formatted by the rows of
+        their page: an integer column is written as 1 in a page without missing values and as
+        1.0 in a page with them, where the whole dataset used to be written as 1.0.
+
         If the authorization is not successful this function throws an AuthorizationException.
 
         Full documentation is available here: https://docs.datadistillr.com/ddr/
@@ -90,46 +502,103 @@ class Datadistillr:
         :param filename: The filename where you want your data written
         :return: A CSV file of your data.
         """
-        data_frame = Datadistillr.get_dataframe(url, api_key)
-        return data_frame.to_csv(filename)
+        writers.write_csv(Datadistillr.iter_dataframes(url, api_key), filename)
 
     @staticmethod
-    def get_json_from_api(url, api_key, filename):
+    def get_json_from_api(url, api_key, filename, lines=False):
         """
         This function allows you to programmatically access data from DataDistillr and push it to a
         JSON file. DataDistillr allows you to publish your data by generating an API Endpoint.
         To access your data, you will need an endpoint URL and an Authorization token. You can
         obtain both of these items in DataDistillr under the API Endpoints section.
 
+        If lines is True, the file is written in JSON Lines format, one record per row, and each
+        page is appended to the file as it arrives.
+
         If the authorization is not successful this function throws an AuthorizationException.
 
         Full documentation is available here: https://docs.datadistillr.com/ddr/
         :param url:  Your dataset API URL
         :param api_key: Your unique dataset API key
         :param filename: The filename where you want your data written
+        :param lines: Whether to write JSON Lines page by page instead of one JSON document.
         :return: A JSON file of your data.
         """
+        if lines:
+            writers.write_json_lines(Datadistillr.iter_dataframes(url, api_key), filename)
+            return None
         data_frame = Datadistillr.get_dataframe(url, api_key)
         return data_frame.to_json(filename)
 
     @staticmethod
-    def get_parquet_from_api(url, api_key, filename):
+    def get_parquet_from_api(url, api_key, filename, row_group_size=100000):
         """
         This function allows you to programmatically access data from DataDistillr and push it to a
         parquet file. DataDistillr allows you to publish your data by generating an API Endpoint.
         To access your data, you will need an endpoint URL and an Authorization token. You can
         obtain both of these items in DataDistillr under the API Endpoints section.
 
+        Pages are written as they arrive with an incremental Parquet writer, so at most one row
+        group is held in memory. A column whose type changes from page to page, for example from
+        integers to floats, is written with a type that holds both. Writing parquet files
+        requires pyarrow.
+
         If the authorization is not successful this function throws an AuthorizationException.
 
         Full documentation is available here: https://docs.datadistillr.com/ddr/
         :param url:  Your dataset API URL
         :param api_key: Your unique dataset API key
         :param filename: The filename where you want your data written
+        :param row_group_size: Number of rows per Parquet row group.
         :return: A parquet file of your data.
         """
-        data_frame = Datadistillr.get_dataframe(url, api_key)
-        return data_frame.to_parquet(filename)
+        writers.write_parquet(Datadistillr.iter_dataframes(url, api_key), filename,
+                              row_group_size)
+
+    @staticmethod
+    def get_arrow_from_api(url, api_key, filename, *, dtype_backend=None, categories=None,
+                           **options):
+        """
+        This function allows you to programmatically access data from DataDistillr and push it to
+        an Arrow IPC (Feather v2) file. DataDistillr allows you to publish your data by generating
+        an API Endpoint. To access your data, you will need an endpoint URL and an Authorization
+        token. You can obtain both of these items in DataDistillr under the API Endpoints section.
+
+        Pages are appended to the file as record batches as they arrive, so at most a few pages
+        are held in memory. The returned table is memory-mapped from the file rather than read
+        into memory, and other processes can share it with open_arrow_file(). Requires pyarrow.
+
+        If the authorization is not successful this function throws an AuthorizationException.
+
+        Full documentation is available here: https://docs.datadistillr.com/ddr/
+        :param url:  Your dataset API URL
+        :param api_key: Your unique dataset API key
+        :param filename: The filename where you want your data written
+        :param dtype_backend: numpy_nullable for pandas nullable dtypes, pyarrow for Arrow-backed
+        dtypes, or None for untyped columns.
+        :param categories: Names of columns to store as dictionary-encoded columns.
+        :param options: Download options, see DownloadOptions: max_workers, max_in_flight,
+        checkpoint_path and page_size.
+        :return: A memory-mapped pyarrow Table of your data.
+        """
+        writers.write_arrow_ipc(
+            Datadistillr.iter_dataframes(url, api_key, dtype_backend=dtype_backend,
+                                         categories=categories, **options),
+            filename)
+        return writers.read_arrow_ipc(filename)
+
+    @staticmethod
+    def open_arrow_file(filename, as_dataframe=False):
+        """
+        Opens an Arrow IPC file written by get_arrow_from_api() memory-mapped, without copying
+        its data into memory. Processes that open the same file share its pages.
+
+        :param filename: The filename of the Arrow IPC file.
+        :param as_dataframe: Whether to return a Pandas DataFrame with Arrow-backed columns
+        instead of a pyarrow Table.
+        :return: A memory-mapped pyarrow Table or Pandas DataFrame of your data.
+        """
+        return writers.read_arrow_ipc(filename, as_dataframe=as_dataframe)
 
     @staticmethod
     def get_excel_from_api(url, api_key, filename):
@@ -2,41 +2,52 @@
 This file defines the class for getting account level data from Datadistillr account.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from datadistillr.base import AccountBase
+from datadistillr.cache import TTLCache, build_name_index
+from datadistillr.json_backend import decode_response
 from datadistillr.project import Project
+from datadistillr.session import DatadistillrSession
 
 
-class DatadistillrAccount:
+class DatadistillrAccount(AccountBase):
     """
     This is a class for getting account level data from Datadistillr account.
 
     Attributes:
         email (string): The email linked to Datadistillr account.
         password (string): The password linked to Datadistillr account.
+        metadata_cache (TTLCache): Cache of the project listing. Projects created by the account
+        cache their own tabs and data sources with the same ttl.
+        result_cache (ResultCache): On-disk cache of query results shared by the projects of the
+        account, or None.
+        page_size (int or PageSizePolicy): Number of rows the projects of the account request
+        per page of query results, or None for the page size of the server.
     """
 
-    BASE_URL = "https://app.datadistillr.io/api/"
-    LOGIN_PAGE = BASE_URL + "login"
-    ORGANIZATIONS_LIST = BASE_URL + "organization"
-    LOGOUT_PAGE = BASE_URL + 'logout'
-    PROJECT_DISTILLRY = BASE_URL + "projectDistillry"
-
-    def __init__(self, email, password):
+    def __init__(self, email, password, cache_ttl=300.0, result_cache=None, page_size=None):
         """
         The constructor for the DatadistillrAccount class. Creates a session.
 
         Parameters:
             email (string): The email linked to Datadistillr account.
             password (string): The password linked to Datadistillr account.
-        """
+            cache_ttl (float): Seconds project, tab and data source listings are cached for.
+            Use 0 to disable caching, or None to cache until invalidate_cache() is called.
+            result_cache (ResultCache): On-disk cache of query results shared by the projects of
+            the account, or None to always run queries on the server.
+            page_size (int or PageSizePolicy): Number of rows the projects of the account
+            request per page of query results, or a PageSizePolicy adapting it. Defaults to the
+            page size of the server.
+        """
+        super().__init__(email, password, result_cache, page_size)
         requests.packages.urllib3.disable_warnings()
         # stores cookies, so you can make requests without multiple logins (pass around cookie)
-        self.session = requests.Session()
-        self.email = email
-        self.password = password
+        self.session = DatadistillrSession()
+        self.metadata_cache = TTLCache(cache_ttl)
         self.login_resp_json = self._login()
         self.is_logged_in = self.login_resp_json["loggedIn"]
-        self.proj_token_dict = {}
 
     def _login(self):
         """
@@ -46,16 +57,9 @@ class DatadistillrAccount:
             json: A json containing account details and login status.
         """
 
-        user_info = {
-            "email": self.email,
-            "password": self.password,
-            "invitations": {
-                "organizationInvitationToken": None,
-                "projectInvitationToken": None,
-                "teamInvitationToken": None}
-        }
+        user_info = self._get_login_details()
         login_response = self.session.post(url=self.LOGIN_PAGE, json=user_info, verify=False)
-        login_resp_json = login_response.json()
+        login_resp_json = decode_response(login_response)
         return login_resp_json
 
     def logout(self):
@@ -67,13 +71,14 @@ class DatadistillrAccount:
         """
 
         logout_response = self.session.get(url=self.LOGOUT_PAGE, verify=False)
-        logout_resp_json = logout_response.json()
+        logout_resp_json = decode_response(logout_response)
         self.is_logged_in = logout_resp_json["loggedIn"]
         return logout_resp_json
 
     def get_project_token_dict(self):
         """
-        Returns dictionary with project tokens as keys and project names as values.
+        Returns dictionary with project tokens as keys and project names as values. The
+        listing is cached, see invalidate_cache().
 
         Returns:
             dictionary (int -> str): dictionary with project token as key and project name as value.
@@ -83,20 +88,43 @@ class DatadistillrAccount:
         if not self.is_logged_in:
             raise Exception("login is incorrect")
 
-        org_token = self.login_resp_json["activeOrganization"]["token"]
-        projects_page = self.BASE_URL + "organization/" + str(org_token) + "/projects"
+        self.proj_token_dict = self._get_project_tokens()[0]
+        return self.proj_token_dict
+
+    def _get_project_tokens(self):
+        """
+        Returns the cached project listing.
+
+        Returns:
+            tuple: Dictionary from project tokens to names, and dictionary from names to tokens.
+        """
+
+        return self.metadata_cache.get("projects", self._load_project_tokens)
+
+    def _load_project_tokens(self):
+        """
+        Downloads the project listing.
+
+        Returns:
+            tuple: Dictionary from project tokens to names, and dictionary from names to tokens.
+        """
+
+        projects_page = self._get_projects_page()
         projects_response = self.session.get(url=projects_page, verify=False)
 
         # Converts response to JSON
-        proj_resp_json = projects_response.json()
+        proj_resp_json = decode_response(projects_response)
 
-        # Gets the projects list
-        proj_list = proj_resp_json["projects"]
+        # Creates a dictionary of all projects and their tokens
+        proj_token_dict = {proj["token"]: proj["name"] for proj in proj_resp_json["projects"]}
+        return proj_token_dict, build_name_index(proj_token_dict)
 
-        for proj in proj_list:
-            # Creates a dictionary of all projects and their tokens
-            self.proj_token_dict[proj["token"]] = proj["name"]
-        return self.proj_token_dict
+    def invalidate_cache(self):
+        """
+        Clears the cached project listing, so the next lookup downloads it again.
+        """
+
+        self.metadata_cache.invalidate()
 
     def get_project_token(self, project_name):
         """
@@ -106,10 +134,12 @@ class DatadistillrAccount:
             int: project token
         """
 
-        proj_token_dict = self.get_project_token_dict()
-        for token, name in proj_token_dict.items():
-            if project_name == name:
-                return token
+        if not self.is_logged_in:
+            raise Exception("login is incorrect")
+
+        name_index = self._get_project_tokens()[1]
+        if project_name in name_index:
+            return name_index[project_name]
         raise Exception("token not found")
 
     def get_project(self, project_token):
@@ -132,14 +162,22 @@ class DatadistillrAccount:
         # Gets the url
         project_details = self.session.get(url=project_details_page)
         # Parses the response from JSON to a python dictionary
-        project_details_json = project_details.json()['project']
-        proj_object = Project(project_details_json, self.session)
+        project_details_json = decode_response(project_details)['project']
+        proj_object = Project(project_details_json, self.session,
+                              cache_ttl=self.metadata_cache.ttl, result_cache=self.result_cache,
+                              page_size=self.page_size)
         # Returns the parsed JSON
         return proj_object
 
-    def get_projects(self):
+    def get_projects(self, max_workers=8, lazy=False):
         """
-        Returns all projects in DataDistillr account.
+        Returns all projects in DataDistillr account. The details of the projects are
+        downloaded concurrently by up to max_workers threads.
+
+        Parameters:
+            max_workers (int): Maximum number of project details downloaded at once.
+            lazy (bool): If True, no project details are downloaded here. Each project downloads
+            its details on first access of its details_json, e.g. when listing its tabs.
 
         Returns:
             list<Project>: A list of project objects.
@@ -148,14 +186,18 @@ class DatadistillrAccount:
         if not self.is_logged_in:
             raise Exception("login is incorrect")
 
-        proj_object_list = []
+        project_token_dict = self.get_project_token_dict()
+        if lazy:
+            return [Project({"name": name, "token": token}, self.session, lazy=True,
+                            cache_ttl=self.metadata_cache.ttl, result_cache=self.result_cache,
+                            page_size=self.page_size)
+                    for token, name in project_token_dict.items()]
 
-        project_tokens = self.get_project_token_dict().keys()
-        for project_token in project_tokens:
-            proj_object = self.get_project(project_token)
-            proj_object_list.append(proj_object)
+        if max_workers <= 1 or len(project_token_dict) <= 1:
+            return [self.get_project(project_token) for project_token in project_token_dict]
 
-        return proj_object_list
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.get_project, project_token_dict))
 
     def get_organizations(self):
         """
@@ -169,5 +211,5 @@ class DatadistillrAccount:
             raise Exception("login is incorrect")
 
         organizations_response = self.session.get(url=self.ORGANIZATIONS_LIST, verify=False)
-        organizations_resp_json = organizations_response.json()
+        organizations_resp_json = decode_response(organizations_response)
         return organizations_resp_json["organizations"]
@@ -0,0 +1,304 @@
+"""
+This file defines the instrumentation hooks of the SDK. The clients emit an event for every
+HTTP request, retry, poll, result page, JSON decode and upload, and open a span around every
+API call, query execution and file upload. Hooks registered with add_hook() receive them.
+"""
+
+import contextlib
+import logging
+import threading
+from collections import defaultdict
+
+_hooks = ()
+_hooks_lock = threading.Lock()
+
+
+class InstrumentationHook:
+    """
+    This is the base class of instrumentation hooks. Subclasses override on_event() to receive
+    the events of the SDK and span() to wrap the calls of the SDK.
+
+    Events and their metrics:
+        request: method, url, status, attempt, seconds, ttfb (seconds until the response
+        headers arrived, including DNS, connect and TLS), body_seconds, bytes_sent,
+        bytes_received, wire_bytes (bytes_received before decompression), error.
+        retry: method, url, attempt, delay, status, error.
+        connection: url, dns_seconds, connect_seconds (async client only).
+        poll: url, status, seconds.
+        page: url, page, rows.
+        decode: bytes, seconds.
+        upload: name, bytes, seconds.
+    """
+
+    def on_event(self, name, metrics):
+        """
+        Receives an event.
+
+        Parameters:
+            name (str): Name of the event.
+            metrics (dict): Metrics of the event.
+        """
+
+    def span(self, name, attributes):  # pylint: disable=unused-argument
+        """
+        Returns a context manager wrapping a call of the SDK.
+
+        Parameters:
+            name (str): Name of the call, e.g. datadistillr.api_call.
+            attributes (dict): Attributes of the call.
+
+        Returns:
+            context manager: Entered for the duration of the call.
+        """
+        return contextlib.nullcontext()
+
+
+def add_hook(hook):
+    """
+    Registers an instrumentation hook. Hooks are process-wide and receive the events of every
+    thread.
+
+    Parameters:
+        hook (InstrumentationHook): The hook.
+
+    Returns:
+        InstrumentationHook: The hook.
+    """
+    global _hooks  # pylint: disable=global-statement
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+    return hook
+
+
+def remove_hook(hook):
+    """
+    Unregisters an instrumentation hook.
+
+    Parameters:
+        hook (InstrumentationHook): The hook.
+    """
+    global _hooks  # pylint: disable=global-statement
+    with _hooks_lock:
+        _hooks = tuple(registered for registered in _hooks if registered is not hook)
+
+
+def is_enabled():
+    """
+    Returns whether any hook is registered, so callers can skip measuring.
+    """
+    return bool(_hooks)
+
+
+def emit(event, **metrics):
+    """
+    Sends an event to every registered hook.
+
+    Parameters:
+        event (str): Name of the event.
+        metrics: Metrics of the event.
+    """
+    for hook in _hooks:
+        hook.on_event(event, metrics)
+
+
+@contextlib.contextmanager
+def span(call, **attributes):
+    """
+    Wraps a call of the SDK in the spans of every registered hook.
+
+    Parameters:
+        call (str): Name of the call.
+        attributes: Attributes of the call.
+    """
+    hooks = _hooks
+    if not hooks:
+        yield
+        return
+    with contextlib.ExitStack() as stack:
+        for hook in hooks:
+            stack.enter_context(hook.span(call, attributes))
+        yield
+
+
+@contextlib.contextmanager
+def collect_metrics():
+    """
+    Collects the metrics of the calls made in a with block:
+
+        with collect_metrics() as metrics:
+            data_frame = Datadistillr.get_dataframe(url, api_key)
+        print(metrics.counters)
+
+    Returns:
+        MetricsCollector: The collected metrics.
+    """
+    collector = add_hook(MetricsCollector())
+    try:
+        yield collector
+    finally:
+        remove_hook(collector)
+
+
+class LoggingHook(InstrumentationHook):
+    """
+    This is a class for logging the events and calls of the SDK.
+
+    Attributes:
+        logger (logging.Logger): Logger the events are written to.
+        level (int): Level the events are logged at.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        """
+        The constructor for the LoggingHook class.
+
+        Parameters:
+            logger (logging.Logger): Logger the events are written to. Defaults to the
+            datadistillr logger.
+            level (int): Level the events are logged at.
+        """
+        self.logger = logger if logger is not None else logging.getLogger("datadistillr")
+        self.level = level
+
+    def on_event(self, name, metrics):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "%s %s", name,
+                            " ".join(f"{key}={value}" for key, value in metrics.items()))
+
+    @contextlib.contextmanager
+    def span(self, name, attributes):
+        self.logger.log(self.level, "start %s %s", name, attributes)
+        try:
+            yield
+        finally:
+            self.logger.log(self.level, "end %s", name)
+
+
+class MetricsCollector(InstrumentationHook):
+    """
+    This is a class for aggregating the events of the SDK into Prometheus-style counters:
+    event counts, bytes, and the sum of every timing, e.g. requests_total, retries_total,
+    bytes_received_total, request_seconds_sum, ttfb_seconds_sum and decode_seconds_sum.
+    wire_bytes_received_total counts response bodies as they were transferred, and
+    decoded_bytes_total as they were passed to the JSON decoder, after decompression.
+
+    Attributes:
+        counters (dict): Value of every counter.
+    """
+
+    # metrics of an event summed into counters, as (event, metric, counter)
+    SUMS = (
+        ("request", "seconds", "request_seconds_sum"),
+        ("request", "ttfb", "ttfb_seconds_sum"),
+        ("request", "body_seconds", "body_seconds_sum"),
+        ("request", "bytes_sent", "bytes_sent_total"),
+        ("request", "bytes_received", "bytes_received_total"),
+        ("request", "wire_bytes", "wire_bytes_received_total"),
+        ("retry", "delay", "retry_delay_seconds_sum"),
+        ("connection", "dns_seconds", "dns_seconds_sum"),
+        ("connection", "connect_seconds", "connect_seconds_sum"),
+        ("poll", "seconds", "poll_seconds_sum"),
+        ("page", "rows", "rows_total"),
+        ("decode", "bytes", "decoded_bytes_total"),
+        ("decode", "seconds", "decode_seconds_sum"),
+        ("upload", "bytes", "uploaded_bytes_total"),
+        ("upload", "seconds", "upload_seconds_sum"),
+    )
+    COUNTS = {"request": "requests_total", "retry": "retries_total",
+              "connection": "connections_total", "poll": "polls_total", "page": "pages_total",
+              "decode": "decodes_total", "upload": "uploads_total"}
+
+    def __init__(self):
+        """
+        The constructor for the MetricsCollector class.
+        """
+        self.counters = defaultdict(float)
+        self._lock = threading.Lock()
+        self._sums = defaultdict(list)
+        for event, metric, counter in self.SUMS:
+            self._sums[event].append((metric, counter))
+
+    def on_event(self, name, metrics):
+        with self._lock:
+            if name in self.COUNTS:
+                self.counters[self.COUNTS[name]] += 1
+            if name == "request" and metrics.get("error") is not None:
+                self.counters["request_errors_total"] += 1
+            for metric, counter in self._sums.get(name, ()):
+                value = metrics.get(metric)
+                if value is not None:
+                    self.counters[counter] += value
+
+    @contextlib.contextmanager
+    def span(self, name, attributes):
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.counters[name.rsplit(".", 1)[-1] + "_calls_total"] += 1
+
+    def reset(self):
+        """
+        Sets every counter back to zero.
+        """
+        with self._lock:
+            self.counters.clear()
+
+    def to_prometheus(self, prefix="datadistillr"):
+        """
+        Returns the counters in the Prometheus text exposition format.
+
+        Parameters:
+            prefix (str): Prefix of the metric names.
+
+        Returns:
+            str: One line per counter.
+        """
+        with self._lock:
+            counters = sorted(self.counters.items())
+        return "".join(f"{prefix}_{counter} {value:g}\n" for counter, value in counters)
+
+
+class OpenTelemetryHook(InstrumentationHook):
+    """
+    This is a class for tracing the calls of the SDK with OpenTelemetry. Every call becomes a
+    span and every event an event of the current span. Needs opentelemetry-api.
+
+    Attributes:
+        tracer (opentelemetry.trace.Tracer): Tracer the spans are started with.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        The constructor for the OpenTelemetryHook class.
+
+        Parameters:
+            tracer (opentelemetry.trace.Tracer): Tracer the spans are started with. Defaults to
+            the tracer of the global tracer provider.
+
+        Raises:
+            ImportError: If opentelemetry-api is not installed.
+        """
+        try:
+            from opentelemetry import trace  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError("OpenTelemetryHook requires the opentelemetry-api package, install "
+                              "it with pip install datadistillr[otel]") from error
+
+        self._trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer("datadistillr")
+
+    @staticmethod
+    def _get_attributes(values):
+        """
+        Returns the values OpenTelemetry accepts as attributes.
+        """
+        return {key: value for key, value in values.items()
+                if isinstance(value, (str, bool, int, float))}
+
+    def on_event(self, name, metrics):
+        self._trace.get_current_span().add_event(name, self._get_attributes(metrics))
+
+    def span(self, name, attributes):
+        return self.tracer.start_as_current_span(name,
+                                                 attributes=self._get_attributes(attributes))
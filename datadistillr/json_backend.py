@@ -0,0 +1,179 @@
+"""
+This file defines the JSON backend used to decode API responses and encode checkpoints.
+"""
+
+import json
+import time
+from datadistillr import instrumentation, transfer
+
+BACKENDS = ("json", "orjson", "simdjson")
+
+
+class _JsonBackend:  # pylint: disable=too-few-public-methods
+    """
+    This is a class for the active JSON backend.
+
+    Attributes:
+        name (str): Name of the backend.
+        loads (function): Decodes JSON from str or bytes.
+        dumps (function): Encodes an object as UTF-8 JSON bytes.
+    """
+
+    def __init__(self, name, loads_fn, dumps_fn):
+        self.name = name
+        self.loads = loads_fn
+        self.dumps = dumps_fn
+
+
+def _json_dumps(obj):
+    """
+    Encodes an object as UTF-8 JSON bytes with the standard library.
+    """
+    return json.dumps(obj).encode("utf-8")
+
+
+def _load_backend(name):
+    """
+    Imports a JSON backend.
+
+    Parameters:
+        name (str): json, orjson or simdjson.
+
+    Raises:
+        ImportError: If the package of the backend is not installed.
+        ValueError: If the backend is unknown.
+
+    Returns:
+        _JsonBackend: The backend.
+    """
+    if name == "json":
+        return _JsonBackend("json", json.loads, _json_dumps)
+    if name == "orjson":
+        try:
+            import orjson  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError("the orjson JSON backend requires the orjson package, install it "
+                              "with pip install datadistillr[orjson]") from error
+        return _JsonBackend("orjson", orjson.loads, orjson.dumps)
+    if name == "simdjson":
+        try:
+            import simdjson  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError("the simdjson JSON backend requires the pysimdjson package, "
+                              "install it with pip install pysimdjson") from error
+        return _JsonBackend("simdjson", simdjson.loads, _json_dumps)
+    raise ValueError(f"unknown JSON backend {name!r}, expected one of {BACKENDS}")
+
+
+def _find_backend():
+    """
+    Returns the fastest installed JSON backend.
+    """
+    for name in ("orjson", "simdjson"):
+        try:
+            return _load_backend(name)
+        except ImportError:
+            continue
+    return _load_backend("json")
+
+
+_backend = _find_backend()
+
+
+def set_json_backend(backend="auto"):
+    """
+    Sets the JSON backend used by the SDK. By default the fastest installed backend is used:
+    orjson (pip install datadistillr[orjson]), then simdjson, then the standard library. Only
+    orjson and simdjson decode faster than response.json() of requests; the standard library
+    backend decodes at about the same speed.
+
+    Parameters:
+        backend (str or function): auto, json, orjson or simdjson, or a function decoding JSON
+        from str or bytes.
+
+    Raises:
+        ImportError: If the package of the backend is not installed.
+
+    Returns:
+        str: Name of the backend now in use.
+    """
+    global _backend  # pylint: disable=global-statement
+    if callable(backend):
+        _backend = _JsonBackend(getattr(backend, "__name__", "custom"), backend, _json_dumps)
+    elif backend == "auto":
+        _backend = _find_backend()
+    else:
+        _backend = _load_backend(backend)
+    return _backend.name
+
+
+def get_json_backend():
+    """
+    Returns the name of the JSON backend in use.
+    """
+    return _backend.name
+
+
+def loads(data):
+    """
+    Decodes JSON with the active backend.
+
+    Parameters:
+        data (str or bytes): JSON document.
+
+    Returns:
+        json: The decoded document.
+    """
+    return _backend.loads(data)
+
+
+def dumps(obj):
+    """
+    Encodes an object as JSON with the active backend.
+
+    Parameters:
+        obj (json): The object to encode.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    return _backend.dumps(obj)
+
+
+def decode(content):
+    """
+    Decodes a response body with the active backend, reporting the decode time to the
+    instrumentation hooks.
+
+    Parameters:
+        content (bytes): The response body.
+
+    Returns:
+        json: The decoded body.
+    """
+    if not instrumentation.is_enabled():
+        return _backend.loads(content)
+    start = time.perf_counter()
+    data = _backend.loads(content)
+    instrumentation.emit("decode", bytes=len(content), seconds=time.perf_counter() - start)
+    return data
+
+
+def decode_response(response):
+    """
+    Decodes the JSON body of a response in a single parse of its raw bytes, skipping the
+    text decoding and charset detection of requests.Response.json(). Compressed bodies are
+    decompressed first, see transfer.get_content().
+
+    Parameters:
+        response (requests.Response): The response.
+
+    Raises:
+        requests.HTTPError: If the status of the response is an error, e.g. a 503 that was
+        still failing after the retries of the session.
+
+    Returns:
+        json: The decoded body.
+    """
+    response.raise_for_status()
+    return decode(transfer.get_content(response))
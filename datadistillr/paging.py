@@ -0,0 +1,255 @@
+"""
+This file defines how the size of result pages is requested from DataDistillr and adapted to
+the latency and payload size of the pages received.
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+def find_page_param(query, page_number):
+    """
+    Finds the query parameter holding the page number of a page URL: the parameter whose value
+    is the page number, preferring parameters named like "page".
+
+    Parameters:
+        query (list<tuple>): Query parameters of the URL, as returned by parse_qsl.
+        page_number (int): Number of the page the URL points to.
+
+    Returns:
+        int: Index of the parameter in query, or None if it cannot be found.
+    """
+    page_params = [i for i, (_, value) in enumerate(query) if value == str(page_number)]
+    if len(page_params) > 1:
+        page_params = [i for i in page_params if 'page' in query[i][0].lower()]
+    if len(page_params) != 1:
+        return None
+    return page_params[0]
+
+
+def set_query_params(url, params):
+    """
+    Returns url with query parameters replaced or added.
+
+    Parameters:
+        url (str): The URL.
+        params (dict): Names and values of the parameters.
+
+    Returns:
+        str: The new URL.
+    """
+    split_url = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(split_url.query, keep_blank_values=True)
+             if name not in params]
+    query.extend((name, str(value)) for name, value in params.items())
+    return urlunsplit(split_url._replace(query=urlencode(query)))
+
+
+class PageSizePolicy:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    This is a class for configuring the number of rows requested per result page. The page size
+    is sent as the query parameter param of every page request. If the server answers with a
+    smaller summary.rowsPerPage, that is taken as the largest page size it allows.
+
+    If adaptive is True, the page size is doubled after a full page that took less than half of
+    target_seconds, and halved after a page that took longer than target_seconds or held more
+    than max_page_bytes, within min_page_size and max_page_size. Since pages are addressed by
+    number, the page size only grows when the rows received so far fill a whole number of
+    pages of the new size. If the server serves a page with another page size than requested,
+    the rows of that page already received are dropped, and the page size is not adapted past
+    it again.
+
+    Attributes:
+        page_size (int): Number of rows requested for the first page.
+        min_page_size (int): Smallest page size to adapt to.
+        max_page_size (int): Largest page size to adapt to.
+        target_seconds (float): Seconds one page request should take.
+        max_page_bytes (int): Largest page body to adapt to, in bytes. Bounds the memory held
+        per page.
+        adaptive (bool): Whether the page size is adapted after every page.
+        param (str): Name of the query parameter carrying the page size.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, page_size=5000, min_page_size=500, max_page_size=100000,
+                 target_seconds=1.0, max_page_bytes=64 * 1024 ** 2, adaptive=True,
+                 param="rowsPerPage"):
+        """
+        The constructor for the PageSizePolicy class.
+
+        Parameters:
+            page_size (int): Number of rows requested for the first page.
+            min_page_size (int): Smallest page size to adapt to.
+            max_page_size (int): Largest page size to adapt to.
+            target_seconds (float): Seconds one page request should take.
+            max_page_bytes (int): Largest page body to adapt to, in bytes.
+            adaptive (bool): Whether the page size is adapted after every page.
+            param (str): Name of the query parameter carrying the page size.
+        """
+        self.page_size = page_size
+        self.min_page_size = min(min_page_size, page_size)
+        self.max_page_size = max(max_page_size, page_size)
+        self.target_seconds = target_seconds
+        self.max_page_bytes = max_page_bytes
+        self.adaptive = adaptive
+        self.param = param
+
+    @classmethod
+    def from_value(cls, page_size):
+        """
+        Returns the policy for a page_size argument.
+
+        Parameters:
+            page_size (int or PageSizePolicy): A fixed number of rows per page, a policy, or
+            None to keep the page size of the server.
+
+        Returns:
+            PageSizePolicy: The policy, or None.
+        """
+        if page_size is None or isinstance(page_size, PageSizePolicy):
+            return page_size
+        return cls(page_size=page_size, adaptive=False)
+
+    def start(self):
+        """
+        Returns the state of a new paginated download that follows this policy.
+
+        Returns:
+            PageSizeState: State of the download.
+        """
+        return PageSizeState(self)
+
+
+class PageSizeState:
+    """
+    This is a class for tracking the page size of one paginated download.
+
+    Attributes:
+        policy (PageSizePolicy): The policy being followed.
+        page_size (int): Number of rows requested for the next page.
+        min_page_size (int): Smallest page size allowed, raised if the server serves pages
+        larger than requested.
+        max_page_size (int): Largest page size allowed, lowered if the server caps it.
+        rows_fetched (int): Number of rows received so far.
+        pages (list<dict>): One dictionary per page with the page size it was served with, its
+        rows, seconds and bytes.
+    """
+
+    def __init__(self, policy):
+        """
+        The constructor for the PageSizeState class.
+
+        Parameters:
+            policy (PageSizePolicy): The policy being followed.
+        """
+        self.policy = policy
+        self.page_size = policy.page_size
+        self.min_page_size = policy.min_page_size
+        self.max_page_size = policy.max_page_size
+        self.rows_fetched = 0
+        self.pages = []
+        # number of the page requested last, or None if the URL of the server was followed
+        self._page_number = None
+
+    def get_first_url(self, url):
+        """
+        Returns the URL of the first page with the page size requested.
+
+        Parameters:
+            url (str): URL of the first page.
+
+        Returns:
+            str: The URL with the page size parameter.
+        """
+        self._page_number = 1
+        return set_query_params(url, {self.policy.param: self.page_size})
+
+    def get_next_url(self, summary):
+        """
+        Returns the URL of the page following the rows received so far, with the current page
+        size. If the page number cannot be found in summary.nextPage, the URL is returned as
+        the server sent it.
+
+        Parameters:
+            summary (dict): Summary of the last page received.
+
+        Returns:
+            str: URL of the next page, or None if every page has been received.
+        """
+        self._page_number = None
+        next_url = summary.get('nextPage')
+        total_rows = summary.get('totalNumRows')
+        if next_url is None or total_rows is not None and self.rows_fetched >= total_rows:
+            return None
+        if summary.get('page') is None:
+            return next_url
+
+        split_url = urlsplit(next_url)
+        query = parse_qsl(split_url.query, keep_blank_values=True)
+        page_param = find_page_param(query, summary['page'] + 1)
+        if page_param is None:
+            return next_url
+        next_page = self.rows_fetched // self.page_size + 1
+        self._page_number = next_page
+        return set_query_params(next_url, {query[page_param][0]: next_page,
+                                           self.policy.param: self.page_size})
+
+    def record(self, rows, seconds=None, size_bytes=None, reported_page_size=None):
+        """
+        Records a page and adapts the size of the next one.
+
+        If the server served the page with another page size than requested, the page starts
+        at another row than requested. Its leading rows that were already received are
+        counted as overlap and must be dropped by the caller.
+
+        Parameters:
+            rows (int): Number of rows in the page.
+            seconds (float): Seconds the page request took, or None if the page was not
+            fetched, e.g. replayed from a checkpoint.
+            size_bytes (int): Size of the page body in bytes, or None if unknown.
+            reported_page_size (int): summary.rowsPerPage of the page.
+
+        Returns:
+            int: Number of leading rows of the page that were already received.
+        """
+        requested = self.page_size
+        served = reported_page_size or requested
+        overlap = 0
+        if seconds is not None and self._page_number is not None:
+            first_row = (self._page_number - 1) * served
+            overlap = min(max(self.rows_fetched - first_row, 0), rows)
+        self._page_number = None
+        self.rows_fetched += rows - overlap
+        self.pages.append({'page_size': served, 'rows': rows - overlap, 'seconds': seconds,
+                           'bytes': size_bytes})
+
+        if seconds is None:
+            # a replayed page continues with the page size it was fetched with
+            if reported_page_size:
+                self.page_size = reported_page_size
+            return overlap
+        if served != requested:
+            # the server did not honor the page size, so use its own and stop adapting past it
+            self.page_size = served
+            if served < requested:
+                self.max_page_size = served
+            else:
+                self.min_page_size = served
+            return overlap
+        # a page that is not full is the last one
+        if not self.policy.adaptive or rows < requested:
+            return overlap
+
+        policy = self.policy
+        too_slow = seconds > policy.target_seconds
+        too_big = size_bytes is not None and size_bytes > policy.max_page_bytes
+        if too_slow or too_big:
+            if requested % 2 == 0 and requested // 2 >= self.min_page_size:
+                self.page_size = requested // 2
+            return overlap
+
+        grown = requested * 2
+        fits = size_bytes is None or size_bytes * 2 <= policy.max_page_bytes
+        if seconds * 2 <= policy.target_seconds and fits and grown <= self.max_page_size and \
+                self.rows_fetched % grown == 0:
+            self.page_size = grown
+        return overlap
@@ -0,0 +1,74 @@
+"""
+This file defines the prefetching used to overlap downloading pages of results with
+processing them.
+"""
+
+import contextvars
+import queue
+import threading
+
+_DONE = object()
+# seconds a consumer closed early waits for the background thread to stop
+_JOIN_TIMEOUT = 1.0
+
+
+def prefetch(iterable, depth=2):
+    """
+    Yields the items of iterable while a background thread iterates it up to depth items ahead,
+    so the next items are produced, e.g. downloaded and decoded, while the current one is
+    processed. Exceptions raised by iterable are raised by this generator. If the generator is
+    closed early, iterable is closed in the background thread. The generator waits at most
+    _JOIN_TIMEOUT seconds for that, so a request or poll in progress does not hold it up; the
+    daemon thread then stops once the request returns.
+
+    The background thread runs in a copy of the current context, so instrumentation spans of
+    the caller also cover the work done by iterable.
+
+    Parameters:
+        iterable (iterable): The items to prefetch.
+        depth (int): Maximum number of items produced ahead of the consumer.
+
+    Returns:
+        generator: The items of iterable, in order.
+    """
+    items = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+
+    def put(item):
+        # returns False once the consumer stopped, so a full queue cannot block the producer
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+        except BaseException as error:  # pylint: disable=broad-exception-caught
+            put((_DONE, error))
+            return
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+        put((_DONE, None))
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(produce,),
+                              name="datadistillr-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join(_JOIN_TIMEOUT)
@@ -0,0 +1,136 @@
+"""
+This file defines the strategy used to poll DataDistillr for the results of a running query.
+"""
+
+import random
+import time
+
+
+class PollingStrategy:  # pylint: disable=too-few-public-methods
+    """
+    This is a class for configuring how the results of a running query are polled. The first
+    poll waits first_interval seconds, and every following wait grows by multiplier up to
+    max_interval. Each wait is randomized by +/- jitter (a fraction) so that many queries
+    started together do not poll in lockstep. Polling stops with a TimeoutError once deadline
+    seconds have passed since the first poll. The deadline and the backoff apply to each page
+    of the results separately, so a long download does not use up the deadline of later pages.
+
+    Attributes:
+        first_interval (float): Seconds to wait after the first poll.
+        multiplier (float): Factor applied to the wait after every poll.
+        max_interval (float): Maximum seconds to wait between polls.
+        jitter (float): Fraction by which each wait is randomized.
+        deadline (float): Maximum seconds to poll one page for, or None to poll indefinitely.
+    """
+
+    def __init__(self, first_interval=0.25, multiplier=2.0, max_interval=10.0, jitter=0.1,
+                 deadline=600.0):
+        """
+        The constructor for the PollingStrategy class.
+
+        Parameters:
+            first_interval (float): Seconds to wait after the first poll.
+            multiplier (float): Factor applied to the wait after every poll.
+            max_interval (float): Maximum seconds to wait between polls.
+            jitter (float): Fraction by which each wait is randomized.
+            deadline (float): Maximum seconds to poll one page for, or None to poll
+            indefinitely.
+        """
+        self.first_interval = first_interval
+        self.multiplier = multiplier
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def start(self):
+        """
+        Returns the state of a new polling run that follows this strategy.
+
+        Returns:
+            PollingState: State of the polling run.
+        """
+        return PollingState(self)
+
+
+class PollingState:
+    """
+    This is a class for tracking one polling run of a PollingStrategy. A run polls every page
+    of a result, and start_page() restarts the deadline and the backoff for the next page.
+
+    Attributes:
+        strategy (PollingStrategy): The strategy being followed.
+        polls (list<dict>): One dictionary per poll with the request latency in seconds, the
+        query run status, the size of the response in bytes and the seconds waited before the
+        next poll.
+    """
+
+    def __init__(self, strategy):
+        """
+        The constructor for the PollingState class.
+
+        Parameters:
+            strategy (PollingStrategy): The strategy being followed.
+        """
+        self.strategy = strategy
+        self.polls = []
+        self.started_at = time.monotonic()
+        self._interval = strategy.first_interval
+        self._page_first_poll = 0
+
+    @property
+    def latencies(self):
+        """
+        Returns the observed request latency of every poll, in seconds.
+        """
+        return [poll['latency'] for poll in self.polls]
+
+    @property
+    def elapsed(self):
+        """
+        Returns the seconds passed since the polling of the current page started.
+        """
+        return time.monotonic() - self.started_at
+
+    def start_page(self):
+        """
+        Restarts the deadline and the backoff before a page is polled.
+        """
+        self.started_at = time.monotonic()
+        self._interval = self.strategy.first_interval
+        self._page_first_poll = len(self.polls)
+
+    def record(self, latency, status, size=None):
+        """
+        Records a poll.
+
+        Parameters:
+            latency (float): Seconds the poll request took.
+            status (str): Status of the query run returned by the poll.
+            size (int): Size of the response in bytes, or None if unknown.
+        """
+        self.polls.append({'latency': latency, 'status': status, 'size': size, 'delay': None})
+
+    def next_delay(self):
+        """
+        Returns the seconds to wait before the next poll and advances the backoff.
+
+        Raises:
+            TimeoutError: If the deadline has passed.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        strategy = self.strategy
+        delay = min(self._interval, strategy.max_interval)
+        delay *= random.uniform(1 - strategy.jitter, 1 + strategy.jitter)
+        if strategy.deadline is not None:
+            remaining = strategy.deadline - self.elapsed
+            if remaining <= 0:
+                raise TimeoutError(f"query results not ready after "
+                                   f"{len(self.polls) - self._page_first_poll} polls and "
+                                   f"{self.elapsed:.1f} seconds")
+            delay = min(delay, remaining)
+        self._interval = min(self._interval * strategy.multiplier, strategy.max_interval)
+        if self.polls:
+            self.polls[-1]['delay'] = delay
+        return max(delay, 0.0)
@@ -2,71 +2,114 @@
 This file defines the project class for getting project level data.
 """
 import time
-import os
-import ntpath
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-
-
-class Project:
+from datadistillr.base import ProjectBase
+from datadistillr.cache import TTLCache, build_name_index
+from datadistillr import instrumentation
+from datadistillr.checkpoint import DownloadCheckpoint, UploadCheckpoint
+from datadistillr.data_types import build_dataframe, concat_dataframes
+from datadistillr.json_backend import decode_response
+from datadistillr.pipeline import prefetch
+from datadistillr.writers import read_arrow_ipc, write_arrow_ipc
+from datadistillr.scheduler import QueryScheduler
+from datadistillr.session import DatadistillrSession
+
+
+class Project(ProjectBase):
     """
     This is a class for getting project level data.
 
     Attributes:
         proj_details (json): json containing details of project.
+        polling (PollingStrategy): Strategy used to poll for the results of running queries.
+        last_polling_state (PollingState): Polls made for the most recent query run, including
+        the latency of every poll.
+        metadata_cache (TTLCache): Cache of the project details and data source listing.
+        result_cache (ResultCache): On-disk cache of query results, or None.
+        page_size (PageSizePolicy): Number of rows requested per page of query results, or
+        None for the page size of the server.
     """
-    BASE_URL = "https://app.datadistillr.io/api/"
-    PROJECT_DISTILLRY = BASE_URL + "projectDistillry"
-    QUERY_BARRELS = BASE_URL + "queryBarrels"
-    QUERY_RUN_PAGE = BASE_URL + "queryResults"
-    PROJECT_PAGE = BASE_URL + "project"
-    DATA_SOURCE_PAGE = BASE_URL + "dataSource"
-    MAX_ATTEMPTS = 20
-    SLEEP_TIMER = 5.0
+    # pages of query results fetched ahead of the page being converted
+    PREFETCH_PAGES = 2
 
-    def __init__(self, proj_details, _curr_session):
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, proj_details, _curr_session, polling=None, lazy=False, cache_ttl=300.0,
+                 result_cache=None, page_size=None):
         """
         The constructor for Datadistillr class. Creates a session and contains project details.
 
         Parameters:
             proj_details (JSON): JSON containing details of project.
+            polling (PollingStrategy): Strategy used to poll for the results of running
+            queries. Defaults to PollingStrategy().
+            lazy (bool): If True, proj_details only needs the name and token of the project,
+            and the full details are downloaded on first access of details_json.
+            cache_ttl (float): Seconds the project details and data source listing are cached
+            for. Use 0 to disable caching, or None to cache until invalidate_cache() is called.
+            result_cache (ResultCache): On-disk cache the results of executed queries are
+            returned from while the tab and its query are unchanged. Results are not cached
+            if None.
+            page_size (int or PageSizePolicy): Number of rows requested per page of query
+            results, or a PageSizePolicy adapting it to the latency and size of the pages.
+            Defaults to the page size of the server.
         """
 
-        self.session = _curr_session
-        self.details_json = proj_details
-        self.name = self.details_json["name"]
-        self.project_token = self.details_json["token"]
-        self.barrel_token_dict = {}
-        self.data_source_token_dict = {}
+        super().__init__(proj_details, _curr_session, polling, result_cache, page_size)
+        self.metadata_cache = TTLCache(cache_ttl)
+        if not lazy:
+            self.metadata_cache.set("details", self._index_details(proj_details))
 
-    def get_tab_token_dict(self):
+    def _get_details(self):
         """
-        Returns dictionary with tab tokens as keys and tab names as values.
-        A tab in the DataDistillr user interface is equivalent to a query barrel in API routes and
-        responses.
+        Returns the cached project details.
 
         Returns:
-            dictionary (int -> str): dictionary with query barrel token as key and query barrel
-            name as value.
+            tuple: The project details, dictionary from tab tokens to names, and dictionary from
+            tab names to tokens.
         """
 
-        project_query_barrels = self.details_json["queryBarrels"]
-        for query_barrel in project_query_barrels:
-            self.barrel_token_dict[query_barrel["token"]] = query_barrel["name"]
-        return self.barrel_token_dict
+        return self.metadata_cache.get("details", self._load_details)
 
-    def get_tab_token(self, tab_name):
+    def _load_details(self):
         """
-        Returns tab token that matches tab_name
+        Downloads the project details.
 
         Returns:
-            int: tab token
+            tuple: The project details, dictionary from tab tokens to names, and dictionary from
+            tab names to tokens.
         """
 
-        tab_token_dict = self.get_tab_token_dict()
-        for token, name in tab_token_dict.items():
-            if tab_name == name:
-                return token
-        raise Exception("token not found")
+        project_details_page = self.PROJECT_DISTILLRY + "/" + str(self.project_token)
+        project_details = self.session.get(url=project_details_page)
+        return self._index_details(decode_response(project_details)['project'])
+
+    def invalidate_cache(self):
+        """
+        Clears the cached project details and data source listing, so the next lookup downloads
+        them again.
+        """
+
+        self.metadata_cache.invalidate()
+
+    def _get_recent_query(self, barrel_token):
+        """
+        Returns the most recent query in query barrel.
+
+        Parameters:
+            barrel_token (int): Token that uniquely identifies query barrel.
+
+        Returns:
+            dict: The most recent query, with its token under token and its SQL statement
+            under query.
+        """
+
+        queries_page = self.QUERY_BARRELS + "/" + str(barrel_token)
+        queries_response = self.session.get(url=queries_page)
+        queries_response_json = decode_response(queries_response)
+        # Finds the part regarding the queries
+        queries_list = queries_response_json["queryBarrel"]["queries"]
+        return queries_list[-1]
 
     def _get_recent_query_token(self, barrel_token):
         """
@@ -82,79 +125,185 @@ class Project:
             int: Token of most recent query in query barrel.
         """
 
-        queries_page = self.QUERY_BARRELS + "/" + str(barrel_token)
-        queries_response = self.session.get(url=queries_page)
-        queries_response_json = queries_response.json()
-        # Finds the part regarding the queries
-        queries_list = queries_response_json["queryBarrel"]["queries"]
-        # Finds token of most recent query
-        query_token = queries_list[-1]["token"]
-        return query_token
+        return self._get_recent_query(barrel_token)["token"]
 
-    def _get_query_results(self, url_endpoint: str, attempts: int) -> dict:
+    def _poll_query_results_once(self, url_endpoint: str, polling_state) -> dict:
         """
-        Returns results of previously ran query.
+        Requests url_endpoint once and records the poll.
 
         Parameters:
             url_endpoint (str): API endpoint for query data
+            polling_state (PollingState): State of the polling run.
 
         Returns:
-            pandas dataframe: Results of query.
+            dict: The response of the poll.
         """
 
-        results: dict = {'data': [], 'summary': {}}
-
+        start = time.monotonic()
         response = self.session.get(url=url_endpoint)
 
         # Grab JSON object from response
-        response_data = response.json()
-
-        # response is success and has data
-        if response_data['queryRun']['status'] == 'complete':
-            # add data from response to data list
-            results['data'].extend(response_data['results'])
-            results['summary'] = response_data['summary']
-
-            # if response has a nextPage set... grab next page
-            if response_data['summary'].get('nextPage', None) is not None:
-                page_data = self._get_query_results(response_data['summary']['nextPage'],
-                                                    attempts)
-                results['data'].extend(page_data['data'])
-
-                # deletes page, nextPage, and totalPages within summary
-                try:
-                    del results['summary']['page']
-                except KeyError:
-                    pass
-
-                try:
-                    del results['summary']['nextPage']
-                except KeyError:
-                    pass
-                try:
-                    del results['summary']['totalPages']
-                except KeyError:
-                    pass
-
-        # Data request is still processing/running. Will try in a few seconds
-        elif response_data['queryRun']['status'] == 'running':
-            print("running")
-            time.sleep(self.SLEEP_TIMER)
-
-            if attempts < self.MAX_ATTEMPTS:
-                results = self._get_query_results(url_endpoint, attempts + 1)
-            else:
-                # Number of attempts exceeded.  Exit potential infinite loop
-                raise Exception('failed after', self.MAX_ATTEMPTS, 'failed attempts')
-        # response is an unexpected error
-        else:
-            raise Exception('server response is', response_data)
+        response_data = decode_response(response)
+        latency = time.monotonic() - start
+        status = response_data['queryRun']['status']
+        polling_state.record(latency, status, len(response.content))
+        instrumentation.emit("poll", url=url_endpoint, status=status, seconds=latency)
+        return response_data
+
+    def _poll_query_results(self, url_endpoint: str, polling_state) -> dict:
+        """
+        Requests url_endpoint until the query run is no longer running, waiting between polls
+        as set by the polling strategy.
+
+        Parameters:
+            url_endpoint (str): API endpoint for query data
+            polling_state (PollingState): State of the polling run.
+
+        Raises:
+            TimeoutError: If the query is still running after the polling deadline.
+
+        Returns:
+            dict: The response of the first poll where the query is not running.
+        """
+
+        polling_state.start_page()
+        while True:
+            response_data = self._poll_query_results_once(url_endpoint, polling_state)
+            if response_data['queryRun']['status'] != 'running':
+                return response_data
 
-        return results
+            # Data request is still processing/running. Will try again after a backoff
+            time.sleep(polling_state.next_delay())
 
-    def _execute_query(self, barrel_token, query_token):
+    def _iter_query_result_pages(self, url_endpoint: str, polling_state, checkpoint=None,
+                                 sizing=None):
         """
-        Executes query. Execute means to run query and get results of query.
+        Yields every page of the results of a query run, following summary.nextPage
+        iteratively. Each page is polled until the query run is no longer running.
+
+        Parameters:
+            url_endpoint (str): API endpoint for the first page of query data
+            polling_state (PollingState): State of the polling run.
+            checkpoint (DownloadCheckpoint): Checkpoint every page is saved in. Pages it
+            already holds are yielded from it and fetching resumes at its nextPage cursor.
+            sizing (PageSizeState): Page size state choosing the size of every page fetched,
+            or None to follow summary.nextPage as is.
+
+        Returns:
+            generator<dict>: The response of every page.
+        """
+
+        if checkpoint is not None and checkpoint.page_count > 0:
+            response_data = None
+            for response_data in checkpoint.iter_pages():
+                if sizing is not None:
+                    sizing.record(len(response_data['results']),
+                                  reported_page_size=response_data['summary'].get('rowsPerPage'))
+                yield response_data
+            url_endpoint = checkpoint.next_page
+            if sizing is not None and response_data is not None:
+                url_endpoint = sizing.get_next_url(response_data['summary'])
+        elif sizing is not None and not sizing.pages:
+            url_endpoint = sizing.get_first_url(url_endpoint)
+
+        while url_endpoint is not None:
+            response_data = self._poll_query_results(url_endpoint, polling_state)
+
+            # response is an unexpected error
+            if response_data['queryRun']['status'] != 'complete':
+                raise Exception('server response is', response_data)
+
+            if instrumentation.is_enabled():
+                instrumentation.emit("page", url=url_endpoint,
+                                     page=response_data['summary'].get('page'),
+                                     rows=len(response_data['results']))
+            url_endpoint = self._get_next_result_page(response_data, polling_state, sizing)
+            if checkpoint is not None:
+                checkpoint.add_page(response_data)
+            yield response_data
+
+    def _get_query_results(self, url_endpoint: str, polling_state=None,
+                           first_page=None, checkpoint=None, sizing=None) -> dict:
+        """
+        Returns results of previously ran query. Pages are copied into one buffer sized from the
+        total number of rows reported with the first page.
+
+        Parameters:
+            url_endpoint (str): API endpoint for query data
+            polling_state (PollingState): State of the polling run. A new run of the project
+            polling strategy is started if not given.
+            first_page (dict): Response for the first page of query data if it was already
+            polled, in which case collecting continues with its next page.
+            checkpoint (DownloadCheckpoint): Checkpoint the pages are saved in, to resume
+            collecting after a failure.
+            sizing (PageSizeState): Page size state of the download, which first_page was
+            requested with. A new one is started from the project page size if not given.
+
+        Returns:
+            dict: Rows of the query results under data and the summary of the first page under
+            summary.
+        """
+
+        polling_state, sizing = self._start_download(polling_state, sizing)
+        result_buffer, url_endpoint = self._start_result_buffer(url_endpoint, first_page,
+                                                                polling_state, sizing)
+        if first_page is not None and checkpoint is not None:
+            checkpoint.add_page(first_page)
+        for response_data in self._iter_query_result_pages(url_endpoint, polling_state,
+                                                           checkpoint, sizing):
+            result_buffer.add_page(response_data)
+        return result_buffer.get_results()
+
+    def _iter_query_result_dataframes(self, url_endpoint, dtype_backend=None, categories=None,
+                                      checkpoint=None):
+        """
+        Yields the results of a query run as one DataFrame per page. The index of each
+        DataFrame continues where the previous one ended. Pages are fetched and decoded by a
+        background thread, so the next page is downloaded while the current one is converted.
+
+        Parameters:
+            url_endpoint (str): API endpoint for the first page of query data
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+            checkpoint (DownloadCheckpoint): Checkpoint the pages are saved in, to resume
+            after a failure.
+
+        Returns:
+            generator<DataFrame>: The rows of every page.
+        """
+
+        polling_state = self.polling.start()
+        self.last_polling_state = polling_state
+
+        summary = None
+        row_count = 0
+        pages = self._iter_query_result_pages(url_endpoint, polling_state, checkpoint,
+                                              self._start_page_sizing())
+        for response_data in prefetch(pages, self.PREFETCH_PAGES):
+            if summary is None:
+                summary = response_data['summary']
+            page_rows = response_data['results']
+            index = pd.RangeIndex(row_count, row_count + len(page_rows))
+            row_count += len(page_rows)
+            yield build_dataframe(page_rows, summary['columnNames'], summary.get('dataTypes'),
+                                  dtype_backend=dtype_backend, categories=categories,
+                                  index=index)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _execute_query(self, barrel_token, query_token, dtype_backend=None, categories=None,
+                       query_text=None, spool_path=None, checkpoint_path=None):
+        """
+        Executes query. Execute means to run query and get results of query. With a result
+        cache and the query text, a cached result of the same query is returned instead.
+
+        With a spool_path, the pages of the results are written to an Arrow IPC file as they
+        arrive and a memory-mapped view of the file is returned. The result cache is not used
+        then.
+
+        With a checkpoint_path, the pages of the results are saved in that directory as they
+        arrive. If an earlier execution of the same query failed midway, its query run is not
+        started again: the saved pages are reused and the remaining pages are fetched from the
+        last saved nextPage cursor. The checkpoint is cleared once all pages are collected.
 
         Parameters:
             barrel_token (int): Token the uniquely identifies query barrel. A dictionary with
@@ -164,29 +313,104 @@ class Project:
 
             query_token (int): Token the uniquely identifies query in query barrel.
 
+            dtype_backend (str): numpy_nullable for pandas nullable dtypes, pyarrow for
+            Arrow-backed dtypes, or None for untyped columns.
+
+            categories (list<str>): Names of columns to store as categoricals.
+
+            query_text (str): SQL statement of the query, used to key the result cache.
+
+            spool_path (str): Filename of an Arrow IPC file the results are spooled to.
+
+            checkpoint_path (str): Directory the pages of the results are saved in.
+
         Returns:
             pandas dataframe: Formatted results of query.
 
         """
 
-        # runs query
-        query_run_page = self.QUERY_BARRELS + "/" + str(barrel_token) + "/query/" + \
-            str(query_token) + "/run"
-        query_run = self.session.get(url=query_run_page)
-        query_run_json = query_run.json()
-        run_request_token = query_run_json["requestToken"]
+        with instrumentation.span("datadistillr.execute_query", barrel_token=barrel_token,
+                                  query_token=query_token):
+            return self._run_query(barrel_token, query_token, dtype_backend, categories,
+                                   query_text, spool_path, checkpoint_path)
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _run_query(self, barrel_token, query_token, dtype_backend, categories, query_text,
+                   spool_path, checkpoint_path):
+        """
+        Executes query, see _execute_query().
+
+        Returns:
+            pandas dataframe: Formatted results of query.
+        """
+
+        cache_key = None
+        if spool_path is None:
+            cache_key = self._get_result_cache_key(barrel_token, query_token, query_text,
+                                                   dtype_backend, categories)
+        if cache_key is not None:
+            data_frame = self.result_cache.get(cache_key)
+            if data_frame is not None:
+                return data_frame
+
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = DownloadCheckpoint(checkpoint_path, f"{barrel_token}/{query_token}")
+
+        # runs query, unless a checkpointed run can be resumed
+        if checkpoint is not None and checkpoint.url is not None:
+            query_results = checkpoint.url
+        else:
+            query_results = self._start_query_run(barrel_token, query_token)
+            if checkpoint is not None:
+                checkpoint.start(query_results)
 
         # gets result of query
-        query_results = self.QUERY_RUN_PAGE + "/" + str(run_request_token)
-        attempts = 0
-        results = self._get_query_results(query_results, attempts)
+        if spool_path is not None:
+            write_arrow_ipc(self._iter_query_result_dataframes(query_results, dtype_backend,
+                                                               categories, checkpoint),
+                            spool_path)
+            data_frame = read_arrow_ipc(spool_path, as_dataframe=True)
+        elif dtype_backend is None:
+            # pandas infers untyped columns from all rows, so they are built at once
+            results = self._get_query_results(query_results, checkpoint=checkpoint)
+            data_frame = self._build_query_dataframe(results, dtype_backend, categories,
+                                                     cache_key)
+        else:
+            # typed columns are converted page by page while the next page is fetched
+            data_frame = concat_dataframes(
+                self._iter_query_result_dataframes(query_results, dtype_backend, categories,
+                                                   checkpoint),
+                categories)
+            if cache_key is not None:
+                self.result_cache.set(cache_key, data_frame)
+        if checkpoint is not None:
+            checkpoint.clear()
+        return data_frame
+
+    def _start_query_run(self, barrel_token, query_token):
+        """
+        Starts a run of a query.
+
+        Parameters:
+            barrel_token (int): Token the uniquely identifies query barrel.
+            query_token (int): Token the uniquely identifies query in query barrel.
 
-        # format query results
-        schema = results['summary']['columnNames']
-        data = results['data']
-        return pd.DataFrame(data, columns=schema)
+        Returns:
+            str: API endpoint for the results of the query run.
+        """
+
+        query_run_page = self._get_query_run_page(barrel_token, query_token)
+        # every GET of the page starts another run, so it is not retried; only a
+        # DatadistillrSession retries requests and takes the idempotent keyword
+        options = {'idempotent': False} if isinstance(self.session, DatadistillrSession) else {}
+        query_run = self.session.get(url=query_run_page, **options)
+        query_run_json = decode_response(query_run)
+        run_request_token = query_run_json["requestToken"]
+        return self.QUERY_RUN_PAGE + "/" + str(run_request_token)
 
-    def execute_existing_query(self, tab_token):
+    def execute_existing_query(self, tab_token, dtype_backend=None, categories=None,
+                               spool_path=None, checkpoint_path=None):
         """
 
         Executes most recent query in a tab. The tab is identified by tab_token. A tab in the
@@ -197,15 +421,55 @@ class Project:
             tab_token: Token the uniquely identifies query barrel. A dictionary with
             all tab tokens can be found using get_tab_token_dict().
 
+            dtype_backend (str): numpy_nullable for pandas nullable dtypes, pyarrow for
+            Arrow-backed dtypes, or None for untyped columns. Column dtypes are taken from
+            the data types reported with the query results.
+
+            categories (list<str>): Names of columns to store as categoricals.
+
+            spool_path (str): If set, the results are written to an Arrow IPC file at
+            spool_path page by page, and a memory-mapped DataFrame with Arrow-backed columns is
+            returned, so results larger than memory can be used. Requires pyarrow.
+
+            checkpoint_path (str): If set, the pages of the results are saved in this
+            directory as they arrive. If the download fails midway, executing the query again
+            with the same checkpoint_path resumes from the last saved page instead of running
+            the query again.
+
         Returns:
             pandas dataframe: Formatted results of query.
 
         """
 
-        query_token = self._get_recent_query_token(tab_token)
-        return self._execute_query(tab_token, query_token)
+        query = self._get_recent_query(tab_token)
+        return self._execute_query(tab_token, query["token"], dtype_backend, categories,
+                                   query.get("query"), spool_path, checkpoint_path)
 
-    def execute_new_query(self, tab_name, query):
+    def execute_existing_queries(self, tab_tokens, max_concurrent=8, dtype_backend=None,
+                                 categories=None):
+        """
+        Executes the most recent query of many tabs at once and yields the results as they
+        complete, so the total time approaches that of the slowest query instead of the sum of
+        all of them. Up to max_concurrent queries run at a time, and all running queries are
+        polled from one scheduler, see QueryScheduler.
+
+        Parameters:
+            tab_tokens (iterable): Tokens that uniquely identify query barrels.
+            max_concurrent (int): Maximum number of queries running at once.
+            dtype_backend (str): numpy_nullable for pandas nullable dtypes, pyarrow for
+            Arrow-backed dtypes, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+
+        Returns:
+            generator<tuple>: The tab token and the pandas dataframe of every query, in the
+            order the queries complete. Use dict() to collect them.
+        """
+
+        scheduler = QueryScheduler(self, max_concurrent, dtype_backend, categories)
+        yield from scheduler.run(tab_tokens)
+
+    def execute_new_query(self, tab_name, query, dtype_backend=None, categories=None,
+                          spool_path=None):
         """
 
         Creates new tab named tab_name and executes query in tab.
@@ -215,44 +479,68 @@ class Project:
         Parameters:
             tab_name (str): Name of new tab
             query (int): SQL statement to be run in tab.
+            dtype_backend (str): numpy_nullable for pandas nullable dtypes, pyarrow for
+            Arrow-backed dtypes, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+            spool_path (str): Filename of an Arrow IPC file the results are spooled to, see
+            execute_existing_query().
 
         Returns:
             pandas dataframe: Formatted results of query.
         """
 
-        query_barrel_details = {
-            "projectSlug": self.name.lower().replace(' ', '-'),
-            "projectToken": self.project_token,
-            "name": tab_name,
-            "active": True,
-            "icon": "type-icon-file",
-            "query": "  " + query
-        }
-
+        query_barrel_details = self._get_new_query_barrel_details(tab_name, query)
         query_barrel_resp = self.session.post(url=self.QUERY_BARRELS, json=query_barrel_details,
                                               verify=False)
-        query_barrel_resp_json = query_barrel_resp.json()
+        query_barrel_resp_json = decode_response(query_barrel_resp)
         barrel_token = query_barrel_resp_json["queryBarrel"]["queries"][0]["queryBarrelToken"]
         query_token = query_barrel_resp_json["queryBarrel"]["queries"][0]["token"]
 
-        return self._execute_query(barrel_token, query_token)
+        # the project has a new tab now
+        self.metadata_cache.invalidate("details")
+
+        return self._execute_query(barrel_token, query_token, dtype_backend, categories,
+                                   spool_path=spool_path)
 
     def get_data_source_token_dict(self):
         """
         Returns dictionary with data source tokens as keys and data source names as values.
+        The listing is cached, see invalidate_cache().
 
         Returns:
             dictionary (int -> str): Dictionary with data source tokens as keys and data source
             ames as values.
         """
 
+        self.data_source_token_dict = self._get_data_source_tokens()[0]
+        return self.data_source_token_dict
+
+    def _get_data_source_tokens(self):
+        """
+        Returns the cached data source listing.
+
+        Returns:
+            tuple: Dictionary from data source tokens to names, and dictionary from names to
+            tokens.
+        """
+
+        return self.metadata_cache.get("data_sources", self._load_data_source_tokens)
+
+    def _load_data_source_tokens(self):
+        """
+        Downloads the data source listing.
+
+        Returns:
+            tuple: Dictionary from data source tokens to names, and dictionary from names to
+            tokens.
+        """
+
         get_data_sources = self.PROJECT_PAGE + "/" + str(self.project_token) + "/dataSource"
         data_sources_response = self.session.get(url=get_data_sources)
-        data_sources_response_json = data_sources_response.json()
-        data_sources = data_sources_response_json["dataSources"]
-        for data_source in data_sources:
-            self.data_source_token_dict[data_source["token"]] = data_source["name"]
-        return self.data_source_token_dict
+        data_sources_response_json = decode_response(data_sources_response)
+        data_source_token_dict = {data_source["token"]: data_source["name"]
+                                  for data_source in data_sources_response_json["dataSources"]}
+        return data_source_token_dict, build_name_index(data_source_token_dict)
 
     def get_data_source_token(self, data_source_name):
         """
@@ -262,61 +550,141 @@ class Project:
             int: data source token
         """
 
-        data_source_token_dict = self.get_data_source_token_dict()
-        for token, name in data_source_token_dict.items():
-            if data_source_name == name:
-                return token
+        name_index = self._get_data_source_tokens()[1]
+        if data_source_name in name_index:
+            return name_index[data_source_name]
         raise Exception("token not found")
 
-    def _get_presigned_urls(self, data_source_token, file_paths):
+    def _get_presigned_urls(self, data_source_token, sources):
         """
-        Returns list of AWS presigned urls for each file path in list of file paths
+        Returns list of AWS presigned urls for each upload source in list of upload sources
 
         Returns:
             array (str): list of presigned urls
         """
 
-        # building array of file objects for post request
-        files_array = []
-        for file_path in file_paths:
-            file_size = os.path.getsize(file_path)
-            file_name = ntpath.basename(file_path)
-            file_obj = {
-                "name": file_name,
-                "size": file_size,
-                "type": "text/csv",
-                "path": "/"
-            }
-
-            files_array.append(file_obj)
-        files = {"files": files_array}
-
+        files = self._get_upload_details(sources)
         post_data_source = self.DATA_SOURCE_PAGE + "/" + str(data_source_token) + "/file"
         response = self.session.post(post_data_source, json=files, verify=False)
-        presigned_urls = response.json()["presignedUrls"]
+        presigned_urls = decode_response(response)["presignedUrls"]
         return presigned_urls
 
-    def upload_files(self, data_source_token, file_paths):
+    def _upload_file(self, presigned_url, source):
         """
-        Uploads list of files to a data source.
+        Uploads one file to a presigned url. The file is read in binary and streamed from disk
+        in small blocks, so it is never held in memory as a whole.
+
+        Parameters:
+            presigned_url (str): Presigned url to upload the file to.
+            source (UploadSource): Upload source of the file.
+
+        Returns:
+            int: Number of bytes uploaded.
+        """
+
+        name = source.file_path or source.name
+        with instrumentation.span("datadistillr.upload_file", name=name, bytes=source.size):
+            start = time.perf_counter()
+            with source.open() as file:
+                response = self.session.put(presigned_url,
+                                            data=file,
+                                            headers=source.get_headers())
+
+            if not response.ok:
+                raise Exception("file not uploaded", name)
+            instrumentation.emit("upload", name=name, bytes=source.size,
+                                 seconds=time.perf_counter() - start)
+        return source.size
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def upload_files(self, data_source_token, file_paths, max_workers=4, checkpoint_path=None,
+                     compression=None, compression_level=None):
+        """
+        Uploads list of files to a data source. Files are streamed from disk and up to
+        max_workers files are uploaded at once.
+
+        If checkpoint_path is given, every finished upload is recorded in that file. Running
+        the upload again with the same checkpoint skips the files that were already uploaded
+        and have not changed since, and only requests presigned urls for the remaining files.
+
+        With compression set to 'gzip' or 'zstd', every file is compressed before it is
+        uploaded and is stored with the extension of the compression, e.g. data.csv.gz. zstd
+        compression needs the zstandard package.
 
         Parameters:
             data_source_token (int): Token the uniquely identifies data source.
             file_paths (array): List of absolute file paths of files to be uploaded.
+            max_workers (int): Maximum number of files uploaded at once.
+            checkpoint_path (str): Path of a file recording finished uploads.
+            compression (str): None, 'gzip' or 'zstd'.
+            compression_level (int): Compression level, None for the default.
 
         Returns:
             boolean: True if file was uploaded successfully.
         """
 
-        presigned_urls = self._get_presigned_urls(data_source_token, file_paths)
-        for i, file_path in enumerate(file_paths):
-            presigned_url = presigned_urls[i]
-            with open(file_path, encoding="utf-8") as file:
-                file_data = file.read()
-                response = self.session.put(presigned_url,
-                                            data=file_data,
-                                            headers={'content-type': 'text/plain'})
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = UploadCheckpoint(checkpoint_path)
+            file_paths = [file_path for file_path in file_paths
+                          if not checkpoint.is_uploaded(data_source_token, file_path)]
+            if not file_paths:
+                return 'file uploaded successfully'
 
-            if not response.ok:
-                raise Exception("file not uploaded")
+        sources = self._get_upload_sources(file_paths, compression, compression_level)
+        return self._upload_sources(data_source_token, sources, max_workers, checkpoint)
+
+    def upload_data(self, data_source_token, data, max_workers=4, row_group_size=100000):
+        """
+        Uploads DataFrames, Arrow tables or iterables of rows to a data source as Parquet
+        files, without writing them to disk first. Every item is serialized in memory one row
+        group at a time, and up to max_workers files are uploaded at once. Needs pyarrow.
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            data (dict): File names mapped to a DataFrame, an Arrow table or an iterable of
+                DataFrames or of rows as dictionaries. Names get a .parquet extension if they
+                have none.
+            max_workers (int): Maximum number of files uploaded at once.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            str: A success message if all files were uploaded.
+        """
+
+        sources = self._get_data_upload_sources(data, row_group_size)
+        return self._upload_sources(data_source_token, sources, max_workers)
+
+    def _upload_sources(self, data_source_token, sources, max_workers, checkpoint=None):
+        """
+        Requests presigned urls for upload sources and uploads them, up to max_workers at once.
+        The sources are closed afterwards.
+
+        Parameters:
+            data_source_token (int): Token the uniquely identifies data source.
+            sources (array): List of UploadSource objects.
+            max_workers (int): Maximum number of files uploaded at once.
+            checkpoint (UploadCheckpoint): Checkpoint recording finished uploads, or None.
+
+        Returns:
+            str: A success message if all files were uploaded.
+        """
+
+        def upload(presigned_url, source):
+            self._upload_file(presigned_url, source)
+            if checkpoint is not None:
+                checkpoint.mark_uploaded(data_source_token, source.file_path)
+
+        try:
+            presigned_urls = self._get_presigned_urls(data_source_token, sources)
+            if max_workers <= 1 or len(sources) <= 1:
+                for presigned_url, source in zip(presigned_urls, sources):
+                    upload(presigned_url, source)
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # consume the results so the first failed upload raises here
+                    list(executor.map(upload, presigned_urls, sources))
+        finally:
+            for source in sources:
+                source.close()
         return 'file uploaded successfully'
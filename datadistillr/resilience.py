@@ -0,0 +1,264 @@
+"""
+This file defines the retry policy, rate limiter and circuit breaker applied to the HTTP requests
+sent to DataDistillr.
+"""
+
+import email.utils
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """
+    Exception raised when a request is refused because the circuit breaker is open.
+
+    Attributes:
+        retry_in (float): Seconds until the circuit breaker lets a trial request through.
+    """
+
+    def __init__(self, retry_in):
+        self.retry_in = retry_in
+        super().__init__(f"circuit breaker is open after repeated failures, retry in "
+                         f"{retry_in:.1f} seconds")
+
+
+def parse_retry_after(value):
+    """
+    Parses the value of a Retry-After header.
+
+    Parameters:
+        value (str): Either a number of seconds or an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the value cannot be parsed.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RetryPolicy:  # pylint: disable=too-few-public-methods
+    """
+    This is a class for configuring how failed requests are retried. Connection errors and
+    responses with a status in retry_statuses are retried up to max_retries times if the
+    request method is idempotent. A 429 response is retried for every method, since the server
+    did not process the request. The wait before a retry follows the Retry-After header of the
+    response if there is one, and otherwise grows exponentially from backoff by multiplier up
+    to max_backoff, randomized by +/- jitter (a fraction).
+
+    Attributes:
+        max_retries (int): Maximum number of retries of one request. 0 disables retries.
+        backoff (float): Seconds to wait before the first retry.
+        multiplier (float): Factor applied to the wait after every retry.
+        max_backoff (float): Maximum seconds to wait before a retry without Retry-After.
+        jitter (float): Fraction by which each wait is randomized.
+        retry_statuses (frozenset<int>): Response statuses that are retried.
+        retry_methods (frozenset<str>): Request methods that are retried after a failure.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    RETRY_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, max_retries=5, backoff=0.5, multiplier=2.0, max_backoff=30.0,
+                 jitter=0.1, retry_statuses=RETRY_STATUSES, retry_methods=RETRY_METHODS):
+        """
+        The constructor for the RetryPolicy class.
+
+        Parameters:
+            max_retries (int): Maximum number of retries of one request. 0 disables retries.
+            backoff (float): Seconds to wait before the first retry.
+            multiplier (float): Factor applied to the wait after every retry.
+            max_backoff (float): Maximum seconds to wait before a retry without Retry-After.
+            jitter (float): Fraction by which each wait is randomized.
+            retry_statuses (iterable<int>): Response statuses that are retried.
+            retry_methods (iterable<str>): Request methods that are retried after a failure.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+
+    def can_retry(self, method, attempt, status=None, idempotent=None):
+        """
+        Returns whether a failed request may be retried.
+
+        Parameters:
+            method (str): Request method.
+            attempt (int): Number of retries made so far.
+            status (int): Response status, or None for a connection error.
+            idempotent (bool): Whether the request may be sent twice, or None to decide by its
+            method. A GET that starts a query run is not idempotent.
+
+        Returns:
+            bool: True if the request should be retried.
+        """
+        if attempt >= self.max_retries:
+            return False
+        if status is not None and status not in self.retry_statuses:
+            return False
+        if idempotent is None:
+            idempotent = method.upper() in self.retry_methods
+        return status == 429 or idempotent
+
+    def get_delay(self, attempt, retry_after=None):
+        """
+        Returns the seconds to wait before a retry.
+
+        Parameters:
+            attempt (int): Number of retries made so far.
+            retry_after (str): Retry-After header of the failed response.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is not None:
+            return delay
+        delay = min(self.backoff * self.multiplier ** attempt, self.max_backoff)
+        return max(delay * random.uniform(1 - self.jitter, 1 + self.jitter), 0.0)
+
+
+class RateLimiter:
+    """
+    This is a class for limiting the rate of requests with a token bucket. The bucket holds up
+    to burst tokens and is refilled with rate tokens per second; every request takes one token
+    and waits for it if the bucket is empty. One limiter can be shared by several sessions and
+    threads.
+
+    Attributes:
+        rate (float): Requests per second allowed on average.
+        burst (int): Number of requests that may be sent at once after a quiet period.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        The constructor for the RateLimiter class.
+
+        Parameters:
+            rate (float): Requests per second allowed on average.
+            burst (int): Number of requests that may be sent at once after a quiet period.
+            Defaults to rate rounded up.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(int(rate + 0.999999), 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token from the bucket without waiting for it.
+
+        Returns:
+            float: Seconds to wait before the request may be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._updated_at) * self.rate, self.burst)
+            self._updated_at = now
+            # a missing token is borrowed from the future, so waiters are served in order
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self):
+        """
+        Takes a token from the bucket, waiting until one is available.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    This is a class for failing fast while the server is failing. After failure_threshold
+    consecutive failures the circuit opens and requests are refused with a CircuitOpenError
+    for reset_timeout seconds. Then one trial request is let through: if it succeeds the circuit
+    closes again, otherwise it stays open for another reset_timeout.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial request.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        The constructor for the CircuitBreaker class.
+
+        Parameters:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a trial request.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """
+        Returns the state of the circuit: closed, open or half_open.
+        """
+        with self._lock:
+            if self._state == self.OPEN and \
+                    time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """
+        Checks that a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or a trial request is already running.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            retry_in = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self._state == self.OPEN and retry_in <= 0:
+                self._state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(max(retry_in, 0.0))
+
+    def record_success(self):
+        """
+        Records a successful request, closing the circuit.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """
+        Records a failed request, opening the circuit after too many failures in a row.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
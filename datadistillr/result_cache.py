@@ -0,0 +1,166 @@
+"""
+This file defines the on-disk cache for the results of executed queries.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class ResultCache:
+    """
+    This is a class for caching query results on disk as Arrow IPC (Feather) files. A result
+    is keyed by the query barrel token, the query token, the query text and the options used to
+    build its DataFrame.
+
+    Entries expire ttl seconds after they were written. Once the files of the cache take more
+    than max_bytes, the least recently used entries are removed. The write time of an entry is
+    kept as the modification time of its file and its last use as the access time, so several
+    processes can share one cache directory. Needs pyarrow.
+
+    Attributes:
+        directory (str): Directory holding the cached results.
+        max_bytes (int): Maximum total size of the cached results in bytes.
+        ttl (float): Seconds a result stays valid, or None to keep results until evicted.
+    """
+
+    SUFFIX = ".feather"
+
+    def __init__(self, directory, max_bytes=1024 ** 3, ttl=3600.0):
+        """
+        The constructor for the ResultCache class. Creates the directory if needed.
+
+        Parameters:
+            directory (str): Directory holding the cached results.
+            max_bytes (int): Maximum total size of the cached results in bytes.
+            ttl (float): Seconds a result stays valid, or None to keep results until evicted.
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(barrel_token, query_token, query_text, dtype_backend=None, categories=None):
+        """
+        Returns the key of a query result.
+
+        Parameters:
+            barrel_token (int): Token the uniquely identifies query barrel.
+            query_token (int): Token the uniquely identifies query in query barrel.
+            query_text (str): SQL statement of the query.
+            dtype_backend (str): dtype backend the DataFrame is built with.
+            categories (list<str>): Names of columns stored as categoricals.
+
+        Returns:
+            str: A hex digest identifying the result.
+        """
+        key_data = [str(barrel_token), str(query_token), query_text, dtype_backend,
+                    sorted(categories or ())]
+        return hashlib.sha256(json.dumps(key_data).encode("utf-8")).hexdigest()
+
+    def _get_path(self, key):
+        """
+        Returns the path of the file of a cached result.
+        """
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key):
+        """
+        Returns a cached result and marks it as recently used.
+
+        Parameters:
+            key (str): Key of the result, see make_key().
+
+        Returns:
+            pandas dataframe: The cached result, or None if it is missing or expired.
+        """
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+
+        path = self._get_path(key)
+        try:
+            written = os.stat(path).st_mtime
+            if self.ttl is not None and time.time() - written >= self.ttl:
+                os.remove(path)
+                return None
+            data_frame = feather.read_feather(path)
+            os.utime(path, (time.time(), written))
+        except FileNotFoundError:
+            # missing, or removed by another process in the meantime
+            return None
+        return data_frame
+
+    def set(self, key, data_frame):
+        """
+        Stores a result and evicts the least recently used results if the cache is too big.
+        Results that cannot be stored as Arrow, e.g. columns mixing strings and numbers, are
+        not cached.
+
+        Parameters:
+            key (str): Key of the result, see make_key().
+            data_frame (pandas dataframe): The result.
+
+        Returns:
+            bool: True if the result was stored.
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+
+        path = self._get_path(key)
+        tmp_path = path + "." + str(os.getpid()) + "." + str(threading.get_ident()) + ".tmp"
+        try:
+            feather.write_feather(data_frame, tmp_path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        self._evict()
+        return True
+
+    def _evict(self):
+        """
+        Removes the least recently used results until the cache fits in max_bytes.
+        """
+        with self._lock:
+            entries = []
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(self.SUFFIX):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_atime, stat.st_size, entry.path))
+
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+
+    def invalidate(self, key=None):
+        """
+        Removes a cached result, or every cached result if key is None.
+
+        Parameters:
+            key (str): Key of the result, see make_key().
+        """
+        with self._lock:
+            if key is not None:
+                paths = [self._get_path(key)]
+            else:
+                paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                         if name.endswith(self.SUFFIX)]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,213 @@
+"""
+This file defines the scheduler that runs the queries of many tabs at once and polls all of
+their results from one loop.
+"""
+
+import heapq
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class _QueryRun:  # pylint: disable=too-few-public-methods
+    """
+    This is a class for the state of one query run of a batch.
+    """
+
+    def __init__(self, tab_token, polling_state):
+        self.tab_token = tab_token
+        self.polling_state = polling_state
+        self.cache_key = None
+        self.results_url = None
+        self.sizing = None
+
+
+class _Batch:
+    """
+    This is a class for the requests of the query runs of one batch. Requests are sent by a
+    thread pool, and polls that are not due yet wait in a heap ordered by due time.
+    """
+
+    def __init__(self, max_workers):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # requests in progress, mapped to their step and run
+        self.futures = {}
+        # polls that are due later, as (due time, tie breaker, run)
+        self.due_polls = []
+        self.counter = itertools.count()
+        self.outstanding = 0
+
+    def submit(self, step, run, function, *args):
+        """
+        Sends a request of a run from the thread pool.
+
+        Parameters:
+            step (str): start, poll or collect.
+            run (_QueryRun): The run.
+            function (function): Sends the request, called with the run and args.
+        """
+        self.futures[self.executor.submit(function, run, *args)] = (step, run)
+
+    def schedule_poll(self, run, delay=0.0):
+        """
+        Schedules the next poll of a run after delay seconds.
+        """
+        heapq.heappush(self.due_polls, (time.monotonic() + delay, next(self.counter), run))
+
+    def submit_due_polls(self, poll):
+        """
+        Sends the polls that are due.
+
+        Parameters:
+            poll (function): Polls a run.
+
+        Returns:
+            float: Seconds until the next poll is due, or None if no poll is scheduled.
+        """
+        now = time.monotonic()
+        while self.due_polls and self.due_polls[0][0] <= now:
+            self.submit("poll", heapq.heappop(self.due_polls)[2], poll)
+        return max(self.due_polls[0][0] - now, 0) if self.due_polls else None
+
+    def close(self):
+        """
+        Cancels the requests that have not started and shuts the thread pool down without
+        waiting for the requests in progress.
+        """
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for future in self.futures:
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+
+class QueryScheduler:  # pylint: disable=too-few-public-methods
+    """
+    This is a class for executing the most recent queries of many tabs of a project at once.
+
+    Up to max_concurrent query runs are outstanding at a time. Every run is polled with its own
+    PollingState, but all polls are scheduled from one loop: the loop waits until the next poll
+    of any run is due or until a request finishes, so no thread sleeps on a single query.
+    Requests are sent by a pool of max_concurrent threads, and a run that completes downloads
+    its remaining result pages there while the other runs keep being polled.
+
+    Attributes:
+        project (Project): The project the tabs belong to.
+        max_concurrent (int): Maximum number of outstanding query runs.
+        dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+        categories (list<str>): Names of columns to store as categoricals.
+    """
+
+    def __init__(self, project, max_concurrent=8, dtype_backend=None, categories=None):
+        """
+        The constructor for the QueryScheduler class.
+
+        Parameters:
+            project (Project): The project the tabs belong to.
+            max_concurrent (int): Maximum number of outstanding query runs.
+            dtype_backend (str): numpy_nullable, pyarrow, or None for untyped columns.
+            categories (list<str>): Names of columns to store as categoricals.
+        """
+        self.project = project
+        self.max_concurrent = max(max_concurrent, 1)
+        self.dtype_backend = dtype_backend
+        self.categories = categories
+
+    def _start(self, run):
+        """
+        Finds the most recent query of the tab of a run and starts it, unless its result is in
+        the result cache.
+
+        Returns:
+            pandas dataframe: The cached result, or None if the query was started.
+        """
+        project = self.project
+        query = project._get_recent_query(run.tab_token)  # pylint: disable=protected-access
+        run.cache_key = project._get_result_cache_key(  # pylint: disable=protected-access
+            run.tab_token, query["token"], query.get("query"), self.dtype_backend,
+            self.categories)
+        if run.cache_key is not None:
+            data_frame = project.result_cache.get(run.cache_key)
+            if data_frame is not None:
+                return data_frame
+        run.results_url = project._start_query_run(  # pylint: disable=protected-access
+            run.tab_token, query["token"])
+        run.sizing = project._start_page_sizing()  # pylint: disable=protected-access
+        if run.sizing is not None:
+            run.results_url = run.sizing.get_first_url(run.results_url)
+        return None
+
+    def _poll(self, run):
+        """
+        Polls the first page of the results of a run once.
+
+        Returns:
+            dict: The response of the poll.
+        """
+        return self.project._poll_query_results_once(  # pylint: disable=protected-access
+            run.results_url, run.polling_state)
+
+    def _collect(self, run, response_data):
+        """
+        Collects every page of the results of a completed run into a DataFrame.
+
+        Returns:
+            pandas dataframe: Formatted results of the query.
+        """
+        # pylint: disable=protected-access
+        results = self.project._get_query_results(run.results_url, run.polling_state,
+                                                  first_page=response_data, sizing=run.sizing)
+        return self.project._build_query_dataframe(results, self.dtype_backend, self.categories,
+                                                   run.cache_key)
+
+    def run(self, tab_tokens):
+        """
+        Executes the most recent query of every tab and yields the results as they complete.
+        If a query fails, the outstanding runs are abandoned and the exception is raised.
+
+        Parameters:
+            tab_tokens (iterable<int>): Tokens of the tabs.
+
+        Returns:
+            generator<tuple>: The tab token and the DataFrame of every query, in the order the
+            queries complete.
+        """
+        pending_tabs = iter(tab_tokens)
+        batch = _Batch(self.max_concurrent)
+        try:
+            while True:
+                self._start_pending(batch, pending_tabs)
+                if batch.outstanding == 0:
+                    return
+
+                timeout = batch.submit_due_polls(self._poll)
+                done, _ = wait(batch.futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, run = batch.futures.pop(future)
+                    result = future.result()
+                    if step == "collect" or (step == "start" and result is not None):
+                        batch.outstanding -= 1
+                        yield run.tab_token, result
+                    elif step == "start":
+                        batch.schedule_poll(run)
+                    elif result['queryRun']['status'] == 'running':
+                        batch.schedule_poll(run, run.polling_state.next_delay())
+                    else:
+                        batch.submit("collect", run, self._collect, result)
+        finally:
+            batch.close()
+
+    def _start_pending(self, batch, pending_tabs):
+        """
+        Starts runs of the pending tabs until max_concurrent runs are outstanding.
+
+        Parameters:
+            batch (_Batch): The batch of the runs.
+            pending_tabs (iterator<int>): Tokens of the tabs that are not started yet.
+        """
+        while batch.outstanding < self.max_concurrent:
+            tab_token = next(pending_tabs, None)
+            if tab_token is None:
+                return
+            batch.submit("start", _QueryRun(tab_token, self.project.polling.start()),
+                         self._start)
+            batch.outstanding += 1
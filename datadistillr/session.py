@@ -0,0 +1,233 @@
+"""
+This file defines the HTTP session shared by the DataDistillr clients.
+"""
+
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from datadistillr import instrumentation
+from datadistillr.resilience import RetryPolicy
+from datadistillr.transfer import get_accept_encoding
+
+
+class DatadistillrSession(requests.Session):
+    """
+    This is a class for making HTTP requests to DataDistillr over a pool of keep-alive
+    connections. Connections are reused across requests to the same host, so consecutive pages
+    do not pay for a new TCP and TLS handshake.
+
+    Every request goes through the retry policy, and optionally a rate limiter and a circuit
+    breaker, so a 429 or 503 in the middle of a long export is retried instead of failing it.
+
+    Responses are requested compressed with every content encoding that can be decoded (zstd,
+    br, gzip, deflate), see transfer.get_accept_encoding().
+
+    Attributes:
+        pool_connections (int): Number of hosts to keep connection pools for.
+        pool_maxsize (int): Maximum number of connections kept open per host. This should be at
+        least the number of threads sharing the session.
+        timeout (float or tuple): Default timeout for requests that do not set one.
+        retry (RetryPolicy): Policy for retrying failed requests.
+        rate_limiter (RateLimiter): Limiter every request waits for, or None.
+        circuit_breaker (CircuitBreaker): Breaker that refuses requests while the server is
+        failing, or None.
+    """
+
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 32
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False, keep_alive=True,
+                 timeout=None, retry=None, rate_limiter=None, circuit_breaker=None,
+                 accept_encoding=None):
+        """
+        The constructor for the DatadistillrSession class.
+
+        Parameters:
+            pool_connections (int): Number of hosts to keep connection pools for.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): Whether to wait for a free connection when the pool is exhausted
+            instead of opening a connection that is discarded after use.
+            keep_alive (bool): Whether connections are kept open between requests.
+            timeout (float or tuple): Default (connect, read) timeout in seconds.
+            retry (RetryPolicy): Policy for retrying failed requests. Defaults to
+            RetryPolicy(), use RetryPolicy(max_retries=0) to disable retries.
+            rate_limiter (RateLimiter): Limiter every request waits for, or None.
+            circuit_breaker (CircuitBreaker): Breaker that refuses requests while the server is
+            failing, or None.
+            accept_encoding (list<str>): Content encodings to request responses in, in order
+            of preference. Defaults to every encoding that can be decoded, use [] for
+            uncompressed responses.
+        """
+        super().__init__()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.headers["Connection"] = "keep-alive" if keep_alive else "close"
+        self.headers["Accept-Encoding"] = get_accept_encoding(accept_encoding)
+
+    def request(self, method, url, *args, idempotent=None,  # pylint: disable=arguments-differ
+                **kwargs):
+        """
+        Sends a request, applying the default timeout of the session, the rate limiter and the
+        circuit breaker, and retrying it as set by the retry policy. A file uploaded as the
+        request body is rewound before a retry, and a request with a body that cannot be
+        rewound is not retried. Every attempt and retry is reported to the instrumentation
+        hooks.
+
+        Parameters:
+            idempotent (bool): Whether the request may be sent twice, or None to decide by its
+            method, see RetryPolicy.can_retry().
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+
+        Returns:
+            requests.Response: The last response. Its status is not checked, except that
+            retryable statuses are retried.
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        body = kwargs.get("data")
+        body_position = self._get_body_position(body)
+        rewindable = not hasattr(body, "read") or body_position is not None
+
+        attempt = 0
+        while True:
+            if attempt > 0 and body_position is not None:
+                body.seek(body_position)
+            self._before_request()
+
+            instrumented = instrumentation.is_enabled()
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                self._record_result(False)
+                if instrumented:
+                    self._emit_request(method, url, attempt, start, error=error)
+                if not rewindable or not self.retry.can_retry(method, attempt,
+                                                               idempotent=idempotent):
+                    raise
+                delay = self.retry.get_delay(attempt)
+                if instrumented:
+                    instrumentation.emit("retry", method=method, url=url, attempt=attempt,
+                                         delay=delay, status=None, error=type(error).__name__)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # any other error, e.g. a body cut off midway, also ends a trial request of the
+                # circuit breaker, which would otherwise stay half open
+                self._record_result(False)
+                raise
+
+            if instrumented:
+                self._emit_request(method, url, attempt, start, response, kwargs.get("stream"))
+            # 429 means the client is too fast, not that the server is failing
+            self._record_result(response.status_code < 500)
+            if response.status_code not in self.retry.retry_statuses or not rewindable or \
+                    not self.retry.can_retry(method, attempt, response.status_code,
+                                             idempotent):
+                return response
+            delay = self.retry.get_delay(attempt, response.headers.get("Retry-After"))
+            if instrumented:
+                instrumentation.emit("retry", method=method, url=url, attempt=attempt,
+                                     delay=delay, status=response.status_code, error=None)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _get_body_position(body):
+        """
+        Returns the position of a file uploaded as the request body, to rewind it to before a
+        retry.
+
+        Parameters:
+            body: The data of the request.
+
+        Returns:
+            int: The position, or None if the body is not a file or cannot tell its position.
+        """
+        if not hasattr(body, "read"):
+            return None
+        try:
+            return body.tell()
+        except (AttributeError, OSError):
+            return None
+
+    def _before_request(self):
+        """
+        Checks the circuit breaker and waits for the rate limiter before an attempt.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+        """
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+    @staticmethod
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _emit_request(method, url, attempt, start, response=None, stream=False, error=None):
+        """
+        Reports one attempt of a request to the instrumentation hooks. The time to the first
+        byte is the time until the response headers were parsed, which includes resolving the
+        host and opening the connection if no pooled connection was reused. bytes_received is
+        the size of the body after requests decoded it and wire_bytes its size on the wire.
+
+        Parameters:
+            method (str): Request method.
+            url (str): URL of the request.
+            attempt (int): Number of retries made before this attempt.
+            start (float): time.perf_counter() when the attempt started.
+            response (requests.Response): The response, or None if the attempt failed.
+            stream (bool): Whether the body of the response is left unread.
+            error (Exception): The error the attempt failed with.
+        """
+        seconds = time.perf_counter() - start
+        metrics = {"method": method, "url": url, "status": None, "attempt": attempt,
+                   "seconds": seconds, "ttfb": None, "body_seconds": None, "bytes_sent": None,
+                   "bytes_received": None, "wire_bytes": None,
+                   "error": type(error).__name__ if error is not None else None}
+        if response is not None:
+            ttfb = min(response.elapsed.total_seconds(), seconds)
+            content_length = response.request.headers.get("Content-Length")
+            wire_bytes = response.headers.get("Content-Length")
+            wire_bytes = int(wire_bytes) if wire_bytes is not None else None
+            if stream:
+                bytes_received = wire_bytes
+            else:
+                bytes_received = len(response.content)
+                if hasattr(response.raw, "tell"):
+                    wire_bytes = response.raw.tell()
+            metrics.update(status=response.status_code, ttfb=ttfb, body_seconds=seconds - ttfb,
+                           bytes_sent=int(content_length) if content_length else 0,
+                           bytes_received=bytes_received, wire_bytes=wire_bytes)
+        instrumentation.emit("request", **metrics)
+
+    def _record_result(self, success):
+        """
+        Records the outcome of a request with the circuit breaker.
+
+        Parameters:
+            success (bool): Whether the server handled the request.
+        """
+        if self.circuit_breaker is None:
+            return
+        if success:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
@@ -0,0 +1,234 @@
+"""
+This file defines the class for testing the asyncio account and project classes.
+"""
+
+import io
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+import aiohttp
+import pandas as pd
+import pyarrow.parquet as pq
+from aioresponses import aioresponses, CallbackResult
+from datadistillr.aio import AsyncDatadistillrAccount, AsyncProject
+from datadistillr.polling import PollingStrategy
+
+
+class TestAsyncDatadistillrAccount(unittest.IsolatedAsyncioTestCase):
+    """
+    This class is for testing the AsyncDatadistillrAccount and AsyncProject classes.
+    """
+
+    BASE_URL = "https://app.datadistillr.io/api/"
+    MOCK_ORG_TOKEN = 880610291
+    MOCK_PROJ1 = {'name': 'Project 1', 'token': 111111111,
+                  'queryBarrels': [{'name': 'months', 'token': 444444444}]}
+    MOCK_PROJ2 = {'name': 'Project 2', 'token': 222222222, 'queryBarrels': []}
+    MOCK_QUERY_TOKEN = 555555555
+    MOCK_RUN_REQUEST_TOKEN = 666666666
+    MOCK_DATASOURCE_TOKEN = 777777777
+    UPLOAD_FILE_ROUTE = BASE_URL + "dataSource/" + str(MOCK_DATASOURCE_TOKEN) + "/file"
+    PRESIGNED_URL = "https://s3.amazonaws.com/prod.uploads.datadistillr.io/uploads/"
+
+    def _add_login(self, mocked):
+        """
+        Registers mocked login and project responses.
+        """
+        mocked.post(self.BASE_URL + "login",
+                    payload={'loggedIn': True,
+                             'activeOrganization': {'token': self.MOCK_ORG_TOKEN}})
+        mocked.get(self.BASE_URL + "organization/" + str(self.MOCK_ORG_TOKEN) + "/projects",
+                   payload={'projects': [self.MOCK_PROJ1, self.MOCK_PROJ2]}, repeat=True)
+        for project in (self.MOCK_PROJ1, self.MOCK_PROJ2):
+            mocked.get(self.BASE_URL + "projectDistillry/" + str(project['token']),
+                       payload={'project': project}, repeat=True)
+
+    def _add_query_run(self, mocked, barrel_token, run_request_token, rows):
+        """
+        Registers a mocked tab whose query run completes with one page of rows.
+        """
+        barrel_route = self.BASE_URL + "queryBarrels/" + str(barrel_token)
+        summary = {'columnNames': ['Index', 'Month'], 'dataTypes': ['INTEGER', 'VARCHAR'],
+                   'totalNumRows': len(rows), 'page': 1, 'totalPages': 1}
+        mocked.get(barrel_route, payload={'queryBarrel': {
+            'queries': [{'token': self.MOCK_QUERY_TOKEN}]}})
+        mocked.get(barrel_route + "/query/" + str(self.MOCK_QUERY_TOKEN) + "/run",
+                   payload={'requestToken': run_request_token})
+        mocked.get(self.BASE_URL + "queryResults/" + str(run_request_token),
+                   payload={'queryRun': {'status': 'complete'}, 'summary': summary,
+                            'results': rows})
+
+    def _add_upload_routes(self, mocked, uploaded, presign_requests):
+        """
+        Registers mocked presigned url and upload routes that record the names of the presigned
+        files and the body of every upload.
+        """
+
+        def presign(_url, **kwargs):
+            names = [file['name'] for file in kwargs['json']['files']]
+            presign_requests.append(names)
+            return CallbackResult(payload={'presignedUrls': [self.PRESIGNED_URL + name
+                                                             for name in names]})
+
+        def put(url, **kwargs):
+            uploaded[str(url).rsplit('/', 1)[-1]] = kwargs['data'].read()
+            return CallbackResult(status=200)
+
+        mocked.post(self.UPLOAD_FILE_ROUTE, callback=presign, repeat=True)
+        mocked.put(re.compile(re.escape(self.PRESIGNED_URL) + ".*"), callback=put, repeat=True)
+
+    async def test_get_projects(self):
+        """
+        Tests that get_projects() logs in and returns every project.
+        """
+
+        with aioresponses() as mocked:
+            self._add_login(mocked)
+            async with AsyncDatadistillrAccount('email', 'password') as account:
+                self.assertTrue(account.is_logged_in)
+                projects = await account.get_projects()
+                self.assertTrue(all(isinstance(project, AsyncProject) for project in projects))
+                self.assertEqual([project.name for project in projects],
+                                 ['Project 1', 'Project 2'])
+                self.assertEqual(await account.get_project_token('Project 2'), 222222222)
+
+    async def test_execute_existing_query(self):
+        """
+        Tests that execute_existing_query() polls a running query without blocking and returns
+        a dataframe.
+        """
+
+        barrel_route = self.BASE_URL + "queryBarrels/444444444"
+        results_route = self.BASE_URL + "queryResults/" + str(self.MOCK_RUN_REQUEST_TOKEN)
+        summary = {'columnNames': ['Index', 'Month'], 'dataTypes': ['INTEGER', 'VARCHAR'],
+                   'totalNumRows': 2, 'page': 1, 'totalPages': 1}
+
+        with aioresponses() as mocked:
+            self._add_login(mocked)
+            mocked.get(barrel_route, payload={'queryBarrel': {
+                'queries': [{'token': self.MOCK_QUERY_TOKEN}]}})
+            mocked.get(barrel_route + "/query/" + str(self.MOCK_QUERY_TOKEN) + "/run",
+                       payload={'requestToken': self.MOCK_RUN_REQUEST_TOKEN})
+            mocked.get(results_route, payload={'queryRun': {'status': 'running'}})
+            mocked.get(results_route, payload={'queryRun': {'status': 'complete'},
+                                               'summary': summary,
+                                               'results': [['1', 'January'], ['2', 'February']]})
+
+            polling = PollingStrategy(first_interval=0.01, jitter=0)
+            async with AsyncDatadistillrAccount('email', 'password', polling=polling) as account:
+                project = await account.get_project(self.MOCK_PROJ1['token'])
+                data_frame = await project.execute_existing_query(
+                    project.get_tab_token('months'), dtype_backend='numpy_nullable')
+
+        self.assertEqual(data_frame.shape, (2, 2))
+        self.assertEqual(str(data_frame.dtypes['Index']), 'Int64')
+        self.assertEqual(len(project.last_polling_state.polls), 2)
+
+    async def test_failed_requests(self):
+        """
+        Tests that a request still failing after its retries raises an HTTP error, and that the
+        request starting a query run is not retried.
+        """
+
+        barrel_route = self.BASE_URL + "queryBarrels/444444444"
+        run_route = barrel_route + "/query/" + str(self.MOCK_QUERY_TOKEN) + "/run"
+        with aioresponses() as mocked, mock.patch('asyncio.sleep') as sleep:
+            self._add_login(mocked)
+            mocked.get(barrel_route, payload={'queryBarrel': {
+                'queries': [{'token': self.MOCK_QUERY_TOKEN}]}}, repeat=True)
+            mocked.get(run_route, status=503, repeat=True)
+            async with AsyncDatadistillrAccount('email', 'password') as account:
+                project = await account.get_project(self.MOCK_PROJ1['token'])
+                with self.assertRaises(aiohttp.ClientResponseError) as context:
+                    await project.execute_existing_query(project.get_tab_token('months'))
+            self.assertEqual(context.exception.status, 503)
+            sleep.assert_not_called()
+
+    async def test_retried_request(self):
+        """
+        Tests that a request failing with a retryable status is retried after a backoff.
+        """
+
+        barrel_route = self.BASE_URL + "queryBarrels/444444444"
+        with aioresponses() as mocked, mock.patch('asyncio.sleep') as sleep:
+            self._add_login(mocked)
+            mocked.get(barrel_route, status=503)
+            self._add_query_run(mocked, 444444444, self.MOCK_RUN_REQUEST_TOKEN,
+                                [['1', 'January']])
+            async with AsyncDatadistillrAccount('email', 'password') as account:
+                project = await account.get_project(self.MOCK_PROJ1['token'])
+                data_frame = await project.execute_existing_query(444444444)
+        self.assertEqual(data_frame.shape, (1, 2))
+        sleep.assert_called_once()
+
+    async def test_execute_existing_queries(self):
+        """
+        Tests that the queries of several tabs run at once and every result is returned with
+        its tab token.
+        """
+
+        with aioresponses() as mocked:
+            self._add_login(mocked)
+            self._add_query_run(mocked, 444444444, 666666661, [['1', 'January']])
+            self._add_query_run(mocked, 444444445, 666666662, [['1', 'May'], ['2', 'June']])
+            async with AsyncDatadistillrAccount('email', 'password') as account:
+                project = await account.get_project(self.MOCK_PROJ1['token'])
+                results = {tab_token: data_frame async for tab_token, data_frame in
+                           project.execute_existing_queries([444444444, 444444445],
+                                                            max_concurrent=2)}
+        self.assertEqual(sorted(results), [444444444, 444444445])
+        self.assertEqual(list(results[444444445]['Month']), ['May', 'June'])
+
+    async def test_upload_files(self):
+        """
+        Tests that files are uploaded byte for byte, and that an upload resumed from a
+        checkpoint skips the files already uploaded.
+        """
+
+        files = {'binary.gz': bytes(range(256)) * 64, 'latin1.csv': 'caf\xe9,1\n'.encode(
+            'latin-1')}
+        uploaded = {}
+        presign_requests = []
+        with tempfile.TemporaryDirectory() as tmp_dir, aioresponses() as mocked:
+            file_paths = []
+            for name, content in files.items():
+                file_paths.append(os.path.join(tmp_dir, name))
+                with open(file_paths[-1], 'wb') as file:
+                    file.write(content)
+            checkpoint_path = os.path.join(tmp_dir, 'upload.checkpoint')
+            self._add_upload_routes(mocked, uploaded, presign_requests)
+            async with aiohttp.ClientSession() as session:
+                project = AsyncProject(self.MOCK_PROJ1, session)
+                for _ in range(2):
+                    self.assertEqual(await project.upload_files(
+                        self.MOCK_DATASOURCE_TOKEN, file_paths, max_workers=2,
+                        checkpoint_path=checkpoint_path), 'file uploaded successfully')
+        self.assertEqual(uploaded, files)
+        self.assertEqual(presign_requests, [list(files)])
+
+    async def test_upload_data(self):
+        """
+        Tests that DataFrames and row iterables are uploaded as Parquet files.
+        """
+
+        uploaded = {}
+        presign_requests = []
+        data_frame = pd.DataFrame({'month': ['Jan', 'Feb', 'Mar'], 'days': [31, 28, 31]})
+        with aioresponses() as mocked:
+            self._add_upload_routes(mocked, uploaded, presign_requests)
+            async with aiohttp.ClientSession() as session:
+                project = AsyncProject(self.MOCK_PROJ1, session)
+                await project.upload_data(self.MOCK_DATASOURCE_TOKEN, {
+                    'months': data_frame, 'squares': ({'id': i, 'square': i * i}
+                                                      for i in range(3))})
+        self.assertEqual(presign_requests, [['months.parquet', 'squares.parquet']])
+        pd.testing.assert_frame_equal(
+            pq.read_table(io.BytesIO(uploaded['months.parquet'])).to_pandas(), data_frame)
+        squares = pq.read_table(io.BytesIO(uploaded['squares.parquet'])).to_pandas()
+        self.assertEqual(squares['square'].tolist(), [0, 1, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
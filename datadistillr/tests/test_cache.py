@@ -0,0 +1,62 @@
+"""
+This file defines the class for testing the TTLCache class.
+"""
+
+import unittest
+from unittest import mock
+from datadistillr.cache import TTLCache, build_name_index
+
+
+class TestTTLCache(unittest.TestCase):
+    """
+    This class is for testing the TTLCache class.
+    """
+
+    def setUp(self):
+        """
+        Creates a loader that counts its calls.
+        """
+        self.loads = 0
+
+    def _loader(self):
+        self.loads += 1
+        return self.loads
+
+    def test_ttl(self):
+        """
+        Tests that values are reloaded only after they expire.
+        """
+
+        cache = TTLCache(ttl=10)
+        with mock.patch('time.monotonic', return_value=100):
+            self.assertEqual(cache.get('key', self._loader), 1)
+        with mock.patch('time.monotonic', return_value=109):
+            self.assertEqual(cache.get('key', self._loader), 1)
+        with mock.patch('time.monotonic', return_value=111):
+            self.assertEqual(cache.get('key', self._loader), 2)
+
+    def test_invalidate(self):
+        """
+        Tests that invalidated values are reloaded, and that a ttl of 0 disables caching.
+        """
+
+        cache = TTLCache(ttl=None)
+        cache.get('key', self._loader)
+        cache.get('key', self._loader)
+        cache.invalidate('key')
+        self.assertEqual(cache.get('key', self._loader), 2)
+
+        cache = TTLCache(ttl=0)
+        cache.get('key', self._loader)
+        self.assertEqual(cache.get('key', self._loader), 4)
+
+    def test_build_name_index(self):
+        """
+        Tests that the first token of a duplicated name is kept.
+        """
+
+        self.assertEqual(build_name_index({1: 'a', 2: 'b', 3: 'a'}), {'a': 1, 'b': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
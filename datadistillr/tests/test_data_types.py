@@ -0,0 +1,108 @@
+"""
+This file defines the class for testing the typed DataFrame construction.
+"""
+
+import unittest
+import pandas as pd
+from datadistillr.data_types import build_dataframe, concat_dataframes, get_kind
+
+
+class TestDataTypes(unittest.TestCase):
+    """
+    This class is for testing the typed DataFrame construction.
+    """
+
+    COLUMN_NAMES = ['id', 'price', 'active', 'created', 'name']
+    DATA_TYPES = ['INTEGER', 'DOUBLE', 'BOOLEAN', 'TIMESTAMP', 'VARCHAR']
+    ROWS = [['1', '1.5', 'true', '2022-05-01 10:00:00', 'a'],
+            [None, 2, None, None, 'b'],
+            [3, '-0.5', 'false', '2022-05-03 12:30:00', None]]
+
+    def test_get_kind(self):
+        """
+        Tests that data types with precision and nullability suffixes are recognized.
+        """
+
+        self.assertEqual(get_kind('DECIMAL(10, 2)'), 'float')
+        self.assertEqual(get_kind('bigint not null'), 'integer')
+        self.assertIsNone(get_kind('MAP'))
+
+    def test_untyped(self):
+        """
+        Tests that columns are left as objects without a dtype backend.
+        """
+
+        data_frame = build_dataframe(self.ROWS, self.COLUMN_NAMES, self.DATA_TYPES)
+        pd.testing.assert_frame_equal(data_frame,
+                                      pd.DataFrame(self.ROWS, columns=self.COLUMN_NAMES))
+
+    def test_numpy_nullable(self):
+        """
+        Tests that columns get nullable dtypes matching their data types.
+        """
+
+        data_frame = build_dataframe(self.ROWS, self.COLUMN_NAMES, self.DATA_TYPES,
+                                     dtype_backend='numpy_nullable', categories=['name'])
+        self.assertEqual(list(data_frame.dtypes.astype(str)),
+                         ['Int64', 'Float64', 'boolean', 'datetime64[ns]', 'category'])
+        self.assertEqual(data_frame['id'].sum(), 4)
+        self.assertTrue(pd.isna(data_frame['active'][1]))
+
+    def test_pyarrow(self):
+        """
+        Tests that columns get Arrow-backed dtypes.
+        """
+
+        data_frame = build_dataframe(self.ROWS, self.COLUMN_NAMES, self.DATA_TYPES,
+                                     dtype_backend='pyarrow')
+        self.assertEqual(str(data_frame.dtypes['id']), 'int64[pyarrow]')
+        self.assertEqual(data_frame['price'].sum(), 3.0)
+
+    def test_unconvertible_column(self):
+        """
+        Tests that a column whose values do not match its data type is left as objects.
+        """
+
+        data_frame = build_dataframe([['x'], ['2']], ['id'], ['INTEGER'],
+                                     dtype_backend='numpy_nullable')
+        self.assertFalse(pd.api.types.is_numeric_dtype(data_frame['id']))
+        self.assertEqual(list(data_frame['id']), ['x', '2'])
+
+    def test_empty(self):
+        """
+        Tests that results without rows give an empty DataFrame with typed columns.
+        """
+
+        data_frame = build_dataframe([], ['id', 'name'], ['INTEGER', 'VARCHAR'],
+                                     dtype_backend='numpy_nullable')
+        self.assertEqual(data_frame.shape, (0, 2))
+        self.assertEqual(str(data_frame.dtypes['id']), 'Int64')
+
+    def test_concat_pages(self):
+        """
+        Tests that DataFrames of pages are concatenated like a DataFrame of all rows, with
+        the categories of every page.
+        """
+
+        pages = [self.ROWS[:2], self.ROWS[2:]]
+        for dtype_backend in ('numpy_nullable', 'pyarrow'):
+            data_frames = [build_dataframe(rows, self.COLUMN_NAMES, self.DATA_TYPES,
+                                           dtype_backend=dtype_backend, categories=['name'],
+                                           index=pd.RangeIndex(first_row, first_row + len(rows)))
+                           for first_row, rows in ((0, pages[0]), (2, pages[1]))]
+            pd.testing.assert_frame_equal(
+                concat_dataframes(data_frames, categories=['name']),
+                build_dataframe(self.ROWS, self.COLUMN_NAMES, self.DATA_TYPES,
+                                dtype_backend=dtype_backend, categories=['name']))
+
+    def test_invalid_backend(self):
+        """
+        Tests that an unknown dtype backend is rejected.
+        """
+
+        self.assertRaises(ValueError, build_dataframe, self.ROWS, self.COLUMN_NAMES,
+                          self.DATA_TYPES, dtype_backend='numpy')
+
+
+if __name__ == '__main__':
+    unittest.main()
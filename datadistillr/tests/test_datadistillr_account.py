@@ -147,3 +147,76 @@ class TestDatadistillrAccount(unittest.TestCase):
         # test get_organizations() function
         organizations = self.datadistillr_account.get_organizations()
         self.assertEqual(organizations, self.MOCK_ORGS_ROUTE_RESP['organizations'])
+
+
+class TestDatadistillrAccountProjects(unittest.TestCase):
+    """
+    This class is for testing how DatadistillrAccount loads projects. It logs in against a
+    mocked login route.
+    """
+
+    BASE_URL = "https://app.datadistillr.io/api/"
+    MOCK_ORG_TOKEN = 880610291
+    MOCK_PROJECTS = [{'name': 'Project ' + str(i), 'token': 100000000 + i,
+                      'queryBarrels': [{'name': 'tab', 'token': 200000000 + i}]}
+                     for i in range(5)]
+
+    def _create_account(self):
+        """
+        Registers mocked login and project routes and returns a logged in account.
+        """
+        responses.add(responses.POST, self.BASE_URL + "login",
+                      json={'loggedIn': True,
+                            'activeOrganization': {'token': self.MOCK_ORG_TOKEN}})
+        responses.add(responses.GET,
+                      self.BASE_URL + "organization/" + str(self.MOCK_ORG_TOKEN) + "/projects",
+                      json={'projects': [{'name': project['name'], 'token': project['token']}
+                                         for project in self.MOCK_PROJECTS]})
+        for project in self.MOCK_PROJECTS:
+            responses.add(responses.GET,
+                          self.BASE_URL + "projectDistillry/" + str(project['token']),
+                          json={'project': project})
+        return DatadistillrAccount('email', 'password')
+
+    @responses.activate
+    def test_get_projects_concurrently(self):
+        """
+        Tests that get_projects() with several workers keeps the order of the project list.
+        """
+
+        projects = self._create_account().get_projects(max_workers=3)
+        self.assertEqual([project.name for project in projects],
+                         [project['name'] for project in self.MOCK_PROJECTS])
+        self.assertEqual(projects[2].get_tab_token('tab'), 200000002)
+
+    @responses.activate
+    def test_get_projects_lazily(self):
+        """
+        Tests that lazy projects download their details only when they are first needed.
+        """
+
+        account = self._create_account()
+        projects = account.get_projects(lazy=True)
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(projects[4].name, 'Project 4')
+        self.assertEqual(len(responses.calls), 2)
+
+        self.assertEqual(projects[4].get_tab_token('tab'), 200000004)
+        self.assertEqual(projects[4].get_tab_token('tab'), 200000004)
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_cached_project_lookups(self):
+        """
+        Tests that project name lookups reuse the cached listing until it is invalidated.
+        """
+
+        account = self._create_account()
+        self.assertEqual(account.get_project_token('Project 3'), 100000003)
+        self.assertEqual(account.get_project_token('Project 1'), 100000001)
+        self.assertEqual(list(account.get_project_token_dict().values())[0], 'Project 0')
+        self.assertEqual(len(responses.calls), 2)
+
+        account.invalidate_cache()
+        self.assertRaises(Exception, account.get_project_token, 'Project 9')
+        self.assertEqual(len(responses.calls), 3)
@@ -1,8 +1,14 @@
 """
 This file is for testing the datadistillr API calls.
 """
+import json
+import os
+import re
+import tempfile
 import unittest
+from urllib.parse import urlsplit, parse_qs
 import requests
+import responses
 import datadistillr as ddr
 requests.packages.urllib3.disable_warnings()
 
@@ -12,6 +18,220 @@ class DatadistillrApiTest(unittest.TestCase):
     This class is for testing the datadistillr API calls.
     """
 
+    MOCK_URL = "https://app.datadistillr.io/v1/results/111111111"
+    MOCK_TOTAL_PAGES = 5
+    MOCK_ROWS_PER_PAGE = 3
+
+    @classmethod
+    def _mock_page_callback(cls, request):
+        """
+        Returns a generated API endpoint page for the page requested in the query string.
+        """
+        page = int(parse_qs(urlsplit(request.url).query).get('page', ['1'])[0])
+        first_row = (page - 1) * cls.MOCK_ROWS_PER_PAGE
+        summary = {'columnNames': ['Index', 'Name'], 'dataTypes': ['INTEGER', 'VARCHAR'],
+                   'rowsPerPage': cls.MOCK_ROWS_PER_PAGE,
+                   'totalNumRows': cls.MOCK_ROWS_PER_PAGE * cls.MOCK_TOTAL_PAGES,
+                   'page': page, 'totalPages': cls.MOCK_TOTAL_PAGES}
+        if page < cls.MOCK_TOTAL_PAGES:
+            summary['nextPage'] = cls.MOCK_URL + "?page=" + str(page + 1)
+        results = [[str(row), "name " + str(row)]
+                   for row in range(first_row, first_row + cls.MOCK_ROWS_PER_PAGE)]
+        return 200, {}, json.dumps({'results': results, 'summary': summary})
+
+    def _add_mock_pages(self):
+        """
+        Registers the mocked paginated API endpoint.
+        """
+        responses.add_callback(responses.GET, re.compile(re.escape(self.MOCK_URL) + r".*"),
+                               callback=self._mock_page_callback)
+
+    @responses.activate
+    def test_get_dataframe_all_pages(self):
+        """
+        Tests that get_dataframe() follows nextPage until the last page.
+        """
+
+        self._add_mock_pages()
+        data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth")
+        self.assertEqual(data_frame.shape, (self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE, 2))
+        self.assertEqual(len(responses.calls), self.MOCK_TOTAL_PAGES)
+
+    @responses.activate
+    def test_get_dataframe_concurrent(self):
+        """
+        Tests that get_dataframe() with several workers returns the pages in page order.
+        """
+
+        self._add_mock_pages()
+        data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth", max_workers=3,
+                                                    max_in_flight=2)
+        expected = [str(row) for row in range(self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE)]
+        self.assertEqual(list(data_frame['Index']), expected)
+        self.assertEqual(len(responses.calls), self.MOCK_TOTAL_PAGES)
+
+    @responses.activate
+    def test_get_dataframe_spooled(self):
+        """
+        Tests that get_dataframe() with a spool_path writes the pages to an Arrow IPC file and
+        returns a view of it.
+        """
+
+        self._add_mock_pages()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spool_path = os.path.join(tmp_dir, 'results.arrow')
+            data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth", max_workers=2,
+                                                        dtype_backend='numpy_nullable',
+                                                        spool_path=spool_path)
+            self.assertEqual(list(data_frame['Index']),
+                             list(range(self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE)))
+            self.assertEqual(str(data_frame.dtypes['Index']), 'int64[pyarrow]')
+            table = ddr.Datadistillr.open_arrow_file(spool_path)
+            self.assertEqual(table.num_rows, self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE)
+
+    @responses.activate
+    def test_resume_get_dataframe(self):
+        """
+        Tests that a download that failed midway is resumed from the checkpoint of its last
+        completed page.
+        """
+
+        ddr.Datadistillr.configure_session(retry=ddr.RetryPolicy(max_retries=0))
+        self.addCleanup(ddr.Datadistillr.configure_session)
+        responses.add(responses.GET, self.MOCK_URL + "?page=4",
+                      body=requests.ConnectionError("connection reset"))
+        self._add_mock_pages()
+
+        with tempfile.TemporaryDirectory() as checkpoint_path:
+            self.assertRaises(requests.ConnectionError, ddr.Datadistillr.get_dataframe,
+                              self.MOCK_URL, "auth", checkpoint_path=checkpoint_path)
+            self.assertEqual(len(responses.calls), 4)
+
+            data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth",
+                                                        checkpoint_path=checkpoint_path)
+            expected = [str(row) for row in range(self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE)]
+            self.assertEqual(list(data_frame['Index']), expected)
+            self.assertEqual([call.request.url for call in responses.calls[4:]],
+                             [self.MOCK_URL + "?page=4", self.MOCK_URL + "?page=5"])
+            self.assertEqual(os.listdir(checkpoint_path), [])
+
+    @classmethod
+    def _mock_sized_page_callback(cls, request):
+        """
+        Returns a generated API endpoint page for the page number and rowsPerPage requested in
+        the query string, with at most 8 rows per page.
+        """
+        query = parse_qs(urlsplit(request.url).query)
+        page = int(query.get('page', ['1'])[0])
+        rows_per_page = min(int(query.get('rowsPerPage', [cls.MOCK_ROWS_PER_PAGE])[0]), 8)
+        total_rows = cls.MOCK_ROWS_PER_PAGE * cls.MOCK_TOTAL_PAGES
+        total_pages = -(-total_rows // rows_per_page)
+        summary = {'columnNames': ['Index', 'Name'], 'rowsPerPage': rows_per_page,
+                   'totalNumRows': total_rows, 'page': page, 'totalPages': total_pages}
+        if page < total_pages:
+            summary['nextPage'] = f"{cls.MOCK_URL}?page={page + 1}&rowsPerPage={rows_per_page}"
+        first_row = (page - 1) * rows_per_page
+        results = [[str(row), "name " + str(row)]
+                   for row in range(first_row, min(first_row + rows_per_page, total_rows))]
+        return 200, {}, json.dumps({'results': results, 'summary': summary})
+
+    @responses.activate
+    def test_page_size(self):
+        """
+        Tests that get_dataframe() requests the page size given, adapts it with a
+        PageSizePolicy, and keeps the page size the server caps it at.
+        """
+
+        responses.add_callback(responses.GET, re.compile(re.escape(self.MOCK_URL) + r".*"),
+                               callback=self._mock_sized_page_callback)
+        expected = [str(row) for row in range(self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE)]
+
+        policies = ((6, [6, 6, 6]), (10, [10, 8]), (ddr.PageSizePolicy(2, 1, 16), [2, 2, 4, 8]))
+        for page_size, requested in policies:
+            responses.calls.reset()
+            for max_workers in (1, 2):
+                data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth",
+                                                            page_size=page_size,
+                                                            max_workers=max_workers)
+                self.assertEqual(list(data_frame['Index']), expected)
+            sizes = [int(parse_qs(urlsplit(call.request.url).query)['rowsPerPage'][0])
+                     for call in responses.calls]
+            self.assertEqual(sizes[:len(requested)], requested)
+
+    @responses.activate
+    def test_page_size_cap(self):
+        """
+        Tests that get_dataframe() returns every row once when the page size grows past the cap
+        of the server midway.
+        """
+
+        total_rows, cap = 100, 8
+
+        def page_callback(request):
+            query = parse_qs(urlsplit(request.url).query)
+            page, rows_per_page = int(query['page'][0]), min(int(query['rowsPerPage'][0]), cap)
+            summary = {'columnNames': ['Index'], 'rowsPerPage': rows_per_page, 'page': page,
+                       'totalNumRows': total_rows, 'totalPages': -(-total_rows // rows_per_page),
+                       'nextPage': f"{self.MOCK_URL}?page={page + 1}"}
+            first_row = (page - 1) * rows_per_page
+            results = [[str(row)] for row in range(first_row,
+                                                   min(first_row + rows_per_page, total_rows))]
+            return 200, {}, json.dumps({'results': results, 'summary': summary})
+
+        responses.add_callback(responses.GET, re.compile(re.escape(self.MOCK_URL) + r".*"),
+                               callback=page_callback)
+        for page_size in (2, 3):
+            data_frame = ddr.Datadistillr.get_dataframe(
+                self.MOCK_URL + "?page=1", "auth",
+                page_size=ddr.PageSizePolicy(page_size, min_page_size=1, max_page_size=64))
+            self.assertEqual(list(data_frame['Index']), [str(row) for row in range(total_rows)])
+
+    @responses.activate
+    def test_iter_rows(self):
+        """
+        Tests that iter_rows() yields the rows of every page lazily.
+        """
+
+        self._add_mock_pages()
+        rows = ddr.Datadistillr.iter_rows(self.MOCK_URL, "auth")
+        self.assertEqual(next(rows), ['0', 'name 0'])
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(len(list(rows)), self.MOCK_TOTAL_PAGES * self.MOCK_ROWS_PER_PAGE - 1)
+
+    @responses.activate
+    def test_iter_dataframes(self):
+        """
+        Tests that iter_dataframes() yields one DataFrame per page with a continuous index.
+        """
+
+        self._add_mock_pages()
+        chunks = list(ddr.Datadistillr.iter_dataframes(self.MOCK_URL, "auth", max_workers=2))
+        self.assertEqual(len(chunks), self.MOCK_TOTAL_PAGES)
+        self.assertEqual(chunks[1].index[0], self.MOCK_ROWS_PER_PAGE)
+        self.assertEqual(list(chunks[-1].columns), ['Index', 'Name'])
+
+    def test_download_options(self):
+        """
+        Tests that unknown download options are rejected before any page is requested.
+        """
+
+        self.assertRaises(TypeError, ddr.Datadistillr.iter_pages, self.MOCK_URL, "auth",
+                          max_worker=2)
+        self.assertRaises(TypeError, ddr.Datadistillr.get_dataframe, self.MOCK_URL, "auth",
+                          page_sizes=10)
+
+    def test_get_page_urls(self):
+        """
+        Tests that page URLs are derived from the nextPage query parameter.
+        """
+
+        # pylint: disable=protected-access
+        summary = {'page': 1, 'totalPages': 3, 'nextPage': self.MOCK_URL + "?limit=2&page=2"}
+        self.assertEqual(ddr.Datadistillr._get_page_urls(summary),
+                         [self.MOCK_URL + "?limit=2&page=2", self.MOCK_URL + "?limit=2&page=3"])
+        summary['nextPage'] = self.MOCK_URL + "?cursor=abc"
+        self.assertIsNone(ddr.Datadistillr._get_page_urls(summary))
+
     def test_failed_api_call(self):
         """
         Tests that API call returns authorization error message if authorization token is incorrect.
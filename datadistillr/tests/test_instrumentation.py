@@ -0,0 +1,129 @@
+"""
+This file defines the class for testing the instrumentation hooks.
+"""
+
+import unittest
+from unittest import mock
+import responses
+import datadistillr as ddr
+from datadistillr import instrumentation
+from datadistillr.polling import PollingStrategy
+from datadistillr.project import Project
+from datadistillr.resilience import RetryPolicy
+from datadistillr.session import DatadistillrSession
+
+
+class RecordingHook(instrumentation.InstrumentationHook):
+    """
+    Hook recording every event and call.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.spans = []
+
+    def on_event(self, name, metrics):
+        self.events.append((name, metrics))
+
+    def span(self, name, attributes):
+        self.spans.append(name)
+        return super().span(name, attributes)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    This class is for testing the instrumentation hooks.
+    """
+
+    MOCK_URL = "https://app.datadistillr.io/v1/results/111111111"
+    MOCK_RESULTS_URL = "https://app.datadistillr.io/api/queryResults/333333333"
+    MOCK_PAGE = {'results': [['1', 'January'], ['2', 'February']],
+                 'summary': {'columnNames': ['Index', 'Month'], 'totalPages': 1, 'page': 1},
+                 'queryRun': {'status': 'complete'}}
+
+    def setUp(self):
+        """
+        Registers a recording hook and makes retries instant.
+        """
+        self.hook = instrumentation.add_hook(RecordingHook())
+        self.addCleanup(instrumentation.remove_hook, self.hook)
+        ddr.Datadistillr.configure_session(retry=RetryPolicy(backoff=0))
+        self.addCleanup(ddr.Datadistillr.configure_session)
+
+    @responses.activate
+    def test_api_call_metrics(self):
+        """
+        Tests that requests, retries, pages and decodes of an API call are reported.
+        """
+
+        responses.add(responses.GET, self.MOCK_URL, status=503)
+        responses.add(responses.GET, self.MOCK_URL, json=self.MOCK_PAGE)
+
+        with instrumentation.collect_metrics() as metrics:
+            ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth")
+
+        self.assertEqual([name for name, _ in self.hook.events],
+                         ['request', 'retry', 'request', 'decode', 'page'])
+        self.assertEqual(self.hook.spans, ['datadistillr.api_call'])
+        request = self.hook.events[2][1]
+        self.assertEqual((request['status'], request['attempt']), (200, 1))
+        self.assertGreater(request['bytes_received'], 0)
+        self.assertLessEqual(request['ttfb'], request['seconds'])
+
+        counters = metrics.counters
+        self.assertEqual(counters['requests_total'], 2)
+        self.assertEqual(counters['retries_total'], 1)
+        self.assertEqual(counters['pages_total'], 1)
+        self.assertEqual(counters['rows_total'], 2)
+        self.assertEqual(counters['api_call_calls_total'], 1)
+        self.assertEqual(counters['bytes_received_total'], request['bytes_received'])
+        self.assertIn('datadistillr_retries_total 1\n', metrics.to_prometheus())
+
+        # the collector stops receiving events once the block ends
+        self.assertNotIn(metrics, instrumentation._hooks)  # pylint: disable=protected-access
+
+    @responses.activate
+    def test_poll_metrics(self):
+        """
+        Tests that every poll of a running query is reported with its status.
+        """
+
+        responses.add(responses.GET, self.MOCK_RESULTS_URL,
+                      json={'queryRun': {'status': 'running'}})
+        responses.add(responses.GET, self.MOCK_RESULTS_URL, json=self.MOCK_PAGE)
+        project = Project({'name': 'Mock Project', 'token': 1}, DatadistillrSession(),
+                          polling=PollingStrategy(first_interval=0.01, jitter=0), lazy=True)
+
+        project._get_query_results(self.MOCK_RESULTS_URL)  # pylint: disable=protected-access
+        polls = [metrics['status'] for name, metrics in self.hook.events if name == 'poll']
+        self.assertEqual(polls, ['running', 'complete'])
+        self.assertEqual(sum(name == 'page' for name, _ in self.hook.events), 1)
+
+    @responses.activate
+    def test_logging_hook(self):
+        """
+        Tests that the logging hook logs events and calls.
+        """
+
+        responses.add(responses.GET, self.MOCK_URL, json=self.MOCK_PAGE)
+        hook = instrumentation.add_hook(instrumentation.LoggingHook())
+        self.addCleanup(instrumentation.remove_hook, hook)
+
+        with self.assertLogs('datadistillr', level='DEBUG') as logs:
+            ddr.Datadistillr.make_api_call(self.MOCK_URL, "auth")
+        self.assertTrue(logs.output[0].startswith('DEBUG:datadistillr:start '
+                                                  'datadistillr.api_call'))
+        self.assertTrue(any(':request method=GET' in line for line in logs.output))
+
+
+    def test_opentelemetry_hook_missing(self):
+        """
+        Tests that the OpenTelemetry hook names the missing opentelemetry-api package.
+        """
+
+        with mock.patch.dict('sys.modules', {'opentelemetry': None}):
+            self.assertRaisesRegex(ImportError, 'opentelemetry-api',
+                                   instrumentation.OpenTelemetryHook)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+This file defines the class for testing the JSON backend.
+"""
+
+import json
+import unittest
+from unittest import mock
+import responses
+import datadistillr as ddr
+from datadistillr import json_backend
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class TestJsonBackend(unittest.TestCase):
+    """
+    This class is for testing the JSON backend.
+    """
+
+    MOCK_URL = "https://app.datadistillr.io/v1/results/111111111"
+    MOCK_PAGE = {'results': [['1', 'é']],
+                 'summary': {'columnNames': ['Index', 'Name'], 'totalPages': 1, 'page': 1}}
+
+    def setUp(self):
+        """
+        Restores the JSON backend after every test.
+        """
+        self.addCleanup(ddr.set_json_backend, ddr.get_json_backend())
+
+    def test_backends(self):
+        """
+        Tests that every backend decodes str and bytes and encodes UTF-8 bytes.
+        """
+
+        backends = ['json'] + (['orjson'] if orjson is not None else [])
+        for backend in backends:
+            self.assertEqual(ddr.set_json_backend(backend), backend)
+            document = json.dumps(self.MOCK_PAGE)
+            self.assertEqual(json_backend.loads(document), self.MOCK_PAGE)
+            self.assertEqual(json_backend.loads(document.encode('utf-8')), self.MOCK_PAGE)
+            self.assertEqual(json.loads(json_backend.dumps(self.MOCK_PAGE).decode('utf-8')),
+                             self.MOCK_PAGE)
+
+        self.assertRaises(ValueError, ddr.set_json_backend, 'yaml')
+
+    def test_missing_backend(self):
+        """
+        Tests that selecting a backend whose package is not installed raises an ImportError
+        naming the package.
+        """
+
+        with mock.patch.dict('sys.modules', {'simdjson': None}):
+            self.assertRaisesRegex(ImportError, 'pysimdjson', ddr.set_json_backend, 'simdjson')
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_auto_backend(self):
+        """
+        Tests that the fastest installed backend is used by default.
+        """
+
+        self.assertEqual(ddr.set_json_backend(), 'orjson')
+
+    @responses.activate
+    def test_single_parse(self):
+        """
+        Tests that every page is decoded once by the configured backend.
+        """
+
+        decoded = []
+
+        def counting_loads(data):
+            decoded.append(data)
+            return json.loads(data)
+
+        ddr.set_json_backend(counting_loads)
+        self.assertEqual(ddr.get_json_backend(), 'counting_loads')
+        responses.add(responses.GET, self.MOCK_URL, json=self.MOCK_PAGE)
+        data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth")
+        self.assertEqual(list(data_frame['Name']), ['é'])
+        self.assertEqual(len(decoded), 1)
+        self.assertIsInstance(decoded[0], bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
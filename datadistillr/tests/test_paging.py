@@ -0,0 +1,117 @@
+"""
+This file defines the class for testing the PageSizePolicy class.
+"""
+
+import unittest
+from urllib.parse import urlsplit, parse_qs
+from datadistillr.paging import PageSizePolicy
+
+
+class TestPageSizePolicy(unittest.TestCase):
+    """
+    This class is for testing the PageSizePolicy class.
+    """
+
+    URL = "https://app.datadistillr.io/v1/results/1"
+
+    @staticmethod
+    def _get_query(url):
+        """
+        Returns the query parameters of a URL.
+        """
+        return {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+
+    def test_fixed_page_size(self):
+        """
+        Tests that an int page size is requested for every page and never adapted.
+        """
+
+        state = PageSizePolicy.from_value(100).start()
+        self.assertEqual(self._get_query(state.get_first_url(self.URL + "?page=1")),
+                         {'page': '1', 'rowsPerPage': '100'})
+        state.record(100, 0.001, 1000)
+        summary = {'page': 1, 'nextPage': self.URL + "?page=2", 'totalNumRows': 1000}
+        self.assertEqual(self._get_query(state.get_next_url(summary)),
+                         {'page': '2', 'rowsPerPage': '100'})
+
+    def test_grow_at_aligned_offsets(self):
+        """
+        Tests that fast pages double the page size once the rows received fill whole pages
+        of the new size, and that the next page number follows the new size.
+        """
+
+        state = PageSizePolicy(page_size=100, max_page_size=400).start()
+        state.record(100, 0.01)
+        self.assertEqual(state.page_size, 100)
+        state.record(100, 0.01)
+        self.assertEqual(state.page_size, 200)
+        state.record(200, 0.01)
+        self.assertEqual(state.page_size, 400)
+        state.record(400, 0.01)
+        self.assertEqual(state.page_size, 400)
+
+        summary = {'page': 2, 'nextPage': self.URL + "?page=3", 'totalNumRows': 10000}
+        self.assertEqual(self._get_query(state.get_next_url(summary)),
+                         {'page': '3', 'rowsPerPage': '400'})
+
+    def test_shrink(self):
+        """
+        Tests that slow or large pages halve the page size down to min_page_size.
+        """
+
+        policy = PageSizePolicy(page_size=400, min_page_size=200, target_seconds=1.0,
+                                max_page_bytes=1000)
+        state = policy.start()
+        state.record(400, 2.0, 500)
+        self.assertEqual(state.page_size, 200)
+        state.record(200, 0.1, 2000)
+        self.assertEqual(state.page_size, 200)
+
+    def test_server_page_size(self):
+        """
+        Tests that a smaller page size reported by the server caps the page size.
+        """
+
+        state = PageSizePolicy(page_size=1000).start()
+        state.record(500, 0.01, reported_page_size=500)
+        self.assertEqual((state.page_size, state.max_page_size), (500, 500))
+        state.record(500, 0.01, reported_page_size=500)
+        self.assertEqual(state.page_size, 500)
+
+    def test_server_page_size_cap(self):
+        """
+        Tests that the rows of a page served with a smaller page size than requested are not
+        returned twice, and that the page size stops growing at the cap of the server.
+        """
+
+        total_rows, cap = 40000, 8000
+        state = PageSizePolicy(page_size=5000).start()
+        url = state.get_first_url(self.URL + "?page=1")
+        rows = []
+        while url is not None:
+            query = self._get_query(url)
+            page, page_size = int(query['page']), min(int(query['rowsPerPage']), cap)
+            page_rows = list(range((page - 1) * page_size, min(page * page_size, total_rows)))
+            overlap = state.record(len(page_rows), 0.01, reported_page_size=page_size)
+            rows.extend(page_rows[overlap:])
+            url = state.get_next_url({'page': page, 'nextPage': self.URL + f"?page={page + 1}",
+                                      'totalNumRows': total_rows})
+        self.assertEqual(rows, list(range(total_rows)))
+        self.assertEqual(state.max_page_size, cap)
+
+    def test_last_page(self):
+        """
+        Tests that no next page is requested once every row was received.
+        """
+
+        state = PageSizePolicy(page_size=10).start()
+        state.record(10, 0.01)
+        self.assertIsNone(state.get_next_url({'page': 1, 'nextPage': self.URL + "?page=2",
+                                              'totalNumRows': 10}))
+        self.assertIsNone(state.get_next_url({'page': 1, 'totalNumRows': 20}))
+        self.assertEqual(state.get_next_url({'page': 1, 'nextPage': self.URL + "?cursor=a"}),
+                         self.URL + "?cursor=a")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+This file defines the class for testing the prefetching of query result pages.
+"""
+
+import threading
+import time
+import unittest
+from datadistillr.pipeline import prefetch
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    This class is for testing the prefetching of query result pages.
+    """
+
+    def test_order(self):
+        """
+        Tests that prefetched items are yielded in order by a background thread.
+        """
+
+        threads = []
+
+        def pages():
+            for page in range(10):
+                threads.append(threading.current_thread())
+                yield page
+
+        self.assertEqual(list(prefetch(pages(), depth=3)), list(range(10)))
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_error(self):
+        """
+        Tests that an exception raised while producing items is raised by the consumer after
+        the items produced before it.
+        """
+
+        def pages():
+            yield 1
+            raise ValueError("page 2")
+
+        items = prefetch(pages())
+        self.assertEqual(next(items), 1)
+        self.assertRaises(ValueError, next, items)
+
+    def test_close(self):
+        """
+        Tests that closing the consumer early stops and closes the producer.
+        """
+
+        closed = threading.Event()
+
+        def pages():
+            try:
+                page = 0
+                while True:
+                    yield page
+                    page += 1
+            finally:
+                closed.set()
+
+        items = prefetch(pages(), depth=1)
+        self.assertEqual(next(items), 0)
+        items.close()
+        self.assertTrue(closed.is_set())
+
+    def test_close_while_producing(self):
+        """
+        Tests that closing the consumer does not wait for an item that is still being produced.
+        """
+
+        release = threading.Event()
+
+        def pages():
+            yield 0
+            release.wait(10)
+            yield 1
+
+        items = prefetch(pages())
+        self.assertEqual(next(items), 0)
+        start = time.monotonic()
+        items.close()
+        self.assertLess(time.monotonic() - start, 5)
+        release.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+This file defines the class for testing the PollingStrategy class.
+"""
+
+import unittest
+from unittest import mock
+from datadistillr.polling import PollingStrategy
+
+
+class TestPollingStrategy(unittest.TestCase):
+    """
+    This class is for testing the PollingStrategy class.
+    """
+
+    def test_exponential_backoff(self):
+        """
+        Tests that waits grow by the multiplier and are capped at max_interval.
+        """
+
+        state = PollingStrategy(first_interval=0.5, multiplier=2, max_interval=3, jitter=0,
+                                deadline=None).start()
+        delays = []
+        for _ in range(5):
+            state.record(0.01, 'running')
+            delays.append(state.next_delay())
+        self.assertEqual(delays, [0.5, 1, 2, 3, 3])
+        self.assertEqual(state.latencies, [0.01] * 5)
+        self.assertEqual(state.polls[2]['delay'], 2)
+
+    def test_jitter(self):
+        """
+        Tests that waits stay within the jitter fraction.
+        """
+
+        state = PollingStrategy(first_interval=1, multiplier=1, jitter=0.2).start()
+        for _ in range(20):
+            self.assertTrue(0.8 <= state.next_delay() <= 1.2)
+
+    def test_deadline(self):
+        """
+        Tests that waits are cut at the deadline and polling stops after it.
+        """
+
+        state = PollingStrategy(first_interval=5, jitter=0, deadline=10).start()
+        with mock.patch('time.monotonic', return_value=state.started_at + 8):
+            self.assertEqual(state.next_delay(), 2)
+        with mock.patch('time.monotonic', return_value=state.started_at + 10):
+            self.assertRaises(TimeoutError, state.next_delay)
+
+    def test_deadline_per_page(self):
+        """
+        Tests that the deadline and the backoff restart for every page.
+        """
+
+        state = PollingStrategy(first_interval=1, jitter=0, deadline=10).start()
+        with mock.patch('time.monotonic', return_value=state.started_at + 9):
+            self.assertEqual([state.next_delay(), state.next_delay()], [1, 1])
+            state.start_page()
+        with mock.patch('time.monotonic', return_value=state.started_at + 8):
+            self.assertEqual(state.next_delay(), 1)
+        with mock.patch('time.monotonic', return_value=state.started_at + 10):
+            self.assertRaises(TimeoutError, state.next_delay)
+
+
+if __name__ == '__main__':
+    unittest.main()
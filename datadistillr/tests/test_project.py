@@ -1,11 +1,33 @@
 """
 This file defines the class for testing the Project class.
 """
+import gzip
+import io
 import json
+import os
+import re
+import tempfile
 import unittest
+from unittest import mock
+from urllib.parse import urlsplit, parse_qs
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
 import responses
 from responses import matchers
 from datadistillr.datadistillr_account import DatadistillrAccount
+from datadistillr.paging import PageSizePolicy
+from datadistillr.polling import PollingStrategy
+from datadistillr.project import Project
+from datadistillr.resilience import RetryPolicy
+from datadistillr.result_cache import ResultCache
+from datadistillr.session import DatadistillrSession
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
 
 
 class TestProject(unittest.TestCase):
@@ -296,3 +318,596 @@ class TestProject(unittest.TestCase):
         # test test_upload_files() function
         upload_file_resp = self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, mock_file_paths)
         self.assertEqual(upload_file_resp, 'file uploaded successfully')
+
+
+class TestProjectQueryResults(unittest.TestCase):
+    """
+    This class is for testing how the Project class runs queries and collects their results.
+    It uses a Project built from mocked project details, so no login is needed.
+    """
+
+    BASE_URL = "https://app.datadistillr.io/api/"
+    MOCK_PROJECT_DETAILS = {'name': 'Mock Project', 'token': 555555555,
+                            'queryBarrels': [{'name': 'months', 'token': 111111111}]}
+    MOCK_BARREL_TOKEN = 111111111
+    MOCK_QUERY_TOKEN = 222222222
+    MOCK_RUN_REQUEST_TOKEN = 333333333
+
+    QUERY_BARREL_ROUTE = BASE_URL + "queryBarrels/" + str(MOCK_BARREL_TOKEN)
+    QUERY_RUN_ROUTE = QUERY_BARREL_ROUTE + "/query/" + str(MOCK_QUERY_TOKEN) + "/run"
+    QUERY_RESULTS_ROUTE = BASE_URL + "queryResults/" + str(MOCK_RUN_REQUEST_TOKEN)
+
+    def setUp(self):
+        """
+        Creates a Project from mocked project details.
+        """
+        self.project = Project(self.MOCK_PROJECT_DETAILS, DatadistillrSession(),
+                               polling=PollingStrategy(first_interval=0.01, jitter=0,
+                                                       deadline=5))
+
+    @classmethod
+    def _results_page(cls, page, total_pages, rows_per_page=2, status='complete'):
+        """
+        Returns a mocked queryResults response for one page of a result.
+        """
+        first_row = (page - 1) * rows_per_page
+        summary = {'columnNames': ['Index', 'Month'], 'dataTypes': ['INTEGER', 'VARCHAR'],
+                   'rowsPerPage': rows_per_page, 'totalNumRows': rows_per_page * total_pages,
+                   'page': page, 'totalPages': total_pages}
+        if page < total_pages:
+            summary['nextPage'] = cls.QUERY_RESULTS_ROUTE + "?page=" + str(page + 1)
+        return {'results': [[str(row), 'month ' + str(row)]
+                            for row in range(first_row, first_row + rows_per_page)],
+                'summary': summary,
+                'queryRun': {'status': status, 'token': cls.MOCK_RUN_REQUEST_TOKEN}}
+
+    def _add_query_run(self, total_pages, running_polls=0):
+        """
+        Registers mocked responses for the most recent query of the tab, its run, and every
+        page of its results. The first page reports a running query for running_polls polls.
+        """
+        responses.add(responses.GET, self.QUERY_BARREL_ROUTE,
+                      json={'queryBarrel': {'queries': [{'token': self.MOCK_QUERY_TOKEN,
+                                                         'query': 'SELECT 1'}]}})
+        responses.add(responses.GET, self.QUERY_RUN_ROUTE,
+                      json={'requestToken': self.MOCK_RUN_REQUEST_TOKEN})
+        for _ in range(running_polls):
+            responses.add(responses.GET, self.QUERY_RESULTS_ROUTE,
+                          json={'queryRun': {'status': 'running'}},
+                          match=[matchers.query_string_matcher("")])
+        responses.add(responses.GET, self.QUERY_RESULTS_ROUTE,
+                      json=self._results_page(1, total_pages),
+                      match=[matchers.query_string_matcher("")])
+        for page in range(2, total_pages + 1):
+            responses.add(responses.GET, self.QUERY_RESULTS_ROUTE + "?page=" + str(page),
+                          json=self._results_page(page, total_pages))
+
+    @responses.activate
+    def test_execute_existing_query_typed(self):
+        """
+        Tests that execute_existing_query() converts columns using the reported data types.
+        """
+
+        self._add_query_run(total_pages=3)
+        data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN,
+                                                         dtype_backend='numpy_nullable')
+        self.assertEqual(data_frame.shape, (6, 2))
+        self.assertEqual(str(data_frame.dtypes['Index']), 'Int64')
+        self.assertEqual(list(data_frame['Index']), list(range(6)))
+
+    @responses.activate
+    def test_failed_requests(self):
+        """
+        Tests that a request still failing after its retries raises an HTTP error, and that the
+        request starting a query run is not retried, since it would start another run.
+        """
+
+        responses.add(responses.GET, self.QUERY_BARREL_ROUTE,
+                      json={'queryBarrel': {'queries': [{'token': self.MOCK_QUERY_TOKEN}]}})
+        responses.add(responses.GET, self.QUERY_RUN_ROUTE, status=503)
+        with mock.patch('time.sleep'):
+            self.assertRaises(requests.HTTPError, self.project.execute_existing_query,
+                              self.MOCK_BARREL_TOKEN)
+        self.assertEqual(len(responses.calls), 2)
+
+        responses.calls.reset()
+        responses.replace(responses.GET, self.QUERY_BARREL_ROUTE, status=503)
+        with mock.patch('time.sleep'):
+            self.assertRaises(requests.HTTPError, self.project.execute_existing_query,
+                              self.MOCK_BARREL_TOKEN)
+        self.assertEqual(len(responses.calls), RetryPolicy().max_retries + 1)
+
+    @responses.activate
+    def test_requests_session(self):
+        """
+        Tests that a query runs with a plain requests.Session, which takes no idempotent
+        keyword.
+        """
+
+        self.project.session = requests.Session()
+        self._add_query_run(total_pages=2)
+        data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN)
+        self.assertEqual(data_frame.shape, (4, 2))
+
+    @responses.activate
+    def test_poll_running_query(self):
+        """
+        Tests that a running query is polled with backoff until it completes.
+        """
+
+        self._add_query_run(total_pages=1, running_polls=3)
+        data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN)
+        self.assertEqual(data_frame.shape, (2, 2))
+
+        polling_state = self.project.last_polling_state
+        self.assertEqual([poll['status'] for poll in polling_state.polls],
+                         ['running', 'running', 'running', 'complete'])
+        self.assertEqual([poll['delay'] for poll in polling_state.polls[:3]],
+                         [0.01, 0.02, 0.04])
+
+    @responses.activate
+    def test_untyped_result_pages(self):
+        """
+        Tests that untyped columns are inferred from the rows of every page, as if the result
+        had a single page.
+        """
+
+        pages = [self._results_page(1, 2), self._results_page(2, 2)]
+        pages[0]['results'] = [[1, 'January'], [2, 'February']]
+        pages[1]['results'] = [[None, 'March'], [None, 'April']]
+        self._add_query_run(total_pages=2)
+        responses.replace(responses.GET, self.QUERY_RESULTS_ROUTE, json=pages[0],
+                          match=[matchers.query_string_matcher("")])
+        responses.replace(responses.GET, self.QUERY_RESULTS_ROUTE + "?page=2", json=pages[1])
+
+        data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN)
+        expected = pd.DataFrame([[1, 'January'], [2, 'February'], [None, 'March'],
+                                 [None, 'April']], columns=['Index', 'Month'])
+        pd.testing.assert_frame_equal(data_frame, expected)
+        self.assertEqual(str(data_frame.dtypes['Index']), 'float64')
+
+    @responses.activate
+    def test_many_result_pages(self):
+        """
+        Tests that results with more pages than the recursion limit are collected in order.
+        """
+
+        total_pages = 1200
+
+        def page_callback(request):
+            page = int(parse_qs(urlsplit(request.url).query).get('page', ['1'])[0])
+            return 200, {}, json.dumps(self._results_page(page, total_pages, rows_per_page=1))
+
+        responses.add_callback(responses.GET,
+                               re.compile(re.escape(self.QUERY_RESULTS_ROUTE) + r".*"),
+                               callback=page_callback)
+        # pylint: disable=protected-access
+        results = self.project._get_query_results(self.QUERY_RESULTS_ROUTE)
+        self.assertEqual(len(results['data']), total_pages)
+        self.assertEqual(results['data'][-1], [str(total_pages - 1), 'month 1199'])
+        self.assertNotIn('nextPage', results['summary'])
+        self.assertEqual(results['summary']['columnNames'], ['Index', 'Month'])
+
+    @responses.activate
+    def test_result_page_size(self):
+        """
+        Tests that pages of query results are requested with the page size of the project,
+        adapted by its PageSizePolicy.
+        """
+
+        total_rows = 10
+
+        def page_callback(request):
+            query = parse_qs(urlsplit(request.url).query)
+            page, rows_per_page = int(query['page'][0]), int(query['rowsPerPage'][0])
+            response_data = self._results_page(page, -(-total_rows // rows_per_page),
+                                               rows_per_page=rows_per_page)
+            response_data['results'] = response_data['results'][:total_rows - (page - 1) *
+                                                                rows_per_page]
+            response_data['summary']['totalNumRows'] = total_rows
+            return 200, {}, json.dumps(response_data)
+
+        responses.add_callback(responses.GET,
+                               re.compile(re.escape(self.QUERY_RESULTS_ROUTE) + r".*"),
+                               callback=page_callback)
+        self.project.page_size = PageSizePolicy(page_size=1, min_page_size=1, max_page_size=4)
+        # pylint: disable=protected-access
+        results = self.project._get_query_results(self.QUERY_RESULTS_ROUTE + "?page=1")
+        self.assertEqual(results['data'], [[str(row), 'month ' + str(row)]
+                                           for row in range(total_rows)])
+        self.assertEqual([parse_qs(urlsplit(call.request.url).query)['rowsPerPage'][0]
+                          for call in responses.calls], ['1', '1', '2', '4', '4'])
+
+    @responses.activate
+    def test_result_cache(self):
+        """
+        Tests that a query result is returned from the result cache while the query of the tab
+        is unchanged.
+        """
+
+        self._add_query_run(total_pages=2)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.project.result_cache = ResultCache(cache_dir)
+            data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN,
+                                                             dtype_backend='numpy_nullable')
+            self.assertEqual(len(responses.calls), 4)
+
+            cached = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN,
+                                                         dtype_backend='numpy_nullable')
+            pd.testing.assert_frame_equal(cached, data_frame)
+            self.assertEqual(len(responses.calls), 5)
+
+            # other DataFrame options are cached separately
+            self.project.execute_existing_query(self.MOCK_BARREL_TOKEN)
+            self.assertEqual(len(responses.calls), 9)
+
+    @responses.activate
+    def test_resume_query_results(self):
+        """
+        Tests that executing a query again after its results failed to download resumes the
+        same query run from the last completed page.
+        """
+
+        self.project.session = DatadistillrSession(retry=RetryPolicy(max_retries=0))
+        responses.add(responses.GET, self.QUERY_RESULTS_ROUTE + "?page=3",
+                      body=requests.ConnectionError("connection reset"))
+        self._add_query_run(total_pages=4)
+        responses.add(responses.GET, self.QUERY_BARREL_ROUTE,
+                      json={'queryBarrel': {'queries': [{'token': self.MOCK_QUERY_TOKEN,
+                                                         'query': 'SELECT 1'}]}})
+
+        with tempfile.TemporaryDirectory() as checkpoint_path:
+            self.assertRaises(requests.ConnectionError, self.project.execute_existing_query,
+                              self.MOCK_BARREL_TOKEN, checkpoint_path=checkpoint_path)
+            self.assertEqual(len(responses.calls), 5)
+
+            data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN,
+                                                             checkpoint_path=checkpoint_path)
+            self.assertEqual(list(data_frame['Index']), [str(row) for row in range(8)])
+            # the query is not run again and the saved pages are not fetched again
+            self.assertEqual([call.request.url for call in responses.calls[5:]],
+                             [self.QUERY_BARREL_ROUTE, self.QUERY_RESULTS_ROUTE + "?page=3",
+                              self.QUERY_RESULTS_ROUTE + "?page=4"])
+            self.assertEqual(os.listdir(checkpoint_path), [])
+
+    @responses.activate
+    def test_execute_existing_query_spooled(self):
+        """
+        Tests that results spooled to an Arrow IPC file are returned page by page as one
+        memory-mapped DataFrame.
+        """
+
+        self._add_query_run(total_pages=3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spool_path = os.path.join(tmp_dir, 'months.arrow')
+            data_frame = self.project.execute_existing_query(self.MOCK_BARREL_TOKEN,
+                                                             dtype_backend='numpy_nullable',
+                                                             spool_path=spool_path)
+            self.assertEqual(data_frame.shape, (6, 2))
+            self.assertEqual(list(data_frame['Index']), list(range(6)))
+            self.assertEqual(pa.ipc.open_file(spool_path).num_record_batches, 3)
+
+    def _add_slow_query_run(self, barrel_token=121212121, run_status=200):
+        """
+        Registers mocked responses for a tab whose query is running for three polls and then
+        returns a single page of 5 rows, or whose run fails with run_status.
+
+        Returns:
+            int: The token of the tab.
+        """
+        barrel_route = self.BASE_URL + "queryBarrels/" + str(barrel_token)
+        results_route = self.BASE_URL + "queryResults/" + str(barrel_token + 1)
+        responses.add(responses.GET, barrel_route,
+                      json={'queryBarrel': {'queries': [{'token': 232323232}]}})
+        responses.add(responses.GET, barrel_route + "/query/232323232/run",
+                      json={'requestToken': barrel_token + 1}, status=run_status)
+        for _ in range(3):
+            responses.add(responses.GET, results_route,
+                          json={'queryRun': {'status': 'running'}})
+        responses.add(responses.GET, results_route,
+                      json=self._results_page(1, 1, rows_per_page=5))
+        return barrel_token
+
+    @responses.activate
+    def test_execute_existing_queries(self):
+        """
+        Tests that the queries of several tabs run at once and that their results are returned
+        as they complete, with a slow query not holding up the others.
+        """
+
+        slow_barrel_token = self._add_slow_query_run()
+        self._add_query_run(total_pages=2)
+
+        results = list(self.project.execute_existing_queries(
+            [slow_barrel_token, self.MOCK_BARREL_TOKEN], max_concurrent=2,
+            dtype_backend='numpy_nullable'))
+        self.assertEqual([tab_token for tab_token, _ in results],
+                         [self.MOCK_BARREL_TOKEN, slow_barrel_token])
+        self.assertEqual(list(results[0][1]['Index']), list(range(4)))
+        self.assertEqual(results[1][1].shape, (5, 2))
+
+    @responses.activate
+    def test_execute_existing_queries_one_at_a_time(self):
+        """
+        Tests that no more than max_concurrent queries run at once, so with one query at a time
+        the results are returned in the order of the tabs.
+        """
+
+        slow_barrel_token = self._add_slow_query_run()
+        self._add_query_run(total_pages=2)
+
+        results = self.project.execute_existing_queries(
+            [slow_barrel_token, self.MOCK_BARREL_TOKEN], max_concurrent=1)
+        tab_token, data_frame = next(results)
+        self.assertEqual((tab_token, data_frame.shape), (slow_barrel_token, (5, 2)))
+        self.assertNotIn(self.QUERY_BARREL_ROUTE,
+                         [call.request.url for call in responses.calls])
+        self.assertEqual([tab_token for tab_token, _ in results], [self.MOCK_BARREL_TOKEN])
+
+    @responses.activate
+    def test_execute_existing_queries_failure(self):
+        """
+        Tests that a failed query raises its exception from execute_existing_queries() after
+        the results of the queries completed before it.
+        """
+
+        self._add_query_run(total_pages=1)
+        failing_barrel_token = self._add_slow_query_run(run_status=500)
+
+        results = self.project.execute_existing_queries(
+            [self.MOCK_BARREL_TOKEN, failing_barrel_token, self._add_slow_query_run(343434343)],
+            max_concurrent=1)
+        self.assertEqual(next(results)[0], self.MOCK_BARREL_TOKEN)
+        self.assertRaises(requests.HTTPError, next, results)
+        self.assertNotIn(self.BASE_URL + "queryBarrels/343434343",
+                         [call.request.url for call in responses.calls])
+
+    @responses.activate
+    def test_cached_data_source_lookups(self):
+        """
+        Tests that data source lookups reuse the cached listing until it is invalidated.
+        """
+
+        data_source_route = self.BASE_URL + "project/" + \
+            str(self.MOCK_PROJECT_DETAILS['token']) + "/dataSource"
+        responses.add(responses.GET, data_source_route,
+                      json={'dataSources': [{'name': 'files', 'token': 444444444},
+                                            {'name': 'bucket', 'token': 777777777}]})
+
+        self.assertEqual(self.project.get_data_source_token('bucket'), 777777777)
+        self.assertEqual(self.project.get_data_source_token('files'), 444444444)
+        self.assertEqual(self.project.get_tab_token('months'), self.MOCK_BARREL_TOKEN)
+        self.assertEqual(len(responses.calls), 1)
+
+        self.project.invalidate_cache()
+        self.project.get_data_source_token_dict()
+        self.assertEqual(len(responses.calls), 2)
+
+
+class TestProjectUploads(unittest.TestCase):
+    """
+    This class is for testing how the Project class uploads files. It uses a Project built from
+    mocked project details, so no login is needed.
+    """
+
+    BASE_URL = "https://app.datadistillr.io/api/"
+    MOCK_DATASOURCE_TOKEN = 444444444
+    UPLOAD_FILE_ROUTE = BASE_URL + "dataSource/" + str(MOCK_DATASOURCE_TOKEN) + "/file"
+    PRESIGNED_URL = "https://s3.amazonaws.com/prod.uploads.datadistillr.io/uploads/"
+
+    def setUp(self):
+        """
+        Creates a Project from mocked project details and a directory of files to upload.
+        """
+        self.project = Project({'name': 'Mock Project', 'token': 555555555},
+                               DatadistillrSession())
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.files = {'binary.gz': bytes(range(256)) * 64, 'latin1.csv': 'caf\xe9,1\n'.encode(
+            'latin-1'), 'empty.csv': b''}
+        self.file_paths = []
+        for name, content in self.files.items():
+            file_path = os.path.join(self.tmp_dir.name, name)
+            with open(file_path, 'wb') as file:
+                file.write(content)
+            self.file_paths.append(file_path)
+        self.uploaded = {}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _put_callback(self, request):
+        """
+        Stores the body of an upload under the name of the uploaded file.
+        """
+        body = request.body.read() if hasattr(request.body, 'read') else request.body or b''
+        self.uploaded[request.url.rsplit('/', 1)[-1]] = body
+        return 200, {}, ''
+
+    def _add_upload_routes(self):
+        """
+        Registers mocked presigned url and upload routes.
+        """
+        responses.add(responses.POST, self.UPLOAD_FILE_ROUTE,
+                      json={'presignedUrls': [self.PRESIGNED_URL + name for name in self.files]})
+        responses.add_callback(responses.PUT, re.compile(re.escape(self.PRESIGNED_URL) + ".*"),
+                               callback=self._put_callback)
+
+    @responses.activate
+    def test_upload_binary_files_concurrently(self):
+        """
+        Tests that files are uploaded byte for byte, whatever their encoding.
+        """
+
+        self._add_upload_routes()
+        upload_file_resp = self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, self.file_paths,
+                                                     max_workers=3)
+        self.assertEqual(upload_file_resp, 'file uploaded successfully')
+        self.assertEqual(self.uploaded, self.files)
+
+    @responses.activate
+    def test_failed_upload(self):
+        """
+        Tests that a failed upload raises an exception.
+        """
+
+        responses.add(responses.POST, self.UPLOAD_FILE_ROUTE,
+                      json={'presignedUrls': [self.PRESIGNED_URL + name for name in self.files]})
+        responses.add(responses.PUT, re.compile(re.escape(self.PRESIGNED_URL) + ".*"),
+                      status=403)
+        self.assertRaises(Exception, self.project.upload_files, self.MOCK_DATASOURCE_TOKEN,
+                          self.file_paths)
+
+    @responses.activate
+    def test_resume_upload(self):
+        """
+        Tests that an upload resumed from a checkpoint only uploads the files that failed.
+        """
+
+        checkpoint_path = os.path.join(self.tmp_dir.name, 'upload.checkpoint')
+        presign_requests = []
+
+        def presign_callback(request):
+            names = [file['name'] for file in json.loads(request.body)['files']]
+            presign_requests.append(names)
+            return 200, {}, json.dumps({'presignedUrls': [self.PRESIGNED_URL + name
+                                                          for name in names]})
+
+        responses.add_callback(responses.POST, self.UPLOAD_FILE_ROUTE, callback=presign_callback)
+        responses.add(responses.PUT, self.PRESIGNED_URL + 'latin1.csv', status=403)
+        responses.add_callback(responses.PUT, re.compile(re.escape(self.PRESIGNED_URL) + ".*"),
+                               callback=self._put_callback)
+
+        self.assertRaises(Exception, self.project.upload_files, self.MOCK_DATASOURCE_TOKEN,
+                          self.file_paths, max_workers=1, checkpoint_path=checkpoint_path)
+        self.assertEqual(list(self.uploaded), ['binary.gz'])
+
+        self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, self.file_paths,
+                                  checkpoint_path=checkpoint_path)
+        self.assertEqual(presign_requests[1], ['latin1.csv', 'empty.csv'])
+        self.assertEqual(self.uploaded, self.files)
+
+        # nothing is left to upload, and a changed file is uploaded again
+        self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, self.file_paths,
+                                  checkpoint_path=checkpoint_path)
+        self.assertEqual(len(presign_requests), 2)
+        with open(self.file_paths[2], 'wb') as file:
+            file.write(b'changed')
+        self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, self.file_paths,
+                                  checkpoint_path=checkpoint_path)
+        self.assertEqual(presign_requests[2], ['empty.csv'])
+
+    def _add_compressed_upload_routes(self, presign_requests, content_types):
+        """
+        Registers mocked presigned url and upload routes that record the presign requests and
+        the content types of the uploads.
+        """
+
+        def presign_callback(request):
+            files = json.loads(request.body)['files']
+            presign_requests.extend(files)
+            return 200, {}, json.dumps({'presignedUrls': [self.PRESIGNED_URL + file['name']
+                                                          for file in files]})
+
+        def put_callback(request):
+            content_types[request.url.rsplit('/', 1)[-1]] = request.headers['content-type']
+            return self._put_callback(request)
+
+        responses.add_callback(responses.POST, self.UPLOAD_FILE_ROUTE, callback=presign_callback)
+        responses.add_callback(responses.PUT, re.compile(re.escape(self.PRESIGNED_URL) + ".*"),
+                               callback=put_callback)
+
+    @responses.activate
+    def test_gzip_upload(self):
+        """
+        Tests that gzip compressed files are uploaded with the compressed name, size and type,
+        and that the temporary files are removed afterwards.
+        """
+
+        presign_requests = []
+        content_types = {}
+        self._add_compressed_upload_routes(presign_requests, content_types)
+        csv_path = os.path.join(self.tmp_dir.name, 'numbers.csv')
+        csv_data = ''.join(f'{i},{i * i}\n' for i in range(10000)).encode()
+        with open(csv_path, 'wb') as file:
+            file.write(csv_data)
+
+        temp_dir = tempfile.gettempdir()
+        temp_files = set(os.listdir(temp_dir))
+        self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, [csv_path, self.file_paths[2]],
+                                  compression='gzip')
+
+        self.assertEqual([file['name'] for file in presign_requests],
+                         ['numbers.csv.gz', 'empty.csv.gz'])
+        self.assertEqual({file['type'] for file in presign_requests}, {'application/gzip'})
+        for file in presign_requests:
+            self.assertEqual(file['size'], len(self.uploaded[file['name']]))
+            self.assertEqual(content_types[file['name']], 'application/gzip')
+        self.assertLess(len(self.uploaded['numbers.csv.gz']), len(csv_data) // 2)
+        self.assertEqual(gzip.decompress(self.uploaded['numbers.csv.gz']), csv_data)
+        self.assertEqual(gzip.decompress(self.uploaded['empty.csv.gz']), b'')
+        self.assertEqual(set(os.listdir(temp_dir)), temp_files)
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    @responses.activate
+    def test_zstd_upload(self):
+        """
+        Tests that zstd compressed files are uploaded with the compressed name and type.
+        """
+
+        presign_requests = []
+        content_types = {}
+        self._add_compressed_upload_routes(presign_requests, content_types)
+        self.project.upload_files(self.MOCK_DATASOURCE_TOKEN, self.file_paths[1:2],
+                                  compression='zstd')
+
+        self.assertEqual(presign_requests[0]['name'], 'latin1.csv.zst')
+        self.assertEqual(presign_requests[0]['type'], 'application/zstd')
+        self.assertEqual(content_types['latin1.csv.zst'], 'application/zstd')
+        decompressed = zstandard.ZstdDecompressor().stream_reader(
+            self.uploaded['latin1.csv.zst']).read()
+        self.assertEqual(decompressed, self.files['latin1.csv'])
+
+    def test_upload_content_types(self):
+        """
+        Tests the content types sent for uncompressed files, and that an unknown compression
+        is rejected before anything is uploaded.
+        """
+
+        details = Project._get_upload_details(  # pylint: disable=protected-access
+            Project._get_upload_sources(self.file_paths))  # pylint: disable=protected-access
+        self.assertEqual([file['type'] for file in details['files']],
+                         ['application/gzip', 'text/csv', 'text/csv'])
+        self.assertRaises(ValueError, self.project.upload_files, self.MOCK_DATASOURCE_TOKEN,
+                          self.file_paths, compression='brotli')
+
+    @responses.activate
+    def test_upload_data(self):
+        """
+        Tests that DataFrames, Arrow tables and row iterables are uploaded as Parquet files with
+        their size and type, split into row groups.
+        """
+
+        presign_requests = []
+        content_types = {}
+        self._add_compressed_upload_routes(presign_requests, content_types)
+        data_frame = pd.DataFrame({'month': ['Jan', 'Feb', 'Mar'], 'days': [31, 28, 31]})
+        rows = ({'id': i, 'square': i * i} for i in range(5))
+        self.project.upload_data(self.MOCK_DATASOURCE_TOKEN,
+                                 {'months': data_frame, 'table.parquet': pa.table(data_frame),
+                                  'squares': rows}, row_group_size=2)
+
+        self.assertEqual([file['name'] for file in presign_requests],
+                         ['months.parquet', 'table.parquet', 'squares.parquet'])
+        for file in presign_requests:
+            self.assertEqual(file['size'], len(self.uploaded[file['name']]))
+            self.assertEqual(file['type'], 'application/vnd.apache.parquet')
+            self.assertEqual(content_types[file['name']], 'application/vnd.apache.parquet')
+        months = pq.ParquetFile(io.BytesIO(self.uploaded['months.parquet']))
+        self.assertEqual(months.num_row_groups, 2)
+        pd.testing.assert_frame_equal(months.read().to_pandas(), data_frame)
+        pd.testing.assert_frame_equal(
+            pq.read_table(io.BytesIO(self.uploaded['table.parquet'])).to_pandas(), data_frame)
+        squares = pq.read_table(io.BytesIO(self.uploaded['squares.parquet'])).to_pandas()
+        self.assertEqual(squares['square'].tolist(), [0, 1, 4, 9, 16])
+        self.assertRaises(ValueError, self.project.upload_data, self.MOCK_DATASOURCE_TOKEN,
+                          {'nothing': iter([])})
@@ -0,0 +1,92 @@
+"""
+This file defines the classes for testing the retry policy, rate limiter and circuit breaker.
+"""
+
+import unittest
+from unittest import mock
+from datadistillr.resilience import CircuitBreaker, CircuitOpenError, RateLimiter, \
+    RetryPolicy, parse_retry_after
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    This class is for testing the RetryPolicy class.
+    """
+
+    def test_can_retry(self):
+        """
+        Tests that only idempotent requests are retried after a failure, except for 429.
+        """
+
+        retry = RetryPolicy(max_retries=2)
+        self.assertTrue(retry.can_retry('GET', 0, 503))
+        self.assertTrue(retry.can_retry('get', 1))
+        self.assertFalse(retry.can_retry('GET', 2, 503))
+        self.assertFalse(retry.can_retry('GET', 0, 404))
+        self.assertFalse(retry.can_retry('POST', 0, 503))
+        self.assertFalse(retry.can_retry('POST', 0))
+        self.assertTrue(retry.can_retry('POST', 0, 429))
+
+    def test_delay(self):
+        """
+        Tests that delays grow exponentially up to max_backoff unless Retry-After is given.
+        """
+
+        retry = RetryPolicy(backoff=1, multiplier=3, max_backoff=5, jitter=0)
+        self.assertEqual([retry.get_delay(attempt) for attempt in range(3)], [1, 3, 5])
+        self.assertEqual(retry.get_delay(0, '12'), 12)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    This class is for testing the RateLimiter class.
+    """
+
+    def test_token_bucket(self):
+        """
+        Tests that a burst is let through at once and later requests are spaced by the rate.
+        """
+
+        with mock.patch('time.monotonic', return_value=100):
+            limiter = RateLimiter(rate=2, burst=2)
+            self.assertEqual([limiter.reserve() for _ in range(4)], [0, 0, 0.5, 1.0])
+        with mock.patch('time.monotonic', return_value=102):
+            self.assertEqual(limiter.reserve(), 0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    This class is for testing the CircuitBreaker class.
+    """
+
+    def test_open_and_close(self):
+        """
+        Tests that the circuit opens after consecutive failures, lets one trial request through
+        after reset_timeout, and closes when it succeeds.
+        """
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        with mock.patch('time.monotonic', return_value=100):
+            breaker.record_failure()
+            breaker.before_request()
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertRaises(CircuitOpenError, breaker.before_request)
+
+        with mock.patch('time.monotonic', return_value=111):
+            breaker.before_request()
+            self.assertRaises(CircuitOpenError, breaker.before_request)
+            breaker.record_failure()
+            self.assertRaises(CircuitOpenError, breaker.before_request)
+
+        with mock.patch('time.monotonic', return_value=122):
+            breaker.before_request()
+            breaker.record_success()
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+            breaker.before_request()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+This file defines the class for testing the ResultCache class.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+from datadistillr.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    This class is for testing the ResultCache class.
+    """
+
+    def setUp(self):
+        """
+        Creates a cache in a temporary directory.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.data_frame = pd.DataFrame({'Index': pd.array([1, 2, None], dtype='Int64'),
+                                        'Month': ['Jan', 'Feb', None]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """
+        Tests that a cached result is returned with its dtypes, and that keys depend on the
+        query text and the DataFrame options.
+        """
+
+        cache = ResultCache(self.tmp_dir.name)
+        key = cache.make_key(1, 2, 'SELECT 1', 'numpy_nullable')
+        self.assertIsNone(cache.get(key))
+        self.assertTrue(cache.set(key, self.data_frame))
+        pd.testing.assert_frame_equal(cache.get(key), self.data_frame)
+
+        self.assertNotEqual(cache.make_key(1, 2, 'SELECT 2', 'numpy_nullable'), key)
+        self.assertNotEqual(cache.make_key(1, 2, 'SELECT 1'), key)
+        self.assertEqual(cache.make_key(1, 2, 'SELECT 1', None, ['b', 'a']),
+                         cache.make_key(1, 2, 'SELECT 1', None, ['a', 'b']))
+
+    def test_ttl(self):
+        """
+        Tests that results expire ttl seconds after they were written.
+        """
+
+        cache = ResultCache(self.tmp_dir.name, ttl=60)
+        cache.set('key', self.data_frame)
+        path = os.path.join(self.tmp_dir.name, 'key' + ResultCache.SUFFIX)
+        os.utime(path, (time.time(), time.time() - 30))
+        self.assertIsNotNone(cache.get('key'))
+        os.utime(path, (time.time(), time.time() - 61))
+        self.assertIsNone(cache.get('key'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_lru_eviction(self):
+        """
+        Tests that the least recently used results are evicted once the cache is too big.
+        """
+
+        cache = ResultCache(self.tmp_dir.name)
+        cache.set('first', self.data_frame)
+        entry_size = os.path.getsize(os.path.join(self.tmp_dir.name, 'first' + cache.SUFFIX))
+        cache.max_bytes = entry_size * 2
+        cache.set('second', self.data_frame)
+
+        # the first result is used after the second, so the second is evicted
+        now = time.time()
+        for age, key in ((20, 'second'), (10, 'first')):
+            path = os.path.join(self.tmp_dir.name, key + cache.SUFFIX)
+            os.utime(path, (now - age, now - age))
+        cache.set('third', self.data_frame)
+
+        self.assertIsNotNone(cache.get('first'))
+        self.assertIsNone(cache.get('second'))
+        self.assertIsNotNone(cache.get('third'))
+
+    def test_unstorable_result(self):
+        """
+        Tests that results that cannot be stored as Arrow are skipped.
+        """
+
+        cache = ResultCache(self.tmp_dir.name)
+        mixed = pd.DataFrame({'value': pd.array([1, 'one'], dtype=object)})
+        self.assertFalse(cache.set('key', mixed))
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+This file defines the class for testing the DatadistillrSession class.
+"""
+
+import io
+import unittest
+from unittest import mock
+import requests
+import responses
+import datadistillr as ddr
+from datadistillr.resilience import CircuitBreaker, CircuitOpenError, RateLimiter, RetryPolicy
+from datadistillr.session import DatadistillrSession
+
+
+class TestDatadistillrSession(unittest.TestCase):
+    """
+    This class is for testing the DatadistillrSession class.
+    """
+
+    MOCK_URL = "https://app.datadistillr.io/v1/results/111111111"
+
+    def test_connection_pool(self):
+        """
+        Tests that the session mounts an adapter with the configured pool size.
+        """
+
+        session = DatadistillrSession(pool_connections=2, pool_maxsize=5)
+        adapter = session.get_adapter(self.MOCK_URL)
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 5)
+        self.assertEqual(session.headers['Connection'], 'keep-alive')
+        self.assertEqual(DatadistillrSession(keep_alive=False).headers['Connection'], 'close')
+
+    @responses.activate
+    def test_default_timeout(self):
+        """
+        Tests that the session timeout is applied to requests without a timeout.
+        """
+
+        responses.add(responses.GET, self.MOCK_URL, json={}, status=200)
+        session = DatadistillrSession(timeout=7)
+        session.get(self.MOCK_URL)
+        self.assertEqual(responses.calls[0].request.req_kwargs['timeout'], 7)
+
+    @responses.activate
+    def test_retry(self):
+        """
+        Tests that failed idempotent requests are retried, following Retry-After, and that
+        other requests are not.
+        """
+
+        responses.add(responses.GET, self.MOCK_URL, status=503)
+        responses.add(responses.GET, self.MOCK_URL, status=429, headers={'Retry-After': '3'})
+        responses.add(responses.GET, self.MOCK_URL, json={'ok': True}, status=200)
+        responses.add(responses.POST, self.MOCK_URL, status=503)
+        session = DatadistillrSession(retry=RetryPolicy(backoff=1, jitter=0))
+
+        with mock.patch('time.sleep') as sleep:
+            self.assertEqual(session.get(self.MOCK_URL).json(), {'ok': True})
+            self.assertEqual([call.args[0] for call in sleep.call_args_list], [1, 3])
+            self.assertEqual(session.post(self.MOCK_URL).status_code, 503)
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_retry_rewinds_upload(self):
+        """
+        Tests that a file uploaded as the request body is sent in full again on a retry.
+        """
+
+        bodies = []
+
+        def put_callback(request):
+            body = request.body
+            bodies.append(body.read() if hasattr(body, 'read') else body)
+            return (503, {}, '') if len(bodies) == 1 else (200, {}, '')
+
+        responses.add_callback(responses.PUT, self.MOCK_URL, callback=put_callback)
+        session = DatadistillrSession(retry=RetryPolicy(backoff=0))
+        self.assertEqual(session.put(self.MOCK_URL, data=io.BytesIO(b'data')).status_code, 200)
+        self.assertEqual(bodies, [b'data', b'data'])
+
+    @responses.activate
+    def test_circuit_breaker(self):
+        """
+        Tests that requests are refused once the server keeps failing.
+        """
+
+        responses.add(responses.GET, self.MOCK_URL, status=500)
+        session = DatadistillrSession(retry=RetryPolicy(max_retries=0),
+                                      circuit_breaker=CircuitBreaker(failure_threshold=2),
+                                      rate_limiter=RateLimiter(rate=1000))
+        session.get(self.MOCK_URL)
+        session.get(self.MOCK_URL)
+        self.assertRaises(CircuitOpenError, session.get, self.MOCK_URL)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_circuit_breaker_trial_error(self):
+        """
+        Tests that a trial request failing with any error opens the circuit again instead of
+        leaving it half open.
+        """
+
+        responses.add(responses.GET, self.MOCK_URL,
+                      body=requests.exceptions.ChunkedEncodingError("body cut off"))
+        responses.add(responses.GET, self.MOCK_URL, json={}, status=200)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        session = DatadistillrSession(retry=RetryPolicy(max_retries=0), circuit_breaker=breaker)
+        with mock.patch('time.monotonic', return_value=100):
+            breaker.record_failure()
+        with mock.patch('time.monotonic', return_value=111):
+            self.assertRaises(requests.exceptions.ChunkedEncodingError, session.get,
+                              self.MOCK_URL)
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with mock.patch('time.monotonic', return_value=122):
+            self.assertEqual(session.get(self.MOCK_URL).status_code, 200)
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_shared_session(self):
+        """
+        Tests that Datadistillr reuses one session until it is reconfigured.
+        """
+
+        session = ddr.Datadistillr.get_session()
+        self.assertIs(ddr.Datadistillr.get_session(), session)
+
+        new_session = ddr.Datadistillr.configure_session(pool_maxsize=4)
+        self.assertIsNot(new_session, session)
+        self.assertIs(ddr.Datadistillr.get_session(), new_session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+This file defines the class for testing compressed transfers of API responses.
+"""
+
+import gzip
+import json
+import unittest
+import zlib
+import responses
+import datadistillr as ddr
+from datadistillr import transfer
+from datadistillr.session import DatadistillrSession
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class TestTransfer(unittest.TestCase):
+    """
+    This class is for testing compressed transfers of API responses.
+    """
+
+    MOCK_URL = "https://app.datadistillr.io/v1/results/111111111"
+    MOCK_PAGE = {'results': [[str(row), 'name ' + str(row)] for row in range(200)],
+                 'summary': {'columnNames': ['Index', 'Name'], 'totalPages': 1, 'page': 1}}
+
+    def test_decompress(self):
+        """
+        Tests that bodies are decompressed unless the HTTP client decoded them.
+        """
+
+        body = json.dumps(self.MOCK_PAGE).encode('utf-8')
+        self.assertEqual(transfer.decompress(gzip.compress(body), 'gzip'), body)
+        self.assertEqual(transfer.decompress(zlib.compress(body), 'deflate'), body)
+        self.assertEqual(transfer.decompress(body, 'gzip', decoded_encodings=('gzip',)), body)
+        self.assertEqual(transfer.decompress(body, None), body)
+        self.assertEqual(transfer.decompress(body, 'identity'), body)
+        self.assertRaises(ValueError, transfer.decompress, body, 'lzma')
+
+    def test_accept_encoding(self):
+        """
+        Tests that sessions request every encoding that can be decoded, or the encodings
+        given.
+        """
+
+        encodings = transfer.get_supported_encodings()
+        self.assertEqual(encodings[-2:], ['gzip', 'deflate'])
+        self.assertEqual(DatadistillrSession().headers['Accept-Encoding'], ", ".join(encodings))
+        self.assertEqual(DatadistillrSession(accept_encoding=['gzip']).headers['Accept-Encoding'],
+                         'gzip')
+        self.assertEqual(DatadistillrSession(accept_encoding=[]).headers['Accept-Encoding'],
+                         'identity')
+        self.assertRaises(ValueError, transfer.get_accept_encoding, ['lzma'])
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    @responses.activate
+    def test_zstd_page(self):
+        """
+        Tests that a zstd page is decompressed by the SDK and that its wire and decoded sizes
+        are reported.
+        """
+
+        body = json.dumps(self.MOCK_PAGE).encode('utf-8')
+        compressed = zstandard.ZstdCompressor().compress(body)
+        responses.add(responses.GET, self.MOCK_URL, body=compressed,
+                      headers={'Content-Encoding': 'zstd'})
+        with ddr.collect_metrics() as metrics:
+            data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth")
+        self.assertEqual(len(data_frame), 200)
+        self.assertIn('zstd', responses.calls[0].request.headers['Accept-Encoding'])
+        self.assertEqual(metrics.counters['wire_bytes_received_total'], len(compressed))
+        self.assertEqual(metrics.counters['decoded_bytes_total'], len(body))
+
+    @responses.activate
+    def test_gzip_page(self):
+        """
+        Tests that the wire size of a gzip page decoded by requests is reported.
+        """
+
+        body = json.dumps(self.MOCK_PAGE).encode('utf-8')
+        compressed = gzip.compress(body)
+        responses.add(responses.GET, self.MOCK_URL, body=compressed,
+                      headers={'Content-Encoding': 'gzip'})
+        with ddr.collect_metrics() as metrics:
+            data_frame = ddr.Datadistillr.get_dataframe(self.MOCK_URL, "auth")
+        self.assertEqual(list(data_frame['Index'][:2]), ['0', '1'])
+        self.assertEqual(metrics.counters['wire_bytes_received_total'], len(compressed))
+        self.assertEqual(metrics.counters['bytes_received_total'], len(body))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+This file defines the class for testing the chunked file writers.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from datadistillr import writers
+
+
+class TestWriters(unittest.TestCase):
+    """
+    This class is for testing the chunked file writers.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary directory and DataFrame chunks with a continuous index.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.data_frame = pd.DataFrame({'Index': [str(i) for i in range(7)],
+                                        'Name': ['name ' + str(i) for i in range(7)]})
+        self.chunks = [self.data_frame.iloc[0:3], self.data_frame.iloc[3:6],
+                       self.data_frame.iloc[6:7]]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_csv(self):
+        """
+        Tests that write_csv() produces the same file as DataFrame.to_csv().
+        """
+
+        filename = os.path.join(self.tmp_dir.name, 'chunks.csv')
+        expected = os.path.join(self.tmp_dir.name, 'expected.csv')
+        self.assertEqual(writers.write_csv(iter(self.chunks), filename), 7)
+        self.data_frame.to_csv(expected)
+        with open(filename, encoding='utf-8') as file, open(expected, encoding='utf-8') as other:
+            self.assertEqual(file.read(), other.read())
+
+    def test_write_json_lines(self):
+        """
+        Tests that write_json_lines() writes one record per line.
+        """
+
+        filename = os.path.join(self.tmp_dir.name, 'chunks.jsonl')
+        writers.write_json_lines(iter(self.chunks), filename)
+        with open(filename, encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(records, self.data_frame.to_dict(orient='records'))
+
+    def test_write_parquet(self):
+        """
+        Tests that write_parquet() writes row groups of the requested size.
+        """
+
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+        filename = os.path.join(self.tmp_dir.name, 'chunks.parquet')
+        writers.write_parquet(iter(self.chunks), filename, row_group_size=4)
+        parquet_file = pq.ParquetFile(filename)
+        self.assertEqual(parquet_file.metadata.num_rows, 7)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        pd.testing.assert_frame_equal(pd.read_parquet(filename), self.data_frame,
+                                      check_dtype=False)
+
+    def test_write_parquet_type_changes(self):
+        """
+        Tests that write_parquet() promotes the schema when a later row group holds other types:
+        nulls followed by integers, integers followed by floats, and integers followed by strings.
+        """
+
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+        filename = os.path.join(self.tmp_dir.name, 'chunks.parquet')
+        # strings are large strings with the string dtype of pandas 3
+        columns = (([None, None], [1, 2], [3], [pa.int64()], [None, None, 1, 2, 3]),
+                   ([1, 2], [1.5, 2.5], [3], [pa.float64()], [1.0, 2.0, 1.5, 2.5, 3.0]),
+                   ([1, 2], ['a', 'b'], [3], [pa.string(), pa.large_string()],
+                    ['1', '2', 'a', 'b', '3']))
+        for *values, arrow_types, expected in columns:
+            chunks = [pd.DataFrame({'Value': chunk}) for chunk in values]
+            for row_group_size in (1, 3):
+                self.assertEqual(writers.write_parquet(iter(chunks), filename, row_group_size), 5)
+                table = pq.read_table(filename)
+                self.assertIn(table.schema.field('Value').type, arrow_types)
+                self.assertEqual(table.column('Value').to_pylist(), expected)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['chunks.parquet'])
+
+    def test_write_arrow_ipc(self):
+        """
+        Tests that write_arrow_ipc() writes one record batch per chunk, that categories can grow
+        from chunk to chunk, and that read_arrow_ipc() maps the file instead of reading it.
+        """
+
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        filename = os.path.join(self.tmp_dir.name, 'chunks.arrow')
+        chunks = [chunk.assign(Name=pd.Categorical(chunk['Name'])) for chunk in self.chunks]
+        self.assertEqual(writers.write_arrow_ipc(iter(chunks), filename), 7)
+        self.assertEqual(pa.ipc.open_file(filename).num_record_batches, 3)
+
+        allocated = pa.total_allocated_bytes()
+        table = writers.read_arrow_ipc(filename)
+        # only the dictionary deltas of the categorical column are combined in memory
+        self.assertLess(pa.total_allocated_bytes() - allocated, os.path.getsize(filename) / 4)
+        self.assertEqual(table.column('Name').to_pylist(), list(self.data_frame['Name']))
+
+        data_frame = writers.read_arrow_ipc(filename, as_dataframe=True)
+        self.assertIsInstance(data_frame.dtypes['Index'], pd.ArrowDtype)
+        self.assertEqual(list(data_frame['Index']), list(self.data_frame['Index']))
+
+    def test_write_arrow_ipc_type_changes(self):
+        """
+        Tests that write_arrow_ipc() promotes the schema when a later chunk holds other types:
+        nulls followed by integers, and integers followed by floats, next to a categorical
+        column whose categories grow.
+        """
+
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        filename = os.path.join(self.tmp_dir.name, 'chunks.arrow')
+        chunks = [pd.DataFrame({'Nulls': [None, None], 'Floats': [1, 2]}),
+                  pd.DataFrame({'Nulls': [1, 2], 'Floats': [3, 4]}),
+                  pd.DataFrame({'Nulls': [3, 4], 'Floats': [1.5, 2.5]})]
+        chunks = [chunk.assign(Name=pd.Categorical(['name ' + str(i), 'name 0']))
+                  for i, chunk in enumerate(chunks)]
+        self.assertEqual(writers.write_arrow_ipc(iter(chunks), filename), 6)
+        table = writers.read_arrow_ipc(filename)
+        self.assertEqual(table.schema.field('Nulls').type, pa.int64())
+        self.assertEqual(table.schema.field('Floats').type, pa.float64())
+        self.assertEqual(table.column('Nulls').to_pylist(), [None, None, 1, 2, 3, 4])
+        self.assertEqual(table.column('Floats').to_pylist(), [1.0, 2.0, 3.0, 4.0, 1.5, 2.5])
+        self.assertEqual(table.column('Name').to_pylist(),
+                         ['name 0', 'name 0', 'name 1', 'name 0', 'name 2', 'name 0'])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['chunks.arrow'])
+
+
+if __name__ == '__main__':
+    unittest.main()
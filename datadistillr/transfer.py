@@ -0,0 +1,175 @@
+"""
+This file defines the compressed transfer encodings negotiated for API responses. Responses
+are requested with every encoding that can be decoded, in order of preference: zstd, br, gzip
+and deflate. The HTTP client decompresses the encodings it supports while it reads the body;
+the SDK decompresses the others before the body is passed to the JSON decoder.
+"""
+
+import zlib
+
+# content encodings in order of preference
+ENCODINGS = ("zstd", "br", "gzip", "deflate")
+
+_decompressors = {}
+
+
+def _decompress_gzip(content):
+    """
+    Decompresses a gzip body.
+    """
+    return zlib.decompress(content, 16 + zlib.MAX_WBITS)
+
+
+def _decompress_deflate(content):
+    """
+    Decompresses a deflate body, which servers send with or without the zlib header.
+    """
+    try:
+        return zlib.decompress(content)
+    except zlib.error:
+        return zlib.decompress(content, -zlib.MAX_WBITS)
+
+
+def _load_zstd():
+    """
+    Returns a function decompressing zstd bodies, from the standard library on Python 3.14 or
+    from zstandard (pip install datadistillr[zstd]).
+    """
+    try:
+        from compression import zstd  # pylint: disable=import-outside-toplevel
+        return zstd.decompress
+    except ImportError:
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+    def decompress_zstd(content):
+        # frames of streamed responses do not record their size, so decompress incrementally
+        return zstandard.ZstdDecompressor().decompressobj().decompress(content)
+
+    return decompress_zstd
+
+
+def _load_brotli():
+    """
+    Returns a function decompressing brotli bodies, from brotli or brotlicffi.
+    """
+    try:
+        import brotli  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        import brotlicffi as brotli  # pylint: disable=import-outside-toplevel
+    return brotli.decompress
+
+
+def _get_decompressor(encoding):
+    """
+    Returns the function decompressing a content encoding.
+
+    Parameters:
+        encoding (str): zstd, br, gzip or deflate.
+
+    Raises:
+        ImportError: If the package of the encoding is not installed.
+        ValueError: If the encoding is unknown.
+
+    Returns:
+        function: Decompresses a body.
+    """
+    decompressor = _decompressors.get(encoding)
+    if decompressor is None:
+        if encoding == "gzip":
+            decompressor = _decompress_gzip
+        elif encoding == "deflate":
+            decompressor = _decompress_deflate
+        elif encoding == "zstd":
+            decompressor = _load_zstd()
+        elif encoding == "br":
+            decompressor = _load_brotli()
+        else:
+            raise ValueError(f"unknown content encoding {encoding!r}, expected one of "
+                             f"{ENCODINGS}")
+        _decompressors[encoding] = decompressor
+    return decompressor
+
+
+def get_supported_encodings():
+    """
+    Returns the content encodings that can be decoded with the installed packages.
+
+    Returns:
+        list<str>: The encodings, in order of preference.
+    """
+    encodings = []
+    for encoding in ENCODINGS:
+        try:
+            _get_decompressor(encoding)
+        except ImportError:
+            continue
+        encodings.append(encoding)
+    return encodings
+
+
+def get_accept_encoding(encodings=None):
+    """
+    Returns the value of the Accept-Encoding header requesting compressed responses.
+
+    Parameters:
+        encodings (list<str>): Encodings to accept, in order of preference. Defaults to every
+        encoding that can be decoded. An empty list requests uncompressed responses.
+
+    Raises:
+        ImportError: If the package of an encoding is not installed.
+        ValueError: If an encoding is unknown.
+
+    Returns:
+        str: The header value.
+    """
+    if encodings is None:
+        encodings = get_supported_encodings()
+    for encoding in encodings:
+        _get_decompressor(encoding)
+    return ", ".join(encodings) if encodings else "identity"
+
+
+def decompress(content, content_encoding, decoded_encodings=()):
+    """
+    Decompresses a response body that the HTTP client left encoded.
+
+    Parameters:
+        content (bytes): The body as returned by the HTTP client.
+        content_encoding (str): Content-Encoding header of the response, or None.
+        decoded_encodings (iterable<str>): Encodings the HTTP client decodes itself.
+
+    Raises:
+        ImportError: If the package of the encoding is not installed.
+        ValueError: If the encoding is unknown.
+
+    Returns:
+        bytes: The decoded body.
+    """
+    if not content_encoding:
+        return content
+    encodings = [encoding.strip().lower() for encoding in content_encoding.split(",")]
+    encodings = [encoding for encoding in encodings if encoding and encoding != "identity"]
+    if not encodings or all(encoding in decoded_encodings for encoding in encodings):
+        return content
+    # encodings are listed in the order they were applied
+    for encoding in reversed(encodings):
+        content = _get_decompressor(encoding)(content)
+    return content
+
+
+def get_content(response):
+    """
+    Returns the decoded body of a response, decompressing encodings that requests does not
+    decode itself.
+
+    Parameters:
+        response (requests.Response): The response.
+
+    Returns:
+        bytes: The decoded body.
+    """
+    content_encoding = response.headers.get("Content-Encoding")
+    if not content_encoding:
+        return response.content
+    return decompress(response.content, content_encoding,
+                      getattr(response.raw, "CONTENT_DECODERS", ()))
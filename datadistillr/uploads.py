@@ -0,0 +1,277 @@
+"""
+This file defines the sources of file uploads, their optional compression and the Parquet
+serialization of in-memory data.
+"""
+import gzip
+import mimetypes
+import ntpath
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+# file extension and content type of every supported compression
+COMPRESSIONS = {
+    "gzip": (".gz", "application/gzip"),
+    "zstd": (".zst", "application/zstd"),
+}
+
+# content types of files that are already compressed, by their mimetypes encoding
+ENCODING_TYPES = {
+    "gzip": "application/gzip",
+    "bzip2": "application/x-bzip2",
+    "xz": "application/x-xz",
+}
+
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def guess_content_type(file_name):
+    """
+    Guesses the content type of a file from its name.
+
+    Parameters:
+        file_name (str): Name of the file.
+
+    Returns:
+        str: The content type, application/octet-stream if it cannot be guessed.
+    """
+    content_type, encoding = mimetypes.guess_type(file_name)
+    if encoding in ENCODING_TYPES:
+        return ENCODING_TYPES[encoding]
+    return content_type or "application/octet-stream"
+
+
+def _open_compressor(compression, file, level=None):
+    """
+    Opens a writable stream that compresses everything written to it into file.
+
+    Parameters:
+        compression (str): 'gzip' or 'zstd'.
+        file (file): Binary file the compressed data is written to.
+        level (int): Compression level, None for the default of the compression.
+
+    Returns:
+        file: A writable binary stream.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6 if level is None else level,
+                             mtime=0)
+    if compression == "zstd":
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError("zstd compression requires the zstandard package, install it with "
+                              "pip install datadistillr[zstd]") from error
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return compressor.stream_writer(file, closefd=False)
+    raise ValueError("compression must be one of " + ", ".join(COMPRESSIONS))
+
+
+def _iter_chunks(data, row_group_size):
+    """
+    Splits a DataFrame or an iterable of rows into DataFrames of at most row_group_size rows.
+    Slices of a DataFrame are views, so its data is not copied.
+
+    Parameters:
+        data (DataFrame | iterable): A DataFrame, or an iterable of DataFrames or of rows as
+            dictionaries.
+        row_group_size (int): Maximum number of rows per chunk.
+
+    Yields:
+        DataFrame: The next chunk.
+    """
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), row_group_size):
+            yield data.iloc[start:start + row_group_size]
+        return
+
+    rows = []
+    for item in data:
+        if isinstance(item, pd.DataFrame):
+            yield item
+            continue
+        rows.append(item)
+        if len(rows) >= row_group_size:
+            yield pd.DataFrame(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+
+
+def serialize_parquet(data, row_group_size=100000):
+    """
+    Serializes data to Parquet in memory. DataFrames and row iterables are written one row
+    group at a time, so only the encoded file and one row group are held in memory, and Arrow
+    tables are written without converting them to pandas.
+
+    Parameters:
+        data (DataFrame | pyarrow.Table | pyarrow.RecordBatch | iterable): The data, where an
+            iterable yields DataFrames or rows as dictionaries.
+        row_group_size (int): Number of rows per row group.
+
+    Returns:
+        pyarrow.Buffer: The Parquet file.
+    """
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError("uploading data requires the pyarrow package, install it with "
+                          "pip install datadistillr[arrow]") from error
+    from datadistillr.writers import write_parquet  # pylint: disable=import-outside-toplevel
+
+    sink = pa.BufferOutputStream()
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])
+    if isinstance(data, pa.Table):
+        pq.write_table(data, sink, row_group_size=row_group_size)
+    else:
+        write_parquet(_iter_chunks(data, row_group_size), sink, row_group_size)
+    buffer = sink.getvalue()
+    if buffer.size == 0:
+        raise ValueError("no rows to upload")
+    return buffer
+
+
+class UploadSource:
+    """
+    This is a class for one file to be uploaded to a data source. It knows the name, size and
+    content type that are sent when asking for a presigned url, and opens the bytes to upload.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, name, size, content_type, file_path, temp_path=None, buffer=None):
+        """
+        The constructor for the UploadSource class.
+
+        Parameters:
+            name (str): Name of the file in the data source.
+            size (int): Number of bytes that are uploaded.
+            content_type (str): Content type of the uploaded bytes.
+            file_path (str): Path of the original file, None for data serialized in memory.
+            temp_path (str): Path of a temporary file holding the bytes to upload, if they are
+                not the original file. It is removed by close().
+            buffer (pyarrow.Buffer): Bytes to upload that are held in memory. It is released
+                by close().
+        """
+
+        self.name = name
+        self.size = size
+        self.content_type = content_type
+        self.file_path = file_path
+        self.temp_path = temp_path
+        self.buffer = buffer
+
+    @classmethod
+    def from_path(cls, file_path, compression=None, compression_level=None):
+        """
+        Creates the upload source of a file on disk.
+
+        Without compression the file is uploaded as it is. With compression the file is
+        compressed in blocks into a temporary file first, because the size of the upload has to
+        be known before asking for a presigned url. The uploaded name gets the extension of the
+        compression, e.g. data.csv is uploaded as data.csv.gz.
+
+        Parameters:
+            file_path (str): Path of the file.
+            compression (str): None, 'gzip' or 'zstd'.
+            compression_level (int): Compression level, None for the default.
+
+        Returns:
+            UploadSource: The upload source of the file.
+        """
+
+        file_name = ntpath.basename(file_path)
+        if compression is None:
+            return cls(file_name, os.path.getsize(file_path), guess_content_type(file_name),
+                       file_path)
+        if compression not in COMPRESSIONS:
+            raise ValueError("compression must be one of " + ", ".join(COMPRESSIONS))
+
+        extension, content_type = COMPRESSIONS[compression]
+        temp_file, temp_path = tempfile.mkstemp(suffix=extension)
+        try:
+            with os.fdopen(temp_file, "wb") as compressed_file:
+                with open(file_path, "rb") as file, \
+                        _open_compressor(compression, compressed_file, compression_level) as writer:
+                    shutil.copyfileobj(file, writer, COPY_CHUNK_SIZE)
+            size = os.path.getsize(temp_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return cls(file_name + extension, size, content_type, file_path, temp_path)
+
+    @classmethod
+    def from_data(cls, name, data, row_group_size=100000):
+        """
+        Creates the upload source of a DataFrame, an Arrow table or an iterable of rows by
+        serializing it to Parquet in memory. The size of the upload has to be known before
+        asking for a presigned url, so the data is serialized before it is uploaded, but no
+        file is written. The uploaded name gets a .parquet extension if it has none.
+
+        Parameters:
+            name (str): Name of the file in the data source.
+            data (DataFrame | pyarrow.Table | iterable): The data, see serialize_parquet().
+            row_group_size (int): Number of rows per row group.
+
+        Returns:
+            UploadSource: The upload source of the data.
+        """
+
+        if not name.endswith(".parquet"):
+            name += ".parquet"
+        buffer = serialize_parquet(data, row_group_size)
+        return cls(name, buffer.size, PARQUET_CONTENT_TYPE, None, buffer=buffer)
+
+    def get_file_details(self):
+        """
+        Returns the description of the file sent when asking for a presigned url.
+
+        Returns:
+            dict: Name, size, type and path of the file.
+        """
+
+        return {
+            "name": self.name,
+            "size": self.size,
+            "type": self.content_type,
+            "path": "/"
+        }
+
+    def get_headers(self):
+        """
+        Returns the headers of the upload request. Compressed files and serialized data are sent
+        with their content type, other files as plain text.
+
+        Returns:
+            dict: The request headers.
+        """
+
+        if self.temp_path is None and self.buffer is None:
+            return {'content-type': 'text/plain'}
+        return {'content-type': self.content_type}
+
+    def open(self):
+        """
+        Opens the bytes to upload. Data held in memory is read without copying it.
+
+        Returns:
+            file: A binary file, to be closed by the caller.
+        """
+
+        if self.buffer is not None:
+            import pyarrow as pa  # pylint: disable=import-outside-toplevel
+            return pa.BufferReader(self.buffer)
+        return open(self.temp_path or self.file_path, "rb")  # pylint: disable=consider-using-with
+
+    def close(self):
+        """
+        Removes the temporary file of a compressed upload and releases data held in memory.
+        """
+
+        self.buffer = None
+        if self.temp_path is not None and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
@@ -0,0 +1,381 @@
+"""
+This file defines functions for writing a stream of pandas DataFrames to a file chunk by chunk,
+and for reading Arrow IPC files back as memory-mapped tables.
+"""
+
+import os
+import tempfile
+import pandas as pd
+
+
+def write_csv(chunks, filename):
+    """
+    Writes DataFrames to one CSV file, appending each chunk as it arrives. The header is written
+    with the first chunk only. Each chunk is formatted with its own dtypes, so an integer column
+    with missing values in one chunk only is written as floats in that chunk only.
+
+    Parameters:
+        chunks (iterable<DataFrame>): DataFrames with identical columns.
+        filename (str): The filename where the data is written.
+
+    Returns:
+        int: Number of rows written.
+    """
+    row_count = 0
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        for chunk in chunks:
+            chunk.to_csv(file, header=row_count == 0)
+            row_count += len(chunk)
+    return row_count
+
+
+def write_json_lines(chunks, filename):
+    """
+    Writes DataFrames to one JSON Lines file, with one JSON object per row.
+
+    Parameters:
+        chunks (iterable<DataFrame>): DataFrames with identical columns.
+        filename (str): The filename where the data is written.
+
+    Returns:
+        int: Number of rows written.
+    """
+    row_count = 0
+    with open(filename, "w", encoding="utf-8") as file:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            lines = chunk.to_json(orient="records", lines=True)
+            file.write(lines if lines.endswith("\n") else lines + "\n")
+            row_count += len(chunk)
+    return row_count
+
+
+def _get_arrow_table(data_frame):
+    """
+    Converts a DataFrame to an Arrow table. Categorical columns get 32 bit indices, so later
+    chunks with more categories still fit.
+
+    Parameters:
+        data_frame (DataFrame): A chunk of the data.
+
+    Returns:
+        pyarrow.Table: The table.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    table = pa.Table.from_pandas(data_frame, preserve_index=False)
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(
+                pa.dictionary(pa.int32(), field.type.value_type, field.type.ordered)))
+    return table.cast(schema)
+
+
+def _promote_type(current, new):
+    """
+    Returns the Arrow type that holds the values of two types. Nulls take the other type,
+    integers and floats become 64 bit floats, and other mixed types become strings.
+
+    Parameters:
+        current (pyarrow.DataType): The type of the column so far.
+        new (pyarrow.DataType): The type of the column in a new chunk.
+
+    Returns:
+        pyarrow.DataType: The promoted type.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    if current.equals(new) or pa.types.is_null(new):
+        return current
+    if pa.types.is_null(current):
+        return new
+    if pa.types.is_integer(current) and pa.types.is_integer(new):
+        return pa.int64()
+    if all(pa.types.is_integer(value) or pa.types.is_floating(value) for value in (current, new)):
+        return pa.float64()
+    if pa.types.is_dictionary(current) and pa.types.is_dictionary(new):
+        return pa.dictionary(pa.int32(), _promote_type(current.value_type, new.value_type),
+                             current.ordered)
+    large = pa.types.is_large_string(current) or pa.types.is_large_string(new)
+    return pa.large_string() if large else pa.string()
+
+
+def _promote_schema(schema, other):
+    """
+    Returns the schema that holds the data of two schemas with the same columns. The pandas
+    metadata is dropped when a type changes, since it describes the dtypes of the first chunk.
+
+    Parameters:
+        schema (pyarrow.Schema): The schema of the file so far.
+        other (pyarrow.Schema): The schema of a new chunk.
+
+    Returns:
+        pyarrow.Schema: The promoted schema, or schema if every column fits it.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    fields = [field.with_type(_promote_type(field.type, other.field(field.name).type))
+              for field in schema]
+    if all(field.type.equals(old.type) for field, old in zip(fields, schema)):
+        return schema
+    return pa.schema(fields)
+
+
+def _concat_tables(tables):
+    """
+    Concatenates Arrow tables with the same columns, promoting their schemas to one.
+
+    Parameters:
+        tables (list<pyarrow.Table>): The tables.
+
+    Returns:
+        pyarrow.Table: The concatenated table.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    schema = tables[0].schema
+    for table in tables[1:]:
+        schema = _promote_schema(schema, table.schema)
+    return pa.concat_tables([table.cast(schema) for table in tables])
+
+
+class _ArrowFileWriter:
+    """
+    This is a class for writing Arrow tables to one file whose schema is promoted when a table
+    does not fit it. Untyped columns are inferred chunk by chunk, so a column of nulls can be
+    followed by integers, or integers by floats. The tables written so far are then copied to a
+    new file with the promoted schema, which happens at most a few times per column.
+
+    Attributes:
+        filename (str): The filename where the data is written.
+        schema (pyarrow.Schema): The schema of the file, or None before the first table.
+    """
+
+    def __init__(self, filename, new_writer, read_tables):
+        """
+        The constructor for the _ArrowFileWriter class.
+
+        Parameters:
+            filename (str): The filename where the data is written.
+            new_writer (callable): Returns a writer with a write_table() method for a sink and
+            a schema.
+            read_tables (callable): Yields the tables written to a file, given its filename.
+        """
+        self.filename = filename
+        self.schema = None
+        self._new_writer = new_writer
+        self._read_tables = read_tables
+        self._sink = None
+        self._writer = None
+
+    def _open(self, schema):
+        """
+        Opens the file and its writer for a schema.
+
+        Parameters:
+            schema (pyarrow.Schema): The schema of the file.
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        self._sink = pa.OSFile(self.filename, "wb")
+        self._writer = self._new_writer(self._sink, schema)
+        self.schema = schema
+
+    def _rewrite(self, schema):
+        """
+        Copies the tables written so far to a new file with a promoted schema.
+
+        Parameters:
+            schema (pyarrow.Schema): The promoted schema.
+        """
+        self.close()
+        previous = self.filename + ".previous"
+        os.replace(self.filename, previous)
+        try:
+            self._open(schema)
+            for table in self._read_tables(previous):
+                self._writer.write_table(table.cast(schema))
+        finally:
+            os.remove(previous)
+
+    def write(self, table):
+        """
+        Writes a table, promoting the schema of the file if the table does not fit it.
+
+        Parameters:
+            table (pyarrow.Table): The table, with the columns of the file.
+        """
+        if self.schema is None:
+            self._open(table.schema)
+        else:
+            schema = _promote_schema(self.schema, table.schema)
+            if schema is not self.schema:
+                self._rewrite(schema)
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        """
+        Closes the writer and the file, if open.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+
+
+def _read_parquet_row_groups(filename):
+    """
+    Yields the row groups of a Parquet file one at a time.
+
+    Parameters:
+        filename (str): The filename of the Parquet file.
+
+    Returns:
+        generator<pyarrow.Table>: The row groups.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    with pa.OSFile(filename, "rb") as source:
+        parquet_file = pq.ParquetFile(source)
+        for i in range(parquet_file.num_row_groups):
+            yield parquet_file.read_row_group(i)
+
+
+def write_parquet(chunks, filename, row_group_size=100000):
+    """
+    Writes DataFrames to one Parquet file with an incremental writer. Chunks are buffered until
+    row_group_size rows are available and then written as one row group, so at most one row
+    group is held in memory.
+
+    The schema of the file is taken from the first chunk and promoted when a later chunk holds
+    other types, see _ArrowFileWriter. A stream is written through a temporary file, since it
+    cannot be rewritten when the schema is promoted.
+
+    Parameters:
+        chunks (iterable<DataFrame>): DataFrames with identical columns.
+        filename (str | file): The filename or writable binary stream where the data is
+            written.
+        row_group_size (int): Number of rows per row group.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    if not isinstance(filename, (str, os.PathLike)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data.parquet")
+            row_count = write_parquet(chunks, path, row_group_size)
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    for block in iter(lambda: file.read(1024 * 1024), b""):
+                        filename.write(block)
+        return row_count
+
+    writer = _ArrowFileWriter(filename, pq.ParquetWriter, _read_parquet_row_groups)
+    buffer = []
+    buffered_rows = 0
+    row_count = 0
+
+    try:
+        for chunk in chunks:
+            buffer.append(_get_arrow_table(chunk))
+            buffered_rows += len(chunk)
+            row_count += len(chunk)
+            if buffered_rows >= row_group_size:
+                table = _concat_tables(buffer)
+                while table.num_rows >= row_group_size:
+                    writer.write(table.slice(0, row_group_size))
+                    table = table.slice(row_group_size)
+                buffer = [table]
+                buffered_rows = table.num_rows
+        if buffered_rows > 0 or (writer.schema is None and buffer):
+            writer.write(_concat_tables(buffer))
+    finally:
+        writer.close()
+    return row_count
+
+
+def _read_arrow_batches(filename):
+    """
+    Yields the record batches of an Arrow IPC file one at a time, memory-mapped.
+
+    Parameters:
+        filename (str): The filename of the Arrow IPC file.
+
+    Returns:
+        generator<pyarrow.Table>: The record batches, as tables.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    with pa.memory_map(filename, "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield pa.Table.from_batches([reader.get_batch(i)])
+
+
+def write_arrow_ipc(chunks, filename):
+    """
+    Writes DataFrames to one Arrow IPC (Feather v2) file, appending each chunk as a record batch
+    as it arrives, so at most one chunk is held in memory.
+
+    The schema of the file is taken from the first chunk and promoted when a later chunk holds
+    other types, see write_parquet(). An IPC file holds one dictionary per column, so the
+    categories of categorical columns are extended chunk by chunk and written as dictionary
+    deltas.
+
+    Parameters:
+        chunks (iterable<DataFrame>): DataFrames with identical columns.
+        filename (str): The filename where the data is written.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    categories = {}
+    row_count = 0
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    writer = _ArrowFileWriter(filename,
+                              lambda sink, schema: pa.ipc.new_file(sink, schema, options=options),
+                              _read_arrow_batches)
+
+    try:
+        for chunk in chunks:
+            for name in chunk.select_dtypes("category").columns:
+                known = categories.get(name, pd.Index([], dtype=object))
+                new = chunk[name].cat.categories.difference(known, sort=False)
+                categories[name] = known.append(new)
+                chunk = chunk.assign(**{name: chunk[name].cat.set_categories(categories[name])})
+            writer.write(_get_arrow_table(chunk))
+            row_count += len(chunk)
+    finally:
+        writer.close()
+    return row_count
+
+
+def read_arrow_ipc(filename, as_dataframe=False):
+    """
+    Opens an Arrow IPC file memory-mapped. The data is not copied into memory: pages of the file
+    are loaded by the operating system when they are accessed, and processes that open the same
+    file share them.
+
+    Parameters:
+        filename (str): The filename of the Arrow IPC file.
+        as_dataframe (bool): If True, returns a DataFrame with Arrow-backed columns that are
+        views of the file, instead of the Arrow table.
+
+    Returns:
+        pyarrow.Table | DataFrame: The data of the file.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    # the table keeps the mapping open for as long as it is referenced
+    table = pa.ipc.open_file(pa.memory_map(filename, "r")).read_all()
+    if not as_dataframe:
+        return table
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -31,6 +31,14 @@ setup_args = dict(
         "requests",
         "urllib3"
     ],
+    extras_require={
+        "async": ["aiohttp"],
+        "arrow": ["pyarrow"],
+        "zstd": ["zstandard"],
+        "brotli": ["brotli"],
+        "orjson": ["orjson"],
+        "otel": ["opentelemetry-api"],
+    },
     classifiers=[
         'Intended Audience :: Developers',
         'Intended Audience :: System Administrators',